@@ -0,0 +1 @@
+"""Benchmarks for the AI Hub integration (not shipped with the integration)."""
@@ -0,0 +1,101 @@
+"""Benchmark of the in-process PCM conversion of TTS audio.
+
+Feeds synthetic 16-bit mono speech-rate PCM through ``PcmConverter`` in
+Edge TTS sized chunks for the WAV formats voice satellites request. It
+reports the conversion time per second of audio and the real-time factor:
+
+* ``16000/1``: Edge TTS produces 16 kHz natively, the samples pass through
+* ``22050/1``: produced natively as well
+* ``11025/1``: resampled from the 16 kHz stream
+* ``16000/2``: native rate, duplicated to stereo
+
+``audio_format.py`` has no Home Assistant imports, so it is loaded by path::
+
+    python -m benchmarks.audio_format_bench
+    python -m benchmarks.audio_format_bench --seconds 30 --chunk-bytes 1024 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import math
+from pathlib import Path
+import sys
+import time
+from typing import Any
+
+FORMAT_PATH = (
+    Path(__file__).parent.parent / "custom_components" / "ai_hub" / "audio_format.py"
+)
+TARGETS = ((16000, 1), (22050, 1), (11025, 1), (16000, 2))
+
+
+def _load_format_module() -> Any:
+    """Load the integration audio format module without importing the package."""
+    spec = importlib.util.spec_from_file_location("ai_hub_audio_format", FORMAT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    # dataclass 需要在 sys.modules 中找到模块
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _tone(rate: int, seconds: float) -> bytes:
+    """Return a 16-bit mono tone standing in for synthesized speech."""
+    count = int(rate * seconds)
+    return b"".join(
+        int(8000 * math.sin(2 * math.pi * 220 * i / rate)).to_bytes(2, "little", signed=True)
+        for i in range(count)
+    )
+
+
+def run(seconds: float, chunk_bytes: int) -> dict[str, Any]:
+    """Convert ``seconds`` of audio to every target and time it."""
+    module = _load_format_module()
+    results: dict[str, Any] = {}
+    sources: dict[int, bytes] = {}
+    for sample_rate, channels in TARGETS:
+        output = module.negotiate_output("wav", sample_rate, channels)
+        if output.source_rate not in sources:
+            sources[output.source_rate] = _tone(output.source_rate, seconds)
+        pcm = sources[output.source_rate]
+        converter = module.PcmConverter(output)
+        size = 0
+        start = time.perf_counter()
+        for offset in range(0, len(pcm), chunk_bytes):
+            size += len(converter.feed(pcm[offset : offset + chunk_bytes]))
+        elapsed = time.perf_counter() - start
+        results[f"{sample_rate}/{channels}"] = {
+            "edge_format": output.edge_format,
+            "ms_per_audio_second": elapsed * 1000 / seconds,
+            "realtime_factor": seconds / elapsed if elapsed else math.inf,
+            "output_bytes": size,
+        }
+    return results
+
+
+def main() -> None:
+    """Run the audio format benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--chunk-bytes", type=int, default=4096)
+    parser.add_argument("--json", action="store_true", help="print JSON")
+    args = parser.parse_args()
+
+    results = run(args.seconds, args.chunk_bytes)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'target':<9} {'edge format':<28} {'ms / audio s':>13} {'x realtime':>11}")
+    for target, stage in results.items():
+        print(
+            f"{target:<9} {stage['edge_format']:<28} "
+            f"{stage['ms_per_audio_second']:>13.2f} {stage['realtime_factor']:>11.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
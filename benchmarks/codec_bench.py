@@ -0,0 +1,139 @@
+"""Microbenchmark of the AI Hub JSON codec.
+
+Compares the integration codec (orjson when installed) with the standard
+library on the two hot paths:
+
+* ``sse``: decoding one chat completion SSE chunk, paid once per token
+* ``request``: encoding a chat request body, paid once per request; the
+  default payload carries a 1.5 MB base64 image like a vision turn
+
+``codec.py`` has no Home Assistant imports, so it is loaded by path and this
+benchmark runs without Home Assistant installed::
+
+    python -m benchmarks.codec_bench
+    python -m benchmarks.codec_bench --image-kb 4096 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import importlib.util
+import json
+import os
+from pathlib import Path
+import timeit
+from typing import Any
+
+CODEC_PATH = Path(__file__).parent.parent / "custom_components" / "ai_hub" / "codec.py"
+
+
+def _load_codec() -> Any:
+    """Load the integration codec module without importing the package."""
+    spec = importlib.util.spec_from_file_location("ai_hub_codec", CODEC_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def sse_chunk() -> str:
+    """Return the JSON of one streamed content delta."""
+    return json.dumps(
+        {
+            "id": "chatcmpl-standin",
+            "created": 1700000000,
+            "model": "glm-4-flash",
+            "choices": [
+                {"index": 0, "delta": {"role": "assistant", "content": "今天天气"}}
+            ],
+        },
+        ensure_ascii=False,
+    )
+
+
+def chat_request(image_kb: int, history: int) -> dict[str, Any]:
+    """Return a chat request with history and an optional image attachment."""
+    messages: list[dict[str, Any]] = [
+        {"role": "system", "content": "你是一个智能家居助手。" * 20}
+    ]
+    for i in range(history):
+        messages.append({"role": "user", "content": f"打开客厅的灯 {i}"})
+        messages.append({"role": "assistant", "content": f"已为你打开客厅的灯 {i}。"})
+    content: list[dict[str, Any]] = [{"type": "text", "text": "这张图片里有什么？"}]
+    if image_kb:
+        image = base64.b64encode(os.urandom(image_kb * 1024 * 3 // 4)).decode()
+        content.append(
+            {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image}"}}
+        )
+    messages.append({"role": "user", "content": content})
+    return {"model": "glm-4v-flash", "messages": messages, "stream": True}
+
+
+def _per_call_us(func: Any, number: int) -> float:
+    """Return the best per-call time in microseconds over five runs."""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def run(image_kb: int, history: int, tokens: int) -> dict[str, Any]:
+    """Run the benchmark and return the timings."""
+    codec = _load_codec()
+    line = sse_chunk()
+    payload = chat_request(image_kb, history)
+    body_bytes = len(codec.dumps(payload))
+    request_number = max(1, 20_000_000 // max(body_bytes, 1))
+
+    results = {
+        "codec": codec.NAME,
+        "body_bytes": body_bytes,
+        "sse": {
+            "stdlib_us": _per_call_us(lambda: json.loads(line), 50_000),
+            "codec_us": _per_call_us(lambda: codec.loads(line), 50_000),
+        },
+        "request": {
+            # aiohttp 的 json= 参数：json.dumps 生成 str，再编码为 bytes
+            "stdlib_us": _per_call_us(
+                lambda: json.dumps(payload).encode(), request_number
+            ),
+            "codec_us": _per_call_us(lambda: codec.dumps(payload), request_number),
+        },
+    }
+    for key in ("sse", "request"):
+        stage = results[key]
+        stage["speedup"] = stage["stdlib_us"] / stage["codec_us"]
+    results["per_response_saving_ms"] = (
+        (results["sse"]["stdlib_us"] - results["sse"]["codec_us"]) * tokens / 1000
+    )
+    return results
+
+
+def main() -> None:
+    """Run the codec benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--image-kb", type=int, default=1536, help="base64 image size")
+    parser.add_argument("--history", type=int, default=20, help="history message pairs")
+    parser.add_argument(
+        "--tokens", type=int, default=300, help="SSE chunks per response for the total"
+    )
+    parser.add_argument("--json", action="store_true", help="print JSON")
+    args = parser.parse_args()
+
+    results = run(args.image_kb, args.history, args.tokens)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"codec: {results['codec']}, request body {results['body_bytes'] / 1024:.0f} KiB")
+    for key, label in (("sse", "SSE chunk decode"), ("request", "request encode")):
+        stage = results[key]
+        print(
+            f"{label:18} stdlib {stage['stdlib_us']:10.1f} us   "
+            f"codec {stage['codec_us']:10.1f} us   x{stage['speedup']:.1f}"
+        )
+    print(
+        f"decode saving per {args.tokens}-chunk response: "
+        f"{results['per_response_saving_ms']:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Import-time budget check for AI Hub.
+
+Imports the integration package and each platform module in a fresh
+interpreter with ``-X importtime``. Home Assistant and the entity components
+the platforms build on are imported first, because Home Assistant has them
+loaded before it loads the integration. Only the modules imported after that
+baseline are counted. The script exits with status 1 if a module is over
+budget or pulls in a dependency that must be imported lazily::
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --budget-ms 80 --top 15
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass, field
+import json
+import subprocess
+import sys
+from typing import Any
+
+# 加载集成之前，Home Assistant 已经导入的模块
+BASELINE_IMPORTS = (
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.entity_platform",
+    "homeassistant.helpers.llm",
+    "homeassistant.components.ai_task",
+    "homeassistant.components.conversation",
+    "homeassistant.components.sensor",
+    "homeassistant.components.stt",
+    "homeassistant.components.tts",
+    "voluptuous",
+    "aiohttp",
+)
+
+TARGETS = (
+    "custom_components.ai_hub",
+    "custom_components.ai_hub.conversation",
+    "custom_components.ai_hub.ai_task",
+    "custom_components.ai_hub.tts",
+    "custom_components.ai_hub.stt",
+    "custom_components.ai_hub.sensor",
+    "custom_components.ai_hub.services",
+)
+
+# 只能在首次使用时导入的依赖
+LAZY_MODULES = ("edge_tts", "PIL", "yaml", "requests")
+
+DEFAULT_BUDGET_MS = 60.0
+
+MARKER = "ai_hub-import-time-marker"
+
+
+@dataclass
+class ImportResult:
+    """Import cost of one target module."""
+
+    target: str
+    total_us: int = 0
+    modules: list[tuple[str, int]] = field(default_factory=list)
+    lazy_loaded: list[str] = field(default_factory=list)
+
+    @property
+    def total_ms(self) -> float:
+        """Return the summed self time in milliseconds."""
+        return self.total_us / 1000
+
+    def as_dict(self, top: int) -> dict[str, Any]:
+        """Return the summary of the target."""
+        return {
+            "target": self.target,
+            "total_ms": round(self.total_ms, 1),
+            "modules": len(self.modules),
+            "slowest": [
+                {"module": name, "self_ms": round(us / 1000, 1)}
+                for name, us in sorted(self.modules, key=lambda m: m[1], reverse=True)[:top]
+            ],
+            "lazy_loaded": self.lazy_loaded,
+        }
+
+
+def _child_code(target: str) -> str:
+    """Return the code run in the child interpreter."""
+    baseline = "\n".join(f"import {name}" for name in BASELINE_IMPORTS)
+    return (
+        f"{baseline}\n"
+        "import json, sys\n"
+        "before = set(sys.modules)\n"
+        f"print({MARKER!r}, file=sys.stderr, flush=True)\n"
+        f"import {target}\n"
+        "print(json.dumps(sorted(set(sys.modules) - before)))\n"
+    )
+
+
+def measure(target: str) -> ImportResult:
+    """Import ``target`` in a fresh interpreter and parse ``-X importtime``."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _child_code(target)],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode:
+        raise RuntimeError(f"importing {target} failed:\n{proc.stderr[-2000:]}")
+
+    result = ImportResult(target)
+    after_marker = False
+    for line in proc.stderr.splitlines():
+        if MARKER in line:
+            after_marker = True
+            continue
+        if not after_marker or not line.startswith("import time:"):
+            continue
+        # import time: self [us] | cumulative | imported package
+        fields = line.split(":", 1)[1].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        self_us = int(fields[0])
+        result.modules.append((fields[2].strip(), self_us))
+        result.total_us += self_us
+
+    loaded = json.loads(proc.stdout.strip().splitlines()[-1])
+    result.lazy_loaded = sorted(
+        {name.split(".", 1)[0] for name in loaded} & set(LAZY_MODULES)
+    )
+    return result
+
+
+def main() -> int:
+    """Run the import-time check."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help="maximum import time of each target, in milliseconds",
+    )
+    parser.add_argument(
+        "--target",
+        action="append",
+        help="module to measure (repeatable, default: package and platforms)",
+    )
+    parser.add_argument("--top", type=int, default=10, help="slowest modules to list")
+    parser.add_argument("--json", action="store_true", help="print JSON")
+    args = parser.parse_args()
+
+    failed = False
+    summaries = []
+    for target in args.target or TARGETS:
+        result = measure(target)
+        over_budget = result.total_ms > args.budget_ms
+        failed |= over_budget or bool(result.lazy_loaded)
+        summaries.append({**result.as_dict(args.top), "over_budget": over_budget})
+
+    if args.json:
+        print(json.dumps({"budget_ms": args.budget_ms, "targets": summaries}, indent=2))
+    else:
+        for summary in summaries:
+            status = "FAIL" if summary["over_budget"] or summary["lazy_loaded"] else "ok"
+            print(
+                f"{status:4}  {summary['target']:42} {summary['total_ms']:7.1f} ms "
+                f"({summary['modules']} modules, budget {args.budget_ms:.0f} ms)"
+            )
+            if summary["lazy_loaded"]:
+                print(f"      imported eagerly: {', '.join(summary['lazy_loaded'])}")
+            for module in summary["slowest"]:
+                print(f"      {module['self_ms']:7.1f} ms  {module['module']}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,389 @@
+"""Load-test driver for AI Hub against the local stand-in server.
+
+Runs the integration's own code paths at a configurable concurrency:
+
+* ``chat``: ``AIHubBaseLLMEntity._async_handle_chat_log`` with the same tool
+  loop the conversation entity uses
+* ``services``: ``analyze_image``, ``generate_image`` and
+  ``send_wechat_message`` through the Home Assistant service registry
+* ``stt``: ``AIHubSpeechToTextEntity.async_process_audio_stream``
+
+For each scenario it reports p50/p95/p99 latency, requests per second and
+errors, plus event-loop lag sampled over the whole run. Requires Home
+Assistant to be importable; the stand-in server is started in-process unless
+``--server`` points at a running one::
+
+    python -m benchmarks.load_test --scenario chat --concurrency 20 --requests 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
+import json
+import os
+import statistics
+import tempfile
+import time
+from types import MappingProxyType, SimpleNamespace
+from typing import Any
+from urllib.parse import urlsplit
+
+import voluptuous as vol
+
+from homeassistant.components import conversation, stt
+from homeassistant.config_entries import ConfigSubentry
+from homeassistant.core import Context, HomeAssistant
+from homeassistant.helpers import llm
+from homeassistant.util import ulid
+
+from custom_components.ai_hub.client import AIHubClient
+from custom_components.ai_hub.const import (
+    AI_HUB_API_BASE,
+    BEMFA_API_URL,
+    CONF_CHAT_MODEL,
+    CONF_STT_MODEL,
+    DOMAIN,
+    RECOMMENDED_CHAT_MODEL,
+    SERVICE_ANALYZE_IMAGE,
+    SERVICE_GENERATE_IMAGE,
+    SERVICE_SEND_WECHAT_MESSAGE,
+    SILICONFLOW_API_BASE,
+    STT_DEFAULT_MODEL,
+)
+from custom_components.ai_hub.entity import AIHubBaseLLMEntity
+from custom_components.ai_hub.services import async_setup_services
+from custom_components.ai_hub.stt import AIHubSpeechToTextEntity
+
+from .standin_server import (
+    TINY_PNG,
+    StandInServer,
+    add_config_arguments,
+    config_from_args,
+)
+
+SCENARIOS = ("chat", "services", "stt")
+
+
+@dataclass
+class ScenarioResult:
+    """Latencies and errors of one scenario."""
+
+    name: str
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    elapsed: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the summary of the scenario."""
+        return {
+            "scenario": self.name,
+            "requests": len(self.latencies) + self.errors,
+            "errors": self.errors,
+            "rps": round(len(self.latencies) / self.elapsed, 2) if self.elapsed else 0.0,
+            **percentiles(self.latencies),
+        }
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    """Return p50/p95/p99/max of a list of seconds, in milliseconds."""
+    if not samples:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    if len(samples) == 1:
+        cuts = samples * 99
+    else:
+        cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50_ms": round(cuts[49] * 1000, 2),
+        "p95_ms": round(cuts[94] * 1000, 2),
+        "p99_ms": round(cuts[98] * 1000, 2),
+        "max_ms": round(max(samples) * 1000, 2),
+    }
+
+
+class LoopLagMonitor:
+    """Sample how late the event loop wakes up a sleeping task."""
+
+    def __init__(self, interval: float = 0.01) -> None:
+        """Initialize the monitor."""
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start sampling."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - start - self.interval))
+
+
+class _BenchTool(llm.Tool):
+    """Tool answered locally so the chat tool loop can be measured."""
+
+    name = "HassTurnOn"
+    description = "Turn on a device"
+    parameters = vol.Schema({vol.Optional("name"): str})
+
+    async def async_call(
+        self, hass: HomeAssistant, tool_input: llm.ToolInput, llm_context: llm.LLMContext
+    ) -> dict[str, Any]:
+        await asyncio.sleep(0.01)
+        return {"success": True, "name": tool_input.tool_args.get("name")}
+
+
+class _BenchAPI(llm.API):
+    """LLM API exposing only the bench tool."""
+
+    async def async_get_api_instance(self, llm_context: llm.LLMContext) -> llm.APIInstance:
+        return llm.APIInstance(self, "", llm_context, [_BenchTool()])
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _subentry(subentry_type: str, data: dict[str, Any]) -> ConfigSubentry:
+    return ConfigSubentry(
+        data=MappingProxyType(data),
+        subentry_type=subentry_type,
+        title=f"bench {subentry_type}",
+        unique_id=None,
+    )
+
+
+async def run_scenario(
+    name: str,
+    call: Callable[[int], Awaitable[Any]],
+    concurrency: int,
+    requests: int,
+) -> ScenarioResult:
+    """Run ``call(index)`` ``requests`` times, ``concurrency`` at a time."""
+    result = ScenarioResult(name)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await call(index)
+            except Exception:  # noqa: BLE001
+                result.errors += 1
+                return
+            if isinstance(response, dict) and response.get("success") is False:
+                result.errors += 1
+                return
+            result.latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+class Bench:
+    """Wire the integration up against the stand-in server."""
+
+    def __init__(self, hass: HomeAssistant, base_url: str, args: argparse.Namespace) -> None:
+        """Initialize the bench."""
+        self.hass = hass
+        self.args = args
+        self.client = AIHubClient(
+            hass,
+            "bench-api-key",
+            "bench-siliconflow-key",
+            "bench-bemfa-uid",
+            url_overrides={
+                _origin(AI_HUB_API_BASE): base_url,
+                _origin(SILICONFLOW_API_BASE): base_url,
+                _origin(BEMFA_API_URL): base_url,
+            },
+        )
+        self.entry = SimpleNamespace(
+            entry_id="bench", data={}, runtime_data=self.client, subentries={}
+        )
+        self.image_file = os.path.join(hass.config.config_dir, "bench.png")
+        self._llm_api: llm.APIInstance | None = None
+
+    async def async_setup(self) -> None:
+        """Create entities and register services."""
+        self.chat_entity = AIHubBaseLLMEntity(
+            self.entry,
+            _subentry("conversation", {CONF_CHAT_MODEL: RECOMMENDED_CHAT_MODEL}),
+            RECOMMENDED_CHAT_MODEL,
+        )
+        self.chat_entity.hass = self.hass
+        self.chat_entity.entity_id = "conversation.bench"
+
+        self.stt_entity = AIHubSpeechToTextEntity(
+            self.entry,
+            _subentry(
+                "stt",
+                {CONF_STT_MODEL: STT_DEFAULT_MODEL, "prewarm_connections": self.args.prewarm},
+            ),
+        )
+        self.stt_entity.hass = self.hass
+        self.stt_entity.entity_id = "stt.bench"
+
+        await self.hass.async_add_executor_job(self._write_image)
+        await async_setup_services(self.hass, self.entry)
+
+        if self.args.tool_calls:
+            api = _BenchAPI(hass=self.hass, id="bench", name="Bench")
+            self._llm_api = await api.async_get_api_instance(
+                llm.LLMContext(
+                    platform=DOMAIN,
+                    context=Context(),
+                    language="zh-Hans",
+                    assistant=conversation.DOMAIN,
+                    device_id=None,
+                )
+            )
+
+    def _write_image(self) -> None:
+        with open(self.image_file, "wb") as file:
+            file.write(TINY_PNG)
+
+    async def chat(self, index: int) -> None:
+        """One conversation turn, including tool round trips."""
+        chat_log = conversation.ChatLog(self.hass, ulid.ulid_now())
+        chat_log.llm_api = self._llm_api
+        chat_log.async_add_user_content(
+            conversation.UserContent(content=f"打开客厅的灯 #{index}")
+        )
+        while True:
+            await self.chat_entity._async_handle_chat_log(chat_log)  # noqa: SLF001
+            if not chat_log.unresponded_tool_results:
+                break
+
+    async def services(self, index: int) -> Any:
+        """One service call, rotating over the HTTP backed services."""
+        service, data = (
+            (SERVICE_ANALYZE_IMAGE, {"image_file": self.image_file, "message": f"描述 #{index}"}),
+            (SERVICE_GENERATE_IMAGE, {"prompt": f"一只猫 #{index}"}),
+            (SERVICE_SEND_WECHAT_MESSAGE, {"device_entity": "sensor.bench", "message": f"#{index}"}),
+        )[index % 3]
+        return await self.hass.services.async_call(
+            DOMAIN, service, data, blocking=True, return_response=True
+        )
+
+    async def stt(self, index: int) -> None:
+        """One STT request fed with 16 kHz mono PCM in 20 ms chunks."""
+        metadata = stt.SpeechMetadata(
+            language="zh-CN",
+            format=stt.AudioFormats.WAV,
+            codec=stt.AudioCodecs.PCM,
+            bit_rate=stt.AudioBitRates.BITRATE_16,
+            sample_rate=stt.AudioSampleRates.SAMPLERATE_16000,
+            channel=stt.AudioChannels.CHANNEL_MONO,
+        )
+        result = await self.stt_entity.async_process_audio_stream(
+            metadata, self._audio_stream(self.args.stt_seconds)
+        )
+        if result.result != stt.SpeechResultState.SUCCESS:
+            raise RuntimeError("STT failed")
+
+    async def _audio_stream(self, seconds: float) -> AsyncIterator[bytes]:
+        chunk = bytes(640)  # 20 ms of silence
+        for _ in range(int(seconds / 0.02)):
+            if self.args.realtime:
+                await asyncio.sleep(0.02)
+            yield chunk
+
+
+async def async_main(args: argparse.Namespace) -> dict[str, Any]:
+    """Run the selected scenarios and return the report."""
+    server = None
+    base_url = args.server
+    if base_url is None:
+        server = StandInServer(config_from_args(args))
+        base_url = await server.async_start()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        bench = Bench(hass, base_url, args)
+        await bench.async_setup()
+
+        scenarios = SCENARIOS if args.scenario == "all" else (args.scenario,)
+        monitor = LoopLagMonitor()
+        monitor.start()
+        results = [
+            await run_scenario(
+                name, getattr(bench, name), args.concurrency, args.requests
+            )
+            for name in scenarios
+        ]
+        await monitor.stop()
+
+        report: dict[str, Any] = {
+            "scenarios": [result.as_dict() for result in results],
+            "loop_lag": percentiles(monitor.samples),
+            "scheduler": bench.client.scheduler.as_dict(),
+        }
+        if server is not None:
+            report["server"] = server.stats()
+            await server.async_stop()
+
+        await bench.client.async_close()
+        await hass.async_stop(force=True)
+    return report
+
+
+def _print_report(report: dict[str, Any]) -> None:
+    columns = ("scenario", "requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms", "max_ms")
+    print(" ".join(f"{column:>10}" for column in columns))  # noqa: T201
+    for row in report["scenarios"]:
+        print(" ".join(f"{row[column]!s:>10}" for column in columns))  # noqa: T201
+    lag = report["loop_lag"]
+    print(  # noqa: T201
+        f"\nevent loop lag: p50 {lag['p50_ms']} ms, p99 {lag['p99_ms']} ms, max {lag['max_ms']} ms"
+    )
+    if "server" in report:
+        print(f"stand-in server: {report['server']}")  # noqa: T201
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Return the command line parser."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=(*SCENARIOS, "all"), default="all")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--server", help="base URL of a running stand-in server")
+    parser.add_argument("--stt-seconds", type=float, default=2.0)
+    parser.add_argument(
+        "--realtime", action="store_true", help="pace STT audio like a live microphone"
+    )
+    parser.add_argument("--prewarm", action="store_true", help="enable STT pre-warming")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    add_config_arguments(parser)
+    return parser
+
+
+def main() -> None:
+    """Run the load test."""
+    args = build_parser().parse_args()
+    report = asyncio.run(async_main(args))
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))  # noqa: T201
+    else:
+        _print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Throughput benchmark of the streaming markdown filter.
+
+Feeds a markdown-heavy reply to the filter token by token, the way
+``_transform_stream`` does. It compares:
+
+* ``legacy``: the previous per-delta regex chain (kept below as reference)
+* ``streaming``: ``StreamingMarkdownFilter`` with state carried across deltas
+
+Besides time per delta it counts markdown characters that leaked into the
+output, which is what TTS ends up reading aloud. ``markdown_filter.py`` has
+no Home Assistant imports, so it is loaded by path::
+
+    python -m benchmarks.markdown_bench
+    python -m benchmarks.markdown_bench --token-chars 2 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+from pathlib import Path
+import re
+import timeit
+from typing import Any
+
+FILTER_PATH = (
+    Path(__file__).parent.parent / "custom_components" / "ai_hub" / "markdown_filter.py"
+)
+
+SAMPLE_REPLY = """## 今日天气
+
+今天**北京**天气*晴朗*，气温 `18~25` 摄氏度。
+
+- 上午：适合**户外运动**
+- 下午：注意~~降雨~~防晒
+> 提示：紫外线较强
+
+| 时间 | 温度 |
+|---|---|
+| 08:00 | 18 |
+
+```yaml
+light.living_room: on
+```
+
+已为你打开 `light.living_room` 和 `switch.kitchen_fan`。[^1]
+
+[^1]: 数据来源于中国气象局
+"""
+
+MARKDOWN_CHARS = set("*#`~|>")
+
+
+def _load_filter() -> Any:
+    """Load the integration markdown filter without importing the package."""
+    spec = importlib.util.spec_from_file_location("ai_hub_markdown_filter", FILTER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def legacy_filter_markdown_streaming(content: str) -> str:
+    """Previous per-delta filter: recompiles its regex chain on every call."""
+    if not content:
+        return ""
+    patterns_with_capture = [
+        re.compile(r'\*\*([^*\n]*)\*\*'),
+        re.compile(r'\*([^*\n]*)\*'),
+        re.compile(r'__([^_\n]*)__'),
+        re.compile(r'_([^_\n]*)_'),
+        re.compile(r'~~([^~\n]*)~~'),
+        re.compile(r'`([^`\n]*)`'),
+    ]
+    patterns_remove = [
+        re.compile(r'^#{1,6}\s+.*$', re.MULTILINE),
+        re.compile(r'^\s*[-*+]\s+', re.MULTILINE),
+        re.compile(r'^\s*>\s+', re.MULTILINE),
+        re.compile(r'```[a-zA-Z0-9_-]*', re.MULTILINE),
+        re.compile(r'```\s*$', re.MULTILINE),
+        re.compile(r'^\|[^\n]*\|$', re.MULTILINE),
+        re.compile(r'^\|[\s-]*\|[\s-]*\|$', re.MULTILINE),
+        re.compile(r'^-{3,}$|^_{3,}$|^\*{3,}$', re.MULTILINE),
+        re.compile(r'\[\^[^\]]*\]'),
+        re.compile(r'^\[\^[^\]]*\]:.*$', re.MULTILINE),
+        re.compile(r'<[^>]*>'),
+        re.compile(r'^\s*$\n^\s*$', re.MULTILINE),
+        re.compile(r'^`[a-zA-Z0-9_-]*$', re.MULTILINE),
+    ]
+    for pattern in patterns_with_capture:
+        content = pattern.sub(r'\1', content)
+    for pattern in patterns_remove:
+        content = pattern.sub('', content)
+    return re.sub(r'\n{3,}', '\n\n', content)
+
+
+def tokenize(text: str, token_chars: int) -> list[str]:
+    """Split a reply into deltas of ``token_chars`` characters."""
+    return [text[i:i + token_chars] for i in range(0, len(text), token_chars)]
+
+
+def run(token_chars: int, repeat: int) -> dict[str, Any]:
+    """Run the benchmark and return the timings."""
+    module = _load_filter()
+    deltas = tokenize(SAMPLE_REPLY * repeat, token_chars)
+
+    def legacy() -> str:
+        return "".join(legacy_filter_markdown_streaming(delta) for delta in deltas)
+
+    def streaming() -> str:
+        markdown_filter = module.StreamingMarkdownFilter()
+        out = [markdown_filter.feed(delta) for delta in deltas]
+        out.append(markdown_filter.flush())
+        return "".join(out)
+
+    results: dict[str, Any] = {"deltas": len(deltas), "token_chars": token_chars}
+    for name, func in (("legacy", legacy), ("streaming", streaming)):
+        best = min(timeit.repeat(func, number=5, repeat=5)) / 5
+        output = func()
+        results[name] = {
+            "per_delta_us": best / len(deltas) * 1e6,
+            "chars_per_s": len(SAMPLE_REPLY) * repeat / best,
+            "leaked_markdown_chars": sum(output.count(c) for c in MARKDOWN_CHARS),
+        }
+    results["speedup"] = results["legacy"]["per_delta_us"] / results["streaming"]["per_delta_us"]
+    return results
+
+
+def main() -> None:
+    """Run the markdown filter benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--token-chars", type=int, default=3, help="characters per delta")
+    parser.add_argument("--repeat", type=int, default=20, help="copies of the sample reply")
+    parser.add_argument("--json", action="store_true", help="print JSON")
+    args = parser.parse_args()
+
+    results = run(args.token_chars, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    print(f"{results['deltas']} deltas of {results['token_chars']} chars")
+    for name in ("legacy", "streaming"):
+        stage = results[name]
+        print(
+            f"{name:10} {stage['per_delta_us']:8.2f} us/delta "
+            f"{stage['chars_per_s'] / 1e6:6.2f} M chars/s "
+            f"leaked markdown chars: {stage['leaked_markdown_chars']}"
+        )
+    print(f"speedup x{results['speedup']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+"""Local stand-in for the remote APIs used by AI Hub.
+
+Emulates, on one aiohttp server:
+
+* Zhipu chat completions (``/api/paas/v4/chat/completions``), streamed as SSE
+  with a configurable time to first byte, token rate and optional tool calls
+* Zhipu image generation (``/api/paas/v4/images/generations``)
+* SiliconFlow ASR (``/v1/audio/transcriptions``)
+* Bemfa WeChat alerts (``/vb/wechat/v1/wechatAlertJson``)
+* Edge TTS synthesis over a websocket (``/consumer/speech/.../edge/v1``),
+  with a configurable handshake delay and any number of requests per
+  connection
+
+``GET /_stats`` returns request counts per endpoint and the number of TCP
+connections accepted, which is what connection pooling and pre-warming are
+meant to keep low.
+
+Run standalone::
+
+    python -m benchmarks.standin_server --port 8765 --ttfb 0.3 --token-rate 40
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+from collections import Counter
+from dataclasses import dataclass
+import json
+import struct
+import time
+import zlib
+
+from aiohttp import WSMsgType, web
+
+CHAT_PATH = "/api/paas/v4/chat/completions"
+IMAGE_PATH = "/api/paas/v4/images/generations"
+ASR_PATH = "/v1/audio/transcriptions"
+BEMFA_PATH = "/vb/wechat/v1/wechatAlertJson"
+EDGE_TTS_PATH = "/consumer/speech/synthesize/readaloud/edge/v1"
+
+REPLY_TEXT = "好的，已经为你打开客厅的灯，当前亮度为百分之八十。还有什么需要帮忙的吗？"
+
+
+@dataclass
+class StandInConfig:
+    """Behaviour of the stand-in server."""
+
+    ttfb: float = 0.3  # seconds before the first SSE event
+    token_rate: float = 40.0  # streamed tokens per second, 0 for no pacing
+    tokens: int = 40  # tokens in a streamed reply
+    chars_per_token: int = 2
+    tool_calls: bool = False  # answer the first turn with a tool call
+    image_latency: float = 1.0
+    asr_latency: float = 0.3
+    asr_text: str = "打开客厅的灯"
+    bemfa_latency: float = 0.05
+    tts_handshake: float = 0.15  # TLS and websocket upgrade of a new connection
+    tts_latency: float = 0.05  # seconds before the first audio of a request
+    tts_frames: int = 8  # 4 KB audio frames per request
+
+
+def _tiny_png() -> bytes:
+    """Return a valid 1x1 white PNG."""
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data))
+            + kind
+            + data
+            + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+        )
+
+    header = struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0)
+    pixels = zlib.compress(b"\x00\xff\xff\xff")
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", pixels)
+        + chunk(b"IEND", b"")
+    )
+
+
+TINY_PNG = _tiny_png()
+
+
+class StandInServer:
+    """aiohttp application emulating the remote APIs."""
+
+    def __init__(self, config: StandInConfig | None = None) -> None:
+        """Initialize the server."""
+        self.config = config or StandInConfig()
+        self.requests: Counter[str] = Counter()
+        self._transports: set[asyncio.BaseTransport] = set()
+        self._runner: web.AppRunner | None = None
+        self.app = web.Application(middlewares=[self._count])
+        self.app.router.add_post(CHAT_PATH, self._chat)
+        self.app.router.add_post(IMAGE_PATH, self._image)
+        self.app.router.add_post(ASR_PATH, self._asr)
+        self.app.router.add_post(BEMFA_PATH, self._bemfa)
+        self.app.router.add_get(EDGE_TTS_PATH, self._edge_tts)
+        self.app.router.add_get("/_stats", self._stats)
+        self.app.router.add_route("*", "/", self._root)
+
+    @property
+    def connections(self) -> int:
+        """Return the number of TCP connections accepted so far."""
+        return len(self._transports)
+
+    def stats(self) -> dict:
+        """Return request and connection counters."""
+        return {"connections": self.connections, "requests": dict(self.requests)}
+
+    async def async_start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base URL."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        sockets = site._server.sockets  # noqa: SLF001
+        bound_port = sockets[0].getsockname()[1]
+        return f"http://{host}:{bound_port}"
+
+    async def async_stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @web.middleware
+    async def _count(self, request: web.Request, handler):
+        if request.path != "/_stats":
+            self.requests[request.path] += 1
+            if request.transport is not None:
+                self._transports.add(request.transport)
+        return await handler(request)
+
+    async def _root(self, request: web.Request) -> web.Response:
+        """Answer the HEAD requests used for connection pre-warming."""
+        return web.Response(text="ok")
+
+    async def _stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats())
+
+    async def _chat(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        config = self.config
+        messages = body.get("messages") or []
+        tools = [
+            tool["function"]["name"]
+            for tool in body.get("tools") or []
+            if tool.get("type") == "function"
+        ]
+        call_tool = (
+            config.tool_calls
+            and tools
+            and messages
+            and messages[-1].get("role") == "user"
+        )
+        completion_id = f"bench-{time.monotonic_ns()}"
+        model = body.get("model", "glm-4-flash")
+
+        await asyncio.sleep(config.ttfb)
+
+        tokens = _split_tokens(REPLY_TEXT, config.tokens, config.chars_per_token)
+        if not body.get("stream"):
+            return web.json_response(
+                {
+                    "id": completion_id,
+                    "model": model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "finish_reason": "stop",
+                            "message": {"role": "assistant", "content": "".join(tokens)},
+                        }
+                    ],
+                    "usage": _usage(messages, len(tokens)),
+                }
+            )
+
+        response = web.StreamResponse(
+            headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"}
+        )
+        await response.prepare(request)
+
+        async def send(delta: dict, finish_reason: str | None = None, **extra) -> None:
+            event = {
+                "id": completion_id,
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+                **extra,
+            }
+            payload = json.dumps(event, ensure_ascii=False)
+            await response.write(f"data: {payload}\n\n".encode())
+
+        if call_tool:
+            # Arguments arrive in two fragments, like the real API does for
+            # longer calls, so the client-side accumulator is exercised.
+            await send(
+                {
+                    "role": "assistant",
+                    "tool_calls": [
+                        {
+                            "index": 0,
+                            "id": f"call_{completion_id}",
+                            "type": "function",
+                            "function": {"name": tools[0], "arguments": '{"name": '},
+                        }
+                    ],
+                }
+            )
+            await send(
+                {"tool_calls": [{"index": 0, "function": {"arguments": '"客厅灯"}'}}]}
+            )
+            await send({}, "tool_calls", usage=_usage(messages, 8))
+        else:
+            interval = 1 / config.token_rate if config.token_rate > 0 else 0
+            for index, token in enumerate(tokens):
+                delta = {"content": token}
+                if index == 0:
+                    delta["role"] = "assistant"
+                await send(delta)
+                if interval:
+                    await asyncio.sleep(interval)
+            await send({}, "stop", usage=_usage(messages, len(tokens)))
+
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def _image(self, request: web.Request) -> web.Response:
+        await request.json()
+        await asyncio.sleep(self.config.image_latency)
+        return web.json_response(
+            {
+                "created": int(time.time()),
+                "data": [{"b64_json": base64.b64encode(TINY_PNG).decode()}],
+            }
+        )
+
+    async def _asr(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        if "file" not in form:
+            return web.json_response({"message": "file is required"}, status=400)
+        await asyncio.sleep(self.config.asr_latency)
+        return web.json_response({"text": self.config.asr_text})
+
+    async def _bemfa(self, request: web.Request) -> web.Response:
+        await request.json()
+        await asyncio.sleep(self.config.bemfa_latency)
+        return web.json_response({"code": 0, "message": "OK", "data": 0})
+
+    async def _edge_tts(self, request: web.Request) -> web.WebSocketResponse:
+        config = self.config
+        await asyncio.sleep(config.tts_handshake)
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for message in ws:
+            if message.type is not WSMsgType.TEXT:
+                break
+            head, _, _ = message.data.partition("\r\n\r\n")
+            headers = dict(line.split(":", 1) for line in head.split("\r\n"))
+            if headers.get("Path") != "ssml":
+                continue
+            self.requests["edge_tts_turn"] += 1
+            request_id = headers["X-RequestId"]
+            await ws.send_str(
+                f"X-RequestId:{request_id}\r\nPath:turn.start\r\n\r\n{{}}"
+            )
+            await asyncio.sleep(config.tts_latency)
+            header = (
+                f"X-RequestId:{request_id}\r\n"
+                "Content-Type:audio/mpeg\r\nPath:audio\r\n"
+            ).encode()
+            frame = len(header).to_bytes(2, "big") + header + b"\xff" * 4096
+            for _ in range(config.tts_frames):
+                await ws.send_bytes(frame)
+            await ws.send_str(
+                f"X-RequestId:{request_id}\r\nPath:turn.end\r\n\r\n{{}}"
+            )
+        return ws
+
+
+def _split_tokens(text: str, count: int, chars_per_token: int) -> list[str]:
+    """Return ``count`` tokens cycling through ``text``."""
+    tokens = []
+    position = 0
+    for _ in range(count):
+        token = "".join(
+            text[(position + offset) % len(text)] for offset in range(chars_per_token)
+        )
+        tokens.append(token)
+        position += chars_per_token
+    return tokens
+
+
+def _usage(messages: list[dict], completion_tokens: int) -> dict:
+    """Return a rough usage block."""
+    prompt_tokens = sum(len(str(message.get("content", ""))) for message in messages)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Return the command line parser for the server options."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_config_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    return parser
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the StandInConfig options to a parser."""
+    defaults = StandInConfig()
+    parser.add_argument("--ttfb", type=float, default=defaults.ttfb)
+    parser.add_argument("--token-rate", type=float, default=defaults.token_rate)
+    parser.add_argument("--tokens", type=int, default=defaults.tokens)
+    parser.add_argument("--tool-calls", action="store_true")
+    parser.add_argument("--image-latency", type=float, default=defaults.image_latency)
+    parser.add_argument("--asr-latency", type=float, default=defaults.asr_latency)
+    parser.add_argument("--bemfa-latency", type=float, default=defaults.bemfa_latency)
+    parser.add_argument("--tts-handshake", type=float, default=defaults.tts_handshake)
+    parser.add_argument("--tts-latency", type=float, default=defaults.tts_latency)
+
+
+def config_from_args(args: argparse.Namespace) -> StandInConfig:
+    """Build a StandInConfig from parsed arguments."""
+    return StandInConfig(
+        ttfb=args.ttfb,
+        token_rate=args.token_rate,
+        tokens=args.tokens,
+        tool_calls=args.tool_calls,
+        image_latency=args.image_latency,
+        asr_latency=args.asr_latency,
+        bemfa_latency=args.bemfa_latency,
+        tts_handshake=args.tts_handshake,
+        tts_latency=args.tts_latency,
+    )
+
+
+async def _async_serve(args: argparse.Namespace) -> None:
+    server = StandInServer(config_from_args(args))
+    url = await server.async_start(args.host, args.port)
+    print(f"Stand-in server listening on {url}")  # noqa: T201
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.async_stop()
+
+
+def main() -> None:
+    """Run the stand-in server until interrupted."""
+    try:
+        asyncio.run(_async_serve(build_parser().parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Benchmark of long-message TTS synthesis over message length.
+
+Edge TTS is replaced by a stand-in that models one synthesis request as a
+fixed connection setup plus a time per character, streaming about
+1.5 KB of MP3 per character in 4 KB chunks. It compares:
+
+* ``serial``: the previous path, one request for the whole message with
+  ``audio_bytes += chunk``
+* ``parallel``: sentence groups synthesized concurrently by
+  ``async_synthesize_groups`` and joined once
+
+``tts_synthesis.py`` has no Home Assistant imports, so it is loaded by path::
+
+    python -m benchmarks.tts_bench
+    python -m benchmarks.tts_bench --setup-ms 300 --char-ms 4 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import AsyncIterator
+import importlib.util
+import json
+from pathlib import Path
+import re
+import time
+from typing import Any
+
+SYNTHESIS_PATH = (
+    Path(__file__).parent.parent / "custom_components" / "ai_hub" / "tts_synthesis.py"
+)
+
+SAMPLE_BRIEFING = (
+    "早上好，今天是星期一。北京今天多云转晴，气温十八到二十五摄氏度，空气质量良。"
+    "上午九点你有一个项目例会，下午三点需要去取快递。客厅和卧室的灯已经关闭，"
+    "扫地机器人将在十点开始清扫。洗衣机里的衣服已经洗好，记得及时晾晒。"
+    "今天的通勤路线比较顺畅，预计用时三十五分钟。祝你度过愉快的一天！"
+)
+LENGTHS = (50, 200, 800, 3200)
+BYTES_PER_CHAR = 1500
+CHUNK_BYTES = 4096
+
+# 与集成默认值一致
+GROUP_MAX_CHARS = 200
+MAX_PARALLEL = 3
+
+
+def _load_synthesis() -> Any:
+    """Load the integration synthesis helpers without importing the package."""
+    spec = importlib.util.spec_from_file_location("ai_hub_tts_synthesis", SYNTHESIS_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_message(length: int) -> str:
+    """Repeat the sample briefing up to ``length`` characters."""
+    return (SAMPLE_BRIEFING * (length // len(SAMPLE_BRIEFING) + 1))[:length]
+
+
+def split(text: str) -> list[str]:
+    """Split at Chinese terminal punctuation like the integration splitter."""
+    return [s for s in re.findall(r"[^。！？]+[。！？]?", text) if s]
+
+
+def stand_in(setup_s: float, char_s: float):
+    """Return a fake ``Communicate(...).stream()`` audio generator."""
+
+    async def synthesize(text: str) -> AsyncIterator[bytes]:
+        await asyncio.sleep(setup_s)
+        total = len(text) * BYTES_PER_CHAR
+        chunks = max(1, total // CHUNK_BYTES)
+        for _ in range(chunks):
+            await asyncio.sleep(len(text) * char_s / chunks)
+            yield b"\xff" * CHUNK_BYTES
+
+    return synthesize
+
+
+async def serial(synthesize, text: str) -> bytes:
+    """Previous implementation."""
+    audio_bytes = b""
+    async for chunk in synthesize(text):
+        audio_bytes += chunk
+    return audio_bytes
+
+
+async def run(setup_ms: float, char_ms: float) -> dict[str, Any]:
+    """Run the benchmark for every message length."""
+    module = _load_synthesis()
+    synthesize = stand_in(setup_ms / 1000, char_ms / 1000)
+    results: dict[str, Any] = {}
+    for length in LENGTHS:
+        text = make_message(length)
+        groups = module.group_sentences(split(text), GROUP_MAX_CHARS)
+
+        start = time.perf_counter()
+        serial_audio = await serial(synthesize, text)
+        serial_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parallel_audio = await module.async_synthesize_groups(
+            synthesize, groups, MAX_PARALLEL
+        )
+        parallel_s = time.perf_counter() - start
+
+        results[str(length)] = {
+            "groups": len(groups),
+            "audio_kb": len(parallel_audio) // 1024,
+            "serial_kb": len(serial_audio) // 1024,
+            "serial_ms": serial_s * 1000,
+            "parallel_ms": parallel_s * 1000,
+            "speedup": serial_s / parallel_s,
+        }
+    return results
+
+
+def main() -> None:
+    """Run the TTS synthesis benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--setup-ms", type=float, default=250, help="connection setup per request")
+    parser.add_argument("--char-ms", type=float, default=3, help="synthesis time per character")
+    parser.add_argument("--json", action="store_true", help="print JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.setup_ms, args.char_ms))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'chars':>6} {'groups':>6} {'audio KB':>9} {'serial ms':>10} {'parallel ms':>12} {'speedup':>8}")
+    for length, stage in results.items():
+        print(
+            f"{length:>6} {stage['groups']:>6} {stage['audio_kb']:>9} "
+            f"{stage['serial_ms']:>10.0f} {stage['parallel_ms']:>12.0f} "
+            f"x{stage['speedup']:>7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Benchmark of pooled Edge TTS websocket sessions.
+
+Runs synthesis requests against the Edge TTS endpoint of the local stand-in
+server, whose handshake delay models the TLS and websocket upgrade of a new
+connection to the real service. It compares:
+
+* ``per_request``: a new connection for every request, like
+  ``edge_tts.Communicate``
+* ``pooled``: ``EdgeTTSSessionPool`` reusing warm connections
+
+in two patterns: sentences synthesized one after another (streaming TTS)
+and batches of three concurrent sentence groups (long messages).
+
+``tts_session.py`` has no Home Assistant imports, so it is loaded by path::
+
+    python -m benchmarks.tts_session_bench
+    python -m benchmarks.tts_session_bench --tts-handshake 0.3 --requests 30 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import json
+from pathlib import Path
+import statistics
+import time
+from typing import Any
+import uuid
+
+import aiohttp
+
+from .standin_server import EDGE_TTS_PATH, StandInConfig, StandInServer
+
+SESSION_PATH = (
+    Path(__file__).parent.parent / "custom_components" / "ai_hub" / "tts_session.py"
+)
+VOICE = "zh-CN-XiaoxiaoNeural"
+BATCH = 3
+
+
+def _load_session_module() -> Any:
+    """Load the integration session pool without importing the package."""
+    spec = importlib.util.spec_from_file_location("ai_hub_tts_session", SESSION_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def _timed(pool: Any, text: str) -> tuple[float, float]:
+    """Return the first chunk and total time of one request."""
+    start = time.perf_counter()
+    first = None
+    async for _ in pool.async_stream(text, VOICE, "+0%", "+0%", "+0Hz"):
+        if first is None:
+            first = time.perf_counter() - start
+    return first or 0.0, time.perf_counter() - start
+
+
+async def run_pattern(
+    module: Any, session: aiohttp.ClientSession, base_url: str, pooled: bool, requests: int, batch: int
+) -> dict[str, Any]:
+    """Run ``requests`` requests in batches of ``batch`` concurrent ones."""
+    ws_url = base_url.replace("http", "ws", 1) + EDGE_TTS_PATH
+    pool = module.EdgeTTSSessionPool(
+        lambda: session,
+        lambda: (f"{ws_url}?ConnectionId={uuid.uuid4().hex}", {}),
+        idle_timeout=60,
+        max_idle=batch if pooled else 0,
+    )
+    timings: list[tuple[float, float]] = []
+    start = time.perf_counter()
+    for offset in range(0, requests, batch):
+        count = min(batch, requests - offset)
+        timings.extend(
+            await asyncio.gather(*(_timed(pool, f"第{offset + i}句。") for i in range(count)))
+        )
+    wall = time.perf_counter() - start
+    await pool.async_close()
+    return {
+        "first_chunk_ms": statistics.mean(t[0] for t in timings) * 1000,
+        "request_ms": statistics.mean(t[1] for t in timings) * 1000,
+        "wall_ms": wall * 1000,
+        "connections": pool.connects,
+    }
+
+
+async def run(config: StandInConfig, requests: int) -> dict[str, Any]:
+    """Run every pattern with and without pooling."""
+    module = _load_session_module()
+    server = StandInServer(config)
+    base_url = await server.async_start()
+    results: dict[str, Any] = {}
+    try:
+        async with aiohttp.ClientSession() as session:
+            for pattern, batch in (("sequential", 1), ("batched", BATCH)):
+                results[pattern] = {
+                    mode: await run_pattern(
+                        module, session, base_url, mode == "pooled", requests, batch
+                    )
+                    for mode in ("per_request", "pooled")
+                }
+    finally:
+        await server.async_stop()
+    return results
+
+
+def main() -> None:
+    """Run the TTS session benchmark."""
+    defaults = StandInConfig()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tts-handshake", type=float, default=defaults.tts_handshake)
+    parser.add_argument("--tts-latency", type=float, default=defaults.tts_latency)
+    parser.add_argument("--requests", type=int, default=12)
+    parser.add_argument("--json", action="store_true", help="print JSON")
+    args = parser.parse_args()
+
+    config = StandInConfig(tts_handshake=args.tts_handshake, tts_latency=args.tts_latency)
+    results = asyncio.run(run(config, args.requests))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'pattern':<11} {'mode':<12} {'first ms':>9} {'request ms':>11} {'wall ms':>8} {'conns':>6}")
+    for pattern, modes in results.items():
+        for mode, stage in modes.items():
+            print(
+                f"{pattern:<11} {mode:<12} {stage['first_chunk_ms']:>9.1f} "
+                f"{stage['request_ms']:>11.1f} {stage['wall_ms']:>8.0f} {stage['connections']:>6}"
+            )
+
+
+if __name__ == "__main__":
+    main()
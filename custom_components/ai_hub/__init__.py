@@ -4,11 +4,9 @@ from __future__ import annotations
 
 import logging
 
-import aiohttp
-
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_API_KEY, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.const import CONF_API_KEY, EVENT_HOMEASSISTANT_CLOSE, Platform
+from homeassistant.core import Event, HomeAssistant
 from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
 from homeassistant.config_entries import ConfigSubentry
 from homeassistant.helpers import config_entry_flow
@@ -28,60 +26,61 @@ from .const import (
     RECOMMENDED_CONVERSATION_OPTIONS,
     RECOMMENDED_TTS_OPTIONS,
     RECOMMENDED_STT_OPTIONS,
-    AI_HUB_CHAT_URL,
+    CONF_BEMFA_UID,
+    CONF_SILICONFLOW_API_KEY,
     get_localized_name,
 )
+from .client import AIHubClient
+from .validation import async_get_validation_cache, async_probe_api_key
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS = [Platform.CONVERSATION, Platform.AI_TASK, Platform.TTS, Platform.STT, Platform.BUTTON]
+PLATFORMS = [Platform.CONVERSATION, Platform.AI_TASK, Platform.TTS, Platform.STT, Platform.BUTTON, Platform.SENSOR]
 
-type AIHubConfigEntry = ConfigEntry[str]  # Store API key
+type AIHubConfigEntry = ConfigEntry[AIHubClient]
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: AIHubConfigEntry) -> bool:
     """Set up AI Hub from a config entry."""
 
-    # Get API key (may be None if not provided)
-    api_key = entry.data.get(CONF_API_KEY)
-
-    # Validate API key by testing API connection only if provided
-    if api_key and api_key.strip():
-        try:
-            # Test the connection with a simple API call
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            }
-            payload = {
-                "model": "GLM-4-Flash",
-                "messages": [{"role": "user", "content": "Hi"}],
-                "max_tokens": 10,
-            }
-
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    AI_HUB_CHAT_URL,
-                    json=payload,
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=10),
-                ) as response:
-                    if response.status == 401:
-                        raise ConfigEntryAuthFailed("Invalid API key")
-                    if response.status != 200:
-                        error_text = await response.text()
-                        raise ConfigEntryNotReady(f"API test failed: {error_text}")
-        except aiohttp.ClientError as err:
-            _LOGGER.error(f"Failed to connect to API: {err}")
-            raise ConfigEntryNotReady(f"Failed to connect: {err}") from err
-        except ConfigEntryAuthFailed:
-            raise
-        except Exception as err:
-            _LOGGER.error(f"API validation failed: {err}")
-            raise ConfigEntryNotReady(f"API validation failed: {err}") from err
-
-    # Store API key in runtime data
-    entry.runtime_data = api_key
+    # Get API keys (may be None if not provided)
+    client = AIHubClient(
+        hass,
+        entry.data.get(CONF_API_KEY),
+        entry.data.get(CONF_SILICONFLOW_API_KEY),
+        entry.data.get(CONF_BEMFA_UID),
+    )
+
+    # Validate API key only if provided
+    if client.has_api_key:
+        cache = async_get_validation_cache(hass)
+        if await cache.async_is_valid(entry.entry_id, client.api_key):
+            # 该密钥之前已校验通过：先启动实体，再在后台确认
+            entry.async_create_background_task(
+                hass,
+                _async_revalidate(hass, entry, client),
+                f"{DOMAIN} api key validation",
+            )
+        else:
+            valid = await async_probe_api_key(client)
+            if valid is False:
+                await client.async_close()
+                raise ConfigEntryAuthFailed("Invalid API key")
+            if valid is None:
+                await client.async_close()
+                raise ConfigEntryNotReady("Failed to connect to AI Hub API")
+            await cache.async_set(entry.entry_id, client.api_key, True)
+
+    # Store the shared client in runtime data
+    entry.runtime_data = client
+
+    async def _async_close_client(event: Event) -> None:
+        """Close the shared client when Home Assistant shuts down."""
+        await client.async_close()
+
+    entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_client)
+    )
 
     # Forward setup to platforms
     _LOGGER.info("Setting up AI Hub platforms: %s", PLATFORMS)
@@ -115,6 +114,23 @@ async def async_setup_entry(hass: HomeAssistant, entry: AIHubConfigEntry) -> boo
     return True
 
 
+async def _async_revalidate(
+    hass: HomeAssistant, entry: AIHubConfigEntry, client: AIHubClient
+) -> None:
+    """Re-check a cached API key and start reauth if it is now rejected."""
+    if await async_probe_api_key(client) is not False:
+        return
+
+    _LOGGER.warning("AI Hub API key was rejected, starting reauthentication")
+    await async_get_validation_cache(hass).async_set(entry.entry_id, None, False)
+    entry.async_start_reauth(hass)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the cached validation result of a removed entry."""
+    await async_get_validation_cache(hass).async_set(entry.entry_id, None, False)
+
+
 async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options update."""
     await hass.config_entries.async_reload(entry.entry_id)
@@ -126,7 +142,10 @@ async def async_unload_entry(hass: HomeAssistant, entry: AIHubConfigEntry) -> bo
     all_platforms = PLATFORMS.copy()
     if Platform.BUTTON not in all_platforms:
         all_platforms.append(Platform.BUTTON)
-    return await hass.config_entries.async_unload_platforms(entry, all_platforms)
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, all_platforms)
+    if unload_ok:
+        await entry.runtime_data.async_close()
+    return unload_ok
 
 
 async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
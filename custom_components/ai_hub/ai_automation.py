@@ -5,7 +5,6 @@ from __future__ import annotations
 import json
 import logging
 import os
-import yaml
 from typing import Any, Dict, List, Optional
 
 from homeassistant.core import HomeAssistant, ServiceCall
@@ -15,7 +14,9 @@ from homeassistant.helpers.storage import Store
 from homeassistant.util import dt as dt_util
 import voluptuous as vol
 
-from .const import DOMAIN
+from . import codec
+from .client import AIHubClient
+from .const import AI_HUB_CHAT_URL, DOMAIN, PRIORITY_TASK
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -155,11 +156,10 @@ mode: single
         """Call AI Hub API directly for YAML generation."""
         try:
             import aiohttp
-            import json
 
-            # 获取API密钥 - 从HASS配置中获取
-            api_key = self._get_api_key()
-            if not api_key:
+            # 获取共享客户端 - 从AI Hub配置条目中获取
+            client = self._get_client()
+            if client is None:
                 _LOGGER.error("No AI Hub API key available")
                 return None
 
@@ -179,61 +179,48 @@ mode: single
                 "temperature": 0.1  # 低温度以确保稳定的YAML输出
             }
 
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            }
-
             # 调用智谱AI API
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "https://open.bigmodel.cn/api/paas/v4/chat/completions",
-                    json=request_params,
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=30),
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        _LOGGER.error("API request failed: %s", error_text)
-                        return None
-
-                    response_data = await response.json()
-
-                    # 提取回复内容
-                    if "choices" in response_data and len(response_data["choices"]) > 0:
-                        content = response_data["choices"][0]["message"]["content"]
-                        _LOGGER.info("AI Hub response received for YAML generation")
-                        return content
-                    else:
-                        _LOGGER.error("Invalid response format from AI Hub")
-                        return None
+            async with client.post(
+                AI_HUB_CHAT_URL,
+                priority=PRIORITY_TASK,
+                json=request_params,
+                headers=client.zhipu_headers(),
+                timeout=aiohttp.ClientTimeout(total=30),
+            ) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    _LOGGER.error("API request failed: %s", error_text)
+                    return None
+
+                response_data = await response.json(loads=codec.loads)
+
+            # 提取回复内容
+            if "choices" in response_data and len(response_data["choices"]) > 0:
+                content = response_data["choices"][0]["message"]["content"]
+                _LOGGER.info("AI Hub response received for YAML generation")
+                return content
+            else:
+                _LOGGER.error("Invalid response format from AI Hub")
+                return None
 
         except Exception as e:
             _LOGGER.error("Error calling AI Hub API: %s", e)
             return None
 
-    def _get_api_key(self) -> Optional[str]:
-        """Get AI Hub API key from Home Assistant configuration."""
+    def _get_client(self) -> Optional[AIHubClient]:
+        """Get the shared AI Hub client from a loaded config entry."""
         try:
-            # 查找智谱AI的配置条目
-            from homeassistant.config_entries import ConfigEntries
-
-            config_entries: ConfigEntries = self.hass.config_entries
-            zhipuai_entries = config_entries.async_entries_for_domain("zhipuai")
-
-            if zhipuai_entries:
-                # 获取第一个智谱AI配置条目
-                entry = zhipuai_entries[0]
-                # API密钥存储在runtime_data中
-                api_key = entry.runtime_data
-                if api_key:
-                    return api_key
+            # 查找已加载且配置了API密钥的AI Hub配置条目
+            for entry in self.hass.config_entries.async_loaded_entries(DOMAIN):
+                client = getattr(entry, "runtime_data", None)
+                if isinstance(client, AIHubClient) and client.has_api_key:
+                    return client
 
             _LOGGER.warning("No AI Hub configuration found")
             return None
 
         except Exception as e:
-            _LOGGER.error("Error getting API key: %s", e)
+            _LOGGER.error("Error getting AI Hub client: %s", e)
             return None
 
     def _extract_yaml_from_response(self, response: str) -> Optional[str]:
@@ -5,27 +5,33 @@ from __future__ import annotations
 import base64
 import io
 import logging
-from json import JSONDecodeError, loads as json_loads
+from json import JSONDecodeError, dumps as json_dumps, loads as json_loads
 
 import aiohttp
+import voluptuous as vol
+from voluptuous_openapi import convert
 
 from homeassistant.components import ai_task, conversation
 from homeassistant.config_entries import ConfigEntry, ConfigSubentry
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import llm
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+from . import codec
 from .const import (
     CONF_CHAT_MODEL,
     CONF_IMAGE_MODEL,
     ERROR_GETTING_RESPONSE,
     IMAGE_SIZES,
+    PRIORITY_TASK,
     RECOMMENDED_AI_TASK_MODEL,
     RECOMMENDED_IMAGE_MODEL,
     RECOMMENDED_IMAGE_ANALYSIS_MODEL,
     VISION_MODELS,
 )
 from .entity import AIHubBaseLLMEntity
+from .singleflight import SingleFlight
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -60,6 +66,9 @@ class AIHubTaskEntity(
         default_model = subentry.data.get(CONF_CHAT_MODEL, RECOMMENDED_IMAGE_ANALYSIS_MODEL)
         super().__init__(entry, subentry, default_model)
 
+        # 合并相同的并发数据任务
+        self._flights = SingleFlight()
+
         # Start with basic features
         self._attr_supported_features = (
             ai_task.AITaskEntityFeature.GENERATE_DATA
@@ -88,50 +97,45 @@ class AIHubTaskEntity(
         chat_log: conversation.ChatLog,
     ) -> ai_task.GenDataTaskResult:
         """Handle a generate data task."""
-        # Get the actual model being used (may be auto-switched)
-        from .const import RECOMMENDED_IMAGE_ANALYSIS_MODEL
-        options = self.subentry.data
-        configured_model = options.get(CONF_CHAT_MODEL, self.default_model)
+        # Get the actual model being used (may be auto-switched for attachments)
+        configured_model = self.subentry.data.get(CONF_CHAT_MODEL, self.default_model)
+        final_model = self._get_model_config(chat_log)["model"]
 
-        # Check if we need to auto-switch for attachments
-        has_attachments = any(
-            hasattr(content, 'attachments') and content.attachments
-            for content in chat_log.content
-        )
+        _LOGGER.debug("AI Task using final model: %s (configured: %s)", final_model, configured_model)
 
-        final_model = configured_model
-        if has_attachments:
-            vision_models = ["glm-4.1v-thinking-flash", "glm-4v-flash"]  # Use free vision models
-            # Check if attachments contain media files
-            has_media_attachments = False
-            for content in chat_log.content:
-                if hasattr(content, 'attachments') and content.attachments:
-                    for attachment in content.attachments:
-                        mime_type = getattr(attachment, 'mime_type', '')
-                        if mime_type.startswith(('image/', 'video/')):
-                            has_media_attachments = True
-                            break
-                if has_media_attachments:
-                    break
-
-            if has_media_attachments and configured_model not in vision_models:
-                final_model = RECOMMENDED_IMAGE_ANALYSIS_MODEL  # GLM-4.1V-Thinking
-                _LOGGER.info("Auto-switched AI Task from %s to vision model %s for media attachments", configured_model, final_model)
-
-        _LOGGER.info("AI Task using final model: %s (configured: %s)", final_model, configured_model)
-
-        # Process chat log with optional structure
-        await self._async_handle_chat_log(chat_log, task.structure)
-
-        # Ensure the last message is from assistant
-        if not isinstance(chat_log.content[-1], conversation.AssistantContent):
-            _LOGGER.error(
-                "Last content in chat log is not an AssistantContent: %s. This could be due to the model not returning a valid response",
-                chat_log.content[-1],
-            )
-            raise HomeAssistantError(ERROR_GETTING_RESPONSE)
+        led = False
+
+        async def _generate() -> str:
+            """Run the request on this task's chat log."""
+            nonlocal led
+            led = True
 
-        text = chat_log.content[-1].content or ""
+            # Process chat log with optional structure
+            await self._async_handle_chat_log(chat_log, task.structure)
+
+            # Ensure the last message is from assistant
+            if not isinstance(chat_log.content[-1], conversation.AssistantContent):
+                _LOGGER.error(
+                    "Last content in chat log is not an AssistantContent: %s. This could be due to the model not returning a valid response",
+                    chat_log.content[-1],
+                )
+                raise HomeAssistantError(ERROR_GETTING_RESPONSE)
+
+            return chat_log.content[-1].content or ""
+
+        key = await self._async_request_key(chat_log, final_model, task.structure)
+        if key is None:
+            text = await _generate()
+        else:
+            text = await self._flights.run(key, _generate)
+            if not led:
+                # 重复请求共享了其他任务的结果，补充到自己的对话记录中
+                chat_log.async_add_assistant_content_without_tools(
+                    conversation.AssistantContent(
+                        agent_id=self.entity_id,
+                        content=text,
+                    )
+                )
 
         # If structure is requested, parse as JSON
         if task.structure:
@@ -172,6 +176,46 @@ class AIHubTaskEntity(
             data=text,
         )
 
+    async def _async_request_key(
+        self,
+        chat_log: conversation.ChatLog,
+        model: str,
+        structure: vol.Schema | None,
+    ) -> tuple | None:
+        """Return the single-flight key for a data task, or None to not coalesce.
+
+        Tasks that may call tools are never coalesced, since the tool calls
+        could have side effects. Attachments are identified by the attachment
+        cache key, so the files are not read here.
+        """
+        if chat_log.llm_api is not None:
+            return None
+
+        parts = []
+        for content in chat_log.content:
+            if content.role == "system":
+                continue
+            attachments = tuple(
+                [
+                    (
+                        attachment.mime_type,
+                        await self._client.attachments.async_file_key(str(attachment.path)),
+                    )
+                    for attachment in getattr(content, "attachments", None) or ()
+                ]
+            )
+            parts.append((content.role, getattr(content, "content", None), attachments))
+
+        structure_key = None
+        if structure is not None:
+            structure_key = json_dumps(
+                convert(structure, custom_serializer=llm.selector_serializer),
+                sort_keys=True,
+                default=str,
+            )
+
+        return (model, tuple(parts), structure_key)
+
     async def _async_generate_image(
         self,
         task: ai_task.GenImageTask,
@@ -195,55 +239,51 @@ class AIHubTaskEntity(
         _LOGGER.info("Generating image with model: %s, prompt: %s", image_model, user_message.content[:100])
 
         try:
-            # Call AI Hub image generation API via HTTP
-            headers = {
-                "Authorization": f"Bearer {self._api_key}",
-                "Content-Type": "application/json",
-            }
-
+            # Call AI Hub image generation API via the shared HTTP client
             from .const import AI_HUB_IMAGE_GEN_URL
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    AI_HUB_IMAGE_GEN_URL,
-                    json=request_params,
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=120),
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        _LOGGER.error("Image generation API failed: %s", error_text)
-                        raise HomeAssistantError(f"Image generation failed: {error_text}")
-
-                    result = await response.json()
-                    _LOGGER.debug("Image generation response: %s", result)
-
-                    if not result.get("data") or len(result["data"]) == 0:
-                        raise HomeAssistantError("No image data in response")
-
-                    image_data = result["data"][0]
-                    image_url = image_data.get("url")
-
-                    if image_url:
-                        # Download image from URL
-                        _LOGGER.info("Downloading image from URL: %s", image_url)
-                        async with session.get(image_url) as img_response:
-                            if img_response.status != 200:
-                                raise HomeAssistantError(
-                                    f"Failed to download image: {img_response.status}"
-                                )
-
-                            image_bytes = await img_response.read()
-                            _LOGGER.info("Successfully downloaded image, size: %d bytes", len(image_bytes))
-                    else:
-                        # Try to get base64 data if URL is not available
-                        b64_json = image_data.get("b64_json")
-                        if b64_json:
-                            _LOGGER.info("Using base64 image data")
-                            import base64
-                            image_bytes = base64.b64decode(b64_json)
-                        else:
-                            raise HomeAssistantError("No image URL or base64 data in response")
+            async with self._client.post(
+                AI_HUB_IMAGE_GEN_URL,
+                priority=PRIORITY_TASK,
+                json=request_params,
+                headers=self._client.zhipu_headers(),
+                timeout=aiohttp.ClientTimeout(total=120),
+            ) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    _LOGGER.error("Image generation API failed: %s", error_text)
+                    raise HomeAssistantError(f"Image generation failed: {error_text}")
+
+                result = await response.json(loads=codec.loads)
+                _LOGGER.debug("Image generation response: %s", result)
+
+            if not result.get("data") or len(result["data"]) == 0:
+                raise HomeAssistantError("No image data in response")
+
+            image_data = result["data"][0]
+            image_url = image_data.get("url")
+
+            if image_url:
+                # Download image from URL
+                _LOGGER.info("Downloading image from URL: %s", image_url)
+                async with self._client.get(
+                    image_url, timeout=aiohttp.ClientTimeout(total=60)
+                ) as img_response:
+                    if img_response.status != 200:
+                        raise HomeAssistantError(
+                            f"Failed to download image: {img_response.status}"
+                        )
+
+                    image_bytes = await img_response.read()
+                    _LOGGER.info("Successfully downloaded image, size: %d bytes", len(image_bytes))
+            else:
+                # Try to get base64 data if URL is not available
+                b64_json = image_data.get("b64_json")
+                if b64_json:
+                    _LOGGER.info("Using base64 image data")
+                    image_bytes = base64.b64decode(b64_json)
+                else:
+                    raise HomeAssistantError("No image URL or base64 data in response")
 
             # Convert to PNG for better compatibility
             try:
@@ -291,3 +331,4 @@ class AIHubTaskEntity(
         except Exception as err:
             _LOGGER.error("Error generating image: %s", err)
             raise HomeAssistantError(f"Error generating image: {err}") from err
+
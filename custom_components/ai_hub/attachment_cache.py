@@ -0,0 +1,93 @@
+"""Content-addressed cache of base64-encoded attachments."""
+
+from __future__ import annotations
+
+import base64
+from collections import OrderedDict
+from collections.abc import Hashable
+import hashlib
+import os
+from pathlib import Path
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import ATTACHMENT_CACHE_MAX_BYTES
+
+
+def _read_file(path: str) -> bytes:
+    return Path(path).read_bytes()
+
+
+class AttachmentCache:
+    """LRU cache of base64-encoded attachment data within a memory budget.
+
+    Files are keyed by path, modification time and size, so an unchanged file
+    is neither read nor encoded again. Data that is only available as bytes
+    (media source downloads, inline content) is keyed by its SHA-256 hash,
+    which saves the encoding.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_bytes: int = ATTACHMENT_CACHE_MAX_BYTES) -> None:
+        """Initialize the cache."""
+        self.hass = hass
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, str] = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key: Hashable) -> str | None:
+        if (value := self._entries.get(key)) is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+        return value
+
+    def _put(self, key: Hashable, value: str) -> None:
+        if len(value) > self._max_bytes:
+            return
+        if (old := self._entries.pop(key, None)) is not None:
+            self._size -= len(old)
+        self._entries[key] = value
+        self._size += len(value)
+        while self._size > self._max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    async def async_file_key(self, path: str) -> tuple[str, str, int, int]:
+        """Return the key of a file: its path, modification time and size."""
+        stat = await self.hass.async_add_executor_job(os.stat, path)
+        return ("file", path, stat.st_mtime_ns, stat.st_size)
+
+    async def async_encode_file(self, path: str) -> str:
+        """Return the base64 encoding of a file, reading it only if it changed."""
+        key = await self.async_file_key(path)
+        if (encoded := self._get(key)) is not None:
+            return encoded
+
+        data = await self.hass.async_add_executor_job(_read_file, path)
+        encoded = base64.b64encode(data).decode()
+        self._put(key, encoded)
+        return encoded
+
+    def encode_bytes(self, data: bytes) -> str:
+        """Return the base64 encoding of data, reusing an earlier encoding."""
+        key = ("sha256", hashlib.sha256(data).digest())
+        if (encoded := self._get(key)) is not None:
+            return encoded
+
+        encoded = base64.b64encode(data).decode()
+        self._put(key, encoded)
+        return encoded
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return cache statistics for diagnostics."""
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self._max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,165 @@
+"""Output format negotiation and PCM conversion for Edge TTS audio.
+
+This module has no Home Assistant imports so the benchmarks can load it by
+path.
+"""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+import struct
+import sys
+
+OUTPUT_FORMAT_MP3 = "audio-24khz-48kbitrate-mono-mp3"
+
+# Edge TTS 原生支持的 16 位单声道 PCM 采样率
+_EDGE_PCM_FORMATS = {
+    8000: "raw-8khz-16bit-mono-pcm",
+    16000: "raw-16khz-16bit-mono-pcm",
+    22050: "raw-22050hz-16bit-mono-pcm",
+    24000: "raw-24khz-16bit-mono-pcm",
+    44100: "raw-44100hz-16bit-mono-pcm",
+    48000: "raw-48khz-16bit-mono-pcm",
+}
+DEFAULT_PCM_RATE = 24000
+SAMPLE_BYTES = 2
+
+# 流式输出时数据长度未知，按 ffmpeg 等读取方的约定写最大值
+_UNKNOWN_SIZE = 0xFFFFFFFF
+
+
+@dataclass(frozen=True, slots=True)
+class AudioOutput:
+    """Audio format returned to Home Assistant and how Edge TTS produces it."""
+
+    extension: str
+    edge_format: str
+    source_rate: int | None = None
+    sample_rate: int | None = None
+    channels: int = 1
+
+    @property
+    def is_pcm(self) -> bool:
+        """Return True if Edge TTS produces raw PCM for this output."""
+        return self.source_rate is not None
+
+
+MP3_OUTPUT = AudioOutput("mp3", OUTPUT_FORMAT_MP3)
+
+
+def negotiate_output(
+    preferred_format: str | None,
+    sample_rate: int | None = None,
+    channels: int | None = None,
+) -> AudioOutput:
+    """Return the output for a requested format, sample rate and channel count.
+
+    WAV is served from Edge TTS raw PCM at the requested rate when the service
+    has it, otherwise from the next higher rate resampled in process. Mono is
+    duplicated for stereo. Every other format is served as MP3, which is what
+    Edge TTS produces natively.
+    """
+    if preferred_format != "wav":
+        return MP3_OUTPUT
+    rate = int(sample_rate or DEFAULT_PCM_RATE)
+    source_rate = min(
+        (native for native in _EDGE_PCM_FORMATS if native >= rate),
+        default=max(_EDGE_PCM_FORMATS),
+    )
+    return AudioOutput(
+        "wav",
+        _EDGE_PCM_FORMATS[source_rate],
+        source_rate,
+        rate,
+        2 if channels == 2 else 1,
+    )
+
+
+def wav_header(sample_rate: int, channels: int, data_size: int | None = None) -> bytes:
+    """Return a 16-bit PCM WAV header; without a size the stream is open ended."""
+    block_align = channels * SAMPLE_BYTES
+    size = _UNKNOWN_SIZE if data_size is None else data_size
+    riff_size = _UNKNOWN_SIZE if data_size is None else 36 + data_size
+    return (
+        struct.pack("<4sI4s", b"RIFF", riff_size, b"WAVE")
+        + struct.pack(
+            "<4sIHHIIHH",
+            b"fmt ",
+            16,
+            1,
+            channels,
+            sample_rate,
+            sample_rate * block_align,
+            block_align,
+            SAMPLE_BYTES * 8,
+        )
+        + struct.pack("<4sI", b"data", size)
+    )
+
+
+class PcmConverter:
+    """Convert 16-bit mono PCM chunks to the negotiated rate and channels.
+
+    Chunks may end in the middle of a sample, and resampling keeps its
+    position across chunks, so feeding a stream in any split gives the same
+    output as converting it at once. Resampling is linear interpolation,
+    which is enough for speech played on a satellite speaker.
+    """
+
+    def __init__(self, output: AudioOutput) -> None:
+        """Initialize the converter."""
+        self._channels = output.channels
+        # 位置以 1/目标采样率 为单位计数，避免浮点误差随块数累积
+        self._step = output.source_rate or 1
+        self._scale = output.sample_rate or self._step
+        self._pending = b""
+        # 上一个块的最后一个采样和下一个输出采样的位置（相对当前块开头）
+        self._last: int | None = None
+        self._position = 0
+
+    def feed(self, data: bytes) -> bytes:
+        """Convert a chunk and return the converted samples."""
+        data = self._pending + data
+        usable = len(data) - len(data) % SAMPLE_BYTES
+        self._pending = data[usable:]
+        if not usable:
+            return b""
+        samples = array("h", data[:usable])
+        if sys.byteorder == "big":
+            samples.byteswap()
+
+        if self._step != self._scale:
+            samples = self._resample(samples)
+        if self._channels == 2:
+            stereo = array("h", bytes(len(samples) * 2 * SAMPLE_BYTES))
+            stereo[0::2] = samples
+            stereo[1::2] = samples
+            samples = stereo
+
+        if sys.byteorder == "big":
+            samples.byteswap()
+        return samples.tobytes()
+
+    def _resample(self, samples: array) -> array:
+        # 在上一个块的最后一个采样后接上当前块，插值可以跨越块边界
+        scale = self._scale
+        if self._last is not None:
+            source = array("h", [self._last])
+            source.extend(samples)
+            position = self._position + scale
+        else:
+            source = samples
+            position = self._position
+        out = array("h")
+        step = self._step
+        end = (len(source) - 1) * scale
+        while position < end:
+            index, frac = divmod(position, scale)
+            first = source[index]
+            out.append(first + (source[index + 1] - first) * frac // scale)
+            position += step
+        self._last = source[-1]
+        # 下一个块的开头对应 source 末尾之后的位置
+        self._position = position - end - scale
+        return out
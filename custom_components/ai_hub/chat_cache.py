@@ -0,0 +1,115 @@
+"""Per-conversation cache of converted chat log content."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import time
+from typing import Any
+
+from homeassistant.components import conversation
+
+from .const import CHAT_CACHE_MAX_CONVERSATIONS, CHAT_CACHE_TTL
+
+
+def _has_media(content: conversation.Content) -> bool:
+    """Return True if the content carries image or video attachments."""
+    attachments = getattr(content, "attachments", None)
+    if not attachments:
+        return False
+    return any(
+        (getattr(attachment, "mime_type", "") or "").startswith(("image/", "video/"))
+        for attachment in attachments
+    )
+
+
+@dataclass(slots=True)
+class CachedContent:
+    """One chat log content, its converted API message and token estimate."""
+
+    content: conversation.Content
+    has_media: bool
+    message: dict[str, Any] | None = None
+    tokens: int = 0
+
+
+class _Conversation:
+    """Cached content of one conversation."""
+
+    def __init__(self) -> None:
+        self.items: list[CachedContent] = []
+        self.media_count = 0
+        self.last_used = 0.0
+
+    def sync(self, contents: list[conversation.Content]) -> list[CachedContent]:
+        """Align the cache with the chat log content.
+
+        Content objects are matched by identity at the same position: HA
+        appends to the chat log and keeps the objects of earlier turns, so
+        only new or replaced content (for example the system prompt, which is
+        rebuilt every turn) gets a fresh entry.
+        """
+        old = self.items
+        items: list[CachedContent] = []
+        media_count = 0
+        for index, content in enumerate(contents):
+            if index < len(old) and old[index].content is content:
+                item = old[index]
+            else:
+                item = CachedContent(content, _has_media(content))
+            media_count += item.has_media
+            items.append(item)
+        self.items = items
+        self.media_count = media_count
+        return items
+
+
+class ChatLogCache:
+    """Converted messages and an attachment index per ``conversation_id``.
+
+    Conversations unused for ``CHAT_CACHE_TTL`` seconds are evicted, as are
+    the least recently used ones beyond ``CHAT_CACHE_MAX_CONVERSATIONS``.
+    """
+
+    def __init__(
+        self,
+        ttl: float = CHAT_CACHE_TTL,
+        max_conversations: int = CHAT_CACHE_MAX_CONVERSATIONS,
+    ) -> None:
+        """Initialize the cache."""
+        self._ttl = ttl
+        self._max_conversations = max_conversations
+        self._conversations: OrderedDict[str, _Conversation] = OrderedDict()
+
+    def _get(self, chat_log: conversation.ChatLog) -> _Conversation:
+        """Return the cache of a chat log, evicting expired conversations."""
+        now = time.monotonic()
+        while self._conversations:
+            oldest_id, oldest = next(iter(self._conversations.items()))
+            if now - oldest.last_used < self._ttl:
+                break
+            del self._conversations[oldest_id]
+
+        conversation_id = chat_log.conversation_id
+        if (cached := self._conversations.get(conversation_id)) is None:
+            cached = self._conversations[conversation_id] = _Conversation()
+            while len(self._conversations) > self._max_conversations:
+                self._conversations.popitem(last=False)
+        else:
+            self._conversations.move_to_end(conversation_id)
+        cached.last_used = now
+        return cached
+
+    def sync(self, chat_log: conversation.ChatLog) -> list[CachedContent]:
+        """Return the cached entries for every content of the chat log."""
+        return self._get(chat_log).sync(chat_log.content)
+
+    def has_media_attachments(self, chat_log: conversation.ChatLog) -> bool:
+        """Return True if any content of the chat log has image or video attachments."""
+        cached = self._get(chat_log)
+        cached.sync(chat_log.content)
+        return cached.media_count > 0
+
+    def __len__(self) -> int:
+        """Return the number of cached conversations."""
+        return len(self._conversations)
@@ -0,0 +1,288 @@
+"""Shared HTTP client for the AI Hub integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
+import logging
+import time
+from typing import Any
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util.ssl import get_default_context
+
+from . import codec
+from .const import (
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST,
+    PRIORITY_INTERACTIVE,
+    STT_PREWARM_INTERVAL,
+    STT_PREWARM_TIMEOUT,
+)
+from .attachment_cache import AttachmentCache
+from .metrics import MetricsRegistry, StageTimer
+from .request_trace import RequestTrace, RequestTracer
+from .scheduler import RequestScheduler
+from .tool_cache import ToolSchemaCache
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AIHubClient:
+    """Per config entry client owning a pooled keep-alive HTTP session.
+
+    Every outbound call of the integration (Zhipu, SiliconFlow, Bemfa) goes
+    through the same session so TCP/TLS connections and DNS lookups are reused
+    between requests instead of being set up again on every turn.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api_key: str | None,
+        siliconflow_api_key: str | None = None,
+        bemfa_uid: str | None = None,
+        url_overrides: dict[str, str] | None = None,
+    ) -> None:
+        """Initialize the client."""
+        self.hass = hass
+        self.api_key = api_key
+        self.siliconflow_api_key = siliconflow_api_key
+        self.bemfa_uid = bemfa_uid
+        # origin -> 替换 origin，例如把请求指向本地替身服务做基准测试
+        self.url_overrides = url_overrides or {}
+        self._session: aiohttp.ClientSession | None = None
+        self.scheduler = RequestScheduler()
+        self.metrics = MetricsRegistry(hass)
+        self.tracer = RequestTracer()
+        self.attachments = AttachmentCache(hass)
+        self.tool_schemas = ToolSchemaCache()
+        # origin -> 最近一次预热完成的 monotonic 时间
+        self._warmed: dict[str, float] = {}
+
+    @property
+    def has_api_key(self) -> bool:
+        """Return True if a Zhipu API key is configured."""
+        return bool(self.api_key and self.api_key.strip())
+
+    @property
+    def has_siliconflow_api_key(self) -> bool:
+        """Return True if a SiliconFlow API key is configured."""
+        return bool(self.siliconflow_api_key and self.siliconflow_api_key.strip())
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Return the pooled session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=HTTP_POOL_LIMIT,
+                limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+                ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+                keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+                enable_cleanup_closed=True,
+                ssl=get_default_context(),
+            )
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_connection_create_end.append(_async_on_connection_ready)
+            trace_config.on_connection_reuseconn.append(_async_on_connection_ready)
+            self._session = aiohttp.ClientSession(
+                connector=connector, trace_configs=[trace_config]
+            )
+        return self._session
+
+    def zhipu_headers(self) -> dict[str, str]:
+        """Return request headers for the Zhipu API."""
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+    def siliconflow_headers(self) -> dict[str, str]:
+        """Return request headers for the SiliconFlow API.
+
+        Content-Type is left to aiohttp so multipart boundaries are set correctly.
+        """
+        return {"Authorization": f"Bearer {self.siliconflow_api_key}"}
+
+    @asynccontextmanager
+    async def post(
+        self,
+        url: str,
+        *,
+        priority: int = PRIORITY_INTERACTIVE,
+        timer: StageTimer | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Issue a POST request on the pooled session.
+
+        The request waits for a slot of its priority class in the provider
+        scheduler, and holds it until the response has been consumed. If a
+        timer is given, the queue, connect and ttfb stages are marked on it.
+        A ``json=`` payload is encoded to bytes once with the integration codec.
+        """
+        trace = self.tracer.start(
+            "POST", url, priority, kwargs.get("json", kwargs.get("data"))
+        )
+        if "json" in kwargs:
+            kwargs["data"] = codec.dumps(kwargs.pop("json"))
+            kwargs["headers"] = {
+                "Content-Type": codec.JSON_CONTENT_TYPE,
+                **(kwargs.get("headers") or {}),
+            }
+        async with self.scheduler.slot(url, priority):
+            if timer is not None:
+                timer.mark("queue")
+            async with self._traced(trace), self.session.post(
+                self._resolve(url), trace_request_ctx=timer, **kwargs
+            ) as response:
+                if timer is not None:
+                    timer.mark("ttfb")
+                if trace is not None:
+                    trace.response(response.status)
+                yield response
+
+    @asynccontextmanager
+    async def get(
+        self, url: str, *, priority: int = PRIORITY_INTERACTIVE, **kwargs: Any
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Issue a GET request on the pooled session."""
+        trace = self.tracer.start("GET", url, priority, kwargs.get("params"))
+        async with self.scheduler.slot(url, priority):
+            async with self._traced(trace), self.session.get(
+                self._resolve(url), **kwargs
+            ) as response:
+                if trace is not None:
+                    trace.response(response.status)
+                yield response
+
+    @staticmethod
+    @asynccontextmanager
+    async def _traced(trace: RequestTrace | None) -> AsyncIterator[None]:
+        """Log the end of a sampled request, including failures."""
+        if trace is None:
+            yield
+            return
+        try:
+            yield
+        except BaseException as err:
+            trace.finish(err)
+            raise
+        trace.finish()
+
+    def _resolve(self, url: str) -> str:
+        """Apply ``url_overrides`` to a URL."""
+        if not self.url_overrides:
+            return url
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        if (target := self.url_overrides.get(origin)) is not None:
+            return target + url[len(origin):]
+        return url
+
+    async def async_post_json(
+        self,
+        url: str,
+        payload: dict[str, Any],
+        headers: dict[str, str],
+        timeout: float,
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> Any:
+        """POST a JSON payload and return the decoded JSON response."""
+        async with self.post(
+            url,
+            priority=priority,
+            json=payload,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        ) as response:
+            response.raise_for_status()
+            return await response.json(loads=codec.loads)
+
+    def post_json_blocking(
+        self,
+        url: str,
+        payload: dict[str, Any],
+        headers: dict[str, str],
+        timeout: float,
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> Any:
+        """POST a JSON payload from a worker thread using the shared session.
+
+        Must not be called from the event loop thread.
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self.async_post_json(url, payload, headers, timeout, priority),
+            self.hass.loop,
+        ).result()
+
+    async def async_warm_up(
+        self, urls: Iterable[str], max_age: float = STT_PREWARM_INTERVAL
+    ) -> None:
+        """Open keep-alive connections to the origins of the given URLs.
+
+        A lightweight HEAD request is sent to each origin so DNS, TCP and TLS
+        setup happen now and the connection is parked in the pool. Origins
+        warmed less than ``max_age`` seconds ago are skipped.
+        """
+        now = time.monotonic()
+        origins: list[str] = []
+        for url in urls:
+            parts = urlsplit(url)
+            origin = f"{parts.scheme}://{parts.netloc}/"
+            if origin in origins or now - self._warmed.get(origin, 0) < max_age:
+                continue
+            origins.append(origin)
+
+        if origins:
+            await asyncio.gather(*(self._async_warm_origin(o) for o in origins))
+
+    async def _async_warm_origin(self, origin: str) -> None:
+        """Send a HEAD request to an origin; any HTTP status counts as warm."""
+        try:
+            async with self.session.head(
+                self._resolve(origin),
+                allow_redirects=False,
+                timeout=aiohttp.ClientTimeout(total=STT_PREWARM_TIMEOUT),
+            ) as response:
+                await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            _LOGGER.debug("Connection pre-warm to %s failed: %s", origin, err)
+            return
+        self._warmed[origin] = time.monotonic()
+        _LOGGER.debug("Connection pre-warmed: %s", origin)
+
+    async def async_keep_warm(
+        self, urls: Iterable[str], interval: float = STT_PREWARM_INTERVAL
+    ) -> None:
+        """Warm the given URLs and refresh them every ``interval`` seconds.
+
+        Runs until cancelled; meant to live for the duration of a voice
+        pipeline run.
+        """
+        urls = list(urls)
+        while True:
+            await self.async_warm_up(urls, max_age=interval)
+            await asyncio.sleep(interval)
+
+    async def async_close(self) -> None:
+        """Close the pooled session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+async def _async_on_connection_ready(
+    session: aiohttp.ClientSession,
+    trace_config_ctx: Any,
+    params: Any,
+) -> None:
+    """Mark the connect stage once a new or pooled connection is ready."""
+    timer = trace_config_ctx.trace_request_ctx
+    if isinstance(timer, StageTimer):
+        timer.mark("connect")
@@ -0,0 +1,93 @@
+"""JSON codec for AI Hub request bodies and API responses.
+
+Uses orjson when it is installed (Home Assistant ships it) and falls back to
+the standard library otherwise. Request bodies are encoded once to UTF-8
+bytes; both codecs produce the same compact JSON without ASCII escaping.
+
+Values of a top-level object can be wrapped in ``RawJSON`` to reuse their
+encoding across requests, for example the tool definitions.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - Home Assistant depends on orjson
+    orjson = None
+
+JSON_CONTENT_TYPE = "application/json"
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    """Encode an object to JSON bytes with the standard library."""
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def _dumps(obj: Any) -> bytes:
+        """Encode an object to JSON bytes."""
+        try:
+            return orjson.dumps(obj, option=_ORJSON_OPTIONS)
+        except TypeError:
+            # orjson 不支持的类型（例如超过 64 位的整数）交给标准库处理
+            return _stdlib_dumps(obj)
+
+    def loads(data: str | bytes | bytearray | memoryview) -> Any:
+        """Decode JSON from text or bytes.
+
+        Raises ``orjson.JSONDecodeError``, a subclass of
+        ``json.JSONDecodeError``, on invalid input.
+        """
+        return orjson.loads(data)
+
+else:
+    _dumps = _stdlib_dumps
+
+    def loads(data: str | bytes | bytearray | memoryview) -> Any:
+        """Decode JSON from text or bytes."""
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
+
+
+class RawJSON:
+    """A value encoded once and spliced into later ``dumps`` results as is."""
+
+    __slots__ = ("encoded", "value")
+
+    def __init__(self, value: Any) -> None:
+        """Encode the value."""
+        self.value = value
+        self.encoded = _dumps(value)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode an object to JSON bytes.
+
+    ``RawJSON`` values of a top-level dict are copied into the output without
+    being encoded again.
+    """
+    if not isinstance(obj, dict) or not any(
+        isinstance(value, RawJSON) for value in obj.values()
+    ):
+        return _dumps(obj)
+
+    encoded = _dumps(
+        {key: value for key, value in obj.items() if not isinstance(value, RawJSON)}
+    )
+    raw = b",".join(
+        _dumps(str(key)) + b":" + value.encoded
+        for key, value in obj.items()
+        if isinstance(value, RawJSON)
+    )
+    if encoded == b"{}":
+        return b"{" + raw + b"}"
+    return encoded[:-1] + b"," + raw + b"}"
+
+
+NAME = "orjson" if orjson is not None else "json"
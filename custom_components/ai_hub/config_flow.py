@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from collections.abc import Mapping
 import logging
 from types import MappingProxyType
 from typing import Any
@@ -20,6 +21,7 @@ from homeassistant.config_entries import (
 from homeassistant.const import CONF_API_KEY, CONF_NAME
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import llm, selector
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.selector import (
     NumberSelector,
     NumberSelectorConfig,
@@ -36,13 +38,16 @@ from .const import (
     CONF_IMAGE_MODEL,
     CONF_SILICONFLOW_API_KEY,
     CONF_CUSTOM_COMPONENTS_PATH,
+    CONF_EARLY_TOOL_CALLS,
     CONF_FORCE_TRANSLATION,
     CONF_TARGET_COMPONENT,
     CONF_LIST_COMPONENTS,
     CONF_LLM_HASS_API,
     CONF_MAX_HISTORY_MESSAGES,
     CONF_MAX_TOKENS,
+    CONF_PARALLEL_TOOL_CALLS,
     CONF_PROMPT,
+    CONF_PROMPT_TOKEN_BUDGET,
     CONF_RECOMMENDED,
     CONF_TEMPERATURE,
     CONF_TOP_K,
@@ -53,6 +58,8 @@ from .const import (
     CONF_TTS_RATE,
     CONF_TTS_VOLUME,
     CONF_TTS_PITCH,
+    CONF_TTS_WARMUP_PHRASES,
+    DEFAULT_TTS_WARMUP_PHRASES,
     DEFAULT_AI_TASK_NAME,
     DEFAULT_CONVERSATION_NAME,
     DEFAULT_TITLE,
@@ -69,6 +76,7 @@ from .const import (
     RECOMMENDED_IMAGE_MODEL,
     RECOMMENDED_MAX_HISTORY_MESSAGES,
     RECOMMENDED_MAX_TOKENS,
+    RECOMMENDED_PROMPT_TOKEN_BUDGET,
     RECOMMENDED_TEMPERATURE,
     RECOMMENDED_TOP_K,
     RECOMMENDED_TOP_P,
@@ -80,7 +88,6 @@ from .const import (
     AI_HUB_CHAT_MODELS,
     AI_HUB_CHAT_URL,
     AI_HUB_IMAGE_MODELS,
-    EDGE_TTS_VOICES,
     RECOMMENDED_CONVERSATION_OPTIONS,
     RECOMMENDED_AI_TASK_OPTIONS,
     RECOMMENDED_STT_OPTIONS,
@@ -91,8 +98,11 @@ from .const import (
     RECOMMENDED_STT_MODEL,
     DEFAULT_STT_NAME,
     CONF_STT_MODEL,
+    CONF_STT_PREWARM,
+    DEFAULT_STT_PREWARM,
     SILICONFLOW_STT_MODELS,
 )
+from .voice_catalog import async_get_voice_catalog_store
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -116,18 +126,19 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> None:
             "max_tokens": 10,
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                AI_HUB_CHAT_URL,
-                json=payload,
-                headers=headers,
-                timeout=aiohttp.ClientTimeout(total=10),
-            ) as response:
-                if response.status == 401:
-                    raise ValueError("Invalid API key")
-                if response.status != 200:
-                    error_text = await response.text()
-                    raise Exception(f"API test failed: {error_text}")
+        # 配置流程尚无配置条目，复用 HA 共享的会话而不是新建连接池
+        session = async_get_clientsession(hass)
+        async with session.post(
+            AI_HUB_CHAT_URL,
+            json=payload,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=10),
+        ) as response:
+            if response.status == 401:
+                raise ValueError("Invalid API key")
+            if response.status != 200:
+                error_text = await response.text()
+                raise Exception(f"API test failed: {error_text}")
 
 
 class AIHubConfigFlow(ConfigFlow, domain=DOMAIN):
@@ -217,6 +228,43 @@ class AIHubConfigFlow(ConfigFlow, domain=DOMAIN):
             },
         )
 
+    async def async_step_reauth(
+        self, entry_data: Mapping[str, Any]
+    ) -> ConfigFlowResult:
+        """Handle an API key rejected by the background validation."""
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Ask for a new Zhipu API key."""
+        errors = {}
+
+        if user_input is not None:
+            try:
+                await validate_input(self.hass, user_input)
+            except ValueError:
+                _LOGGER.exception("Invalid API key")
+                errors["base"] = "invalid_auth"
+            except aiohttp.ClientError:
+                _LOGGER.exception("Cannot connect")
+                errors["base"] = "cannot_connect"
+            except Exception:
+                _LOGGER.exception("Unexpected exception")
+                errors["base"] = "unknown"
+            else:
+                return self.async_update_reload_and_abort(
+                    self._get_reauth_entry(), data_updates=user_input
+                )
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=vol.Schema({vol.Required(CONF_API_KEY): str}),
+            errors=errors,
+            description_placeholders={
+                "api_key_url": "https://open.bigmodel.cn/usercenter/apikeys"
+            },
+        )
 
     @classmethod
     def async_get_supported_subentry_types(
@@ -304,7 +352,7 @@ class AIHubSubentryFlowHandler(ConfigSubentryFlow):
 
         # Build schema based on current options
         schema = await ai_hub_config_option_schema(
-            self._is_new, self._subentry_type, self.options
+            self.hass, self._is_new, self._subentry_type, self.options
         )
 
         return self.async_show_form(
@@ -320,6 +368,7 @@ class AIHubSubentryFlowHandler(ConfigSubentryFlow):
 
 
 async def ai_hub_config_option_schema(
+    hass: HomeAssistant,
     is_new: bool,
     subentry_type: str,
     options: Mapping[str, Any],
@@ -449,6 +498,21 @@ async def ai_hub_config_option_schema(
                 default=options.get(CONF_MAX_HISTORY_MESSAGES, RECOMMENDED_MAX_HISTORY_MESSAGES),
                 description={"suggested_value": options.get(CONF_MAX_HISTORY_MESSAGES)},
             ): int,
+            vol.Optional(
+                CONF_PROMPT_TOKEN_BUDGET,
+                default=options.get(CONF_PROMPT_TOKEN_BUDGET, RECOMMENDED_PROMPT_TOKEN_BUDGET),
+                description={"suggested_value": options.get(CONF_PROMPT_TOKEN_BUDGET)},
+            ): int,
+            vol.Optional(
+                CONF_PARALLEL_TOOL_CALLS,
+                default=options.get(CONF_PARALLEL_TOOL_CALLS, False),
+                description={"suggested_value": options.get(CONF_PARALLEL_TOOL_CALLS)},
+            ): bool,
+            vol.Optional(
+                CONF_EARLY_TOOL_CALLS,
+                default=options.get(CONF_EARLY_TOOL_CALLS, False),
+                description={"suggested_value": options.get(CONF_EARLY_TOOL_CALLS)},
+            ): bool,
             vol.Optional(
                 CONF_WEB_SEARCH,
                 default=options.get(CONF_WEB_SEARCH, False),
@@ -504,27 +568,18 @@ async def ai_hub_config_option_schema(
         })
 
     elif subentry_type == "tts":
-        # Create language options from unique languages in EDGE_TTS_VOICES
-        unique_languages = sorted(list(set(EDGE_TTS_VOICES.values())))
+        # Language and voice options come from the Edge TTS voice catalog
+        catalog = await async_get_voice_catalog_store(hass).async_load()
+        unique_languages = catalog.locales
 
         # Create voice options grouped by language for better UX
         voice_options = []
-        # Group voices by language
-        languages = {}
-        for voice_id, lang_code in EDGE_TTS_VOICES.items():
-            if lang_code not in languages:
-                languages[lang_code] = []
-            languages[lang_code].append(voice_id)
-
-        # Sort voices within each language and create grouped options
-        for lang_code in sorted(languages.keys()):
+        for lang_code in unique_languages:
             # Add language separator
             voice_options.append({"separator": True, "label": f"--- {lang_code.upper()} ---"})
             # Add voices for this language
-            for voice_id in sorted(languages[lang_code]):
-                # Extract voice name for display
-                voice_name = voice_id.replace(f"{lang_code}-", "")
-                voice_options.append({"value": voice_id, "label": f"{voice_name} ({lang_code})"})
+            for voice in catalog.voices(lang_code):
+                voice_options.append({"value": voice.voice_id, "label": voice.label})
 
         schema.update({
             vol.Optional(
@@ -564,6 +619,11 @@ async def ai_hub_config_option_schema(
                 default=options.get(CONF_TTS_PITCH, TTS_DEFAULT_PITCH),
                 description={"suggested_value": options.get(CONF_TTS_PITCH)},
             ): str,
+            vol.Optional(
+                CONF_TTS_WARMUP_PHRASES,
+                default=options.get(CONF_TTS_WARMUP_PHRASES, DEFAULT_TTS_WARMUP_PHRASES),
+                description={"suggested_value": options.get(CONF_TTS_WARMUP_PHRASES)},
+            ): selector.TextSelector(selector.TextSelectorConfig(multiline=True)),
         })
 
     elif subentry_type == "stt":
@@ -578,6 +638,11 @@ async def ai_hub_config_option_schema(
                     mode=SelectSelectorMode.DROPDOWN,
                 )
             ),
+            vol.Optional(
+                CONF_STT_PREWARM,
+                default=options.get(CONF_STT_PREWARM, DEFAULT_STT_PREWARM),
+                description={"suggested_value": options.get(CONF_STT_PREWARM)},
+            ): bool,
         })
 
     elif subentry_type == "wechat":
@@ -5,6 +5,7 @@ from __future__ import annotations
 import logging
 from typing import Final
 
+from homeassistant.const import PERCENTAGE
 from homeassistant.core import HomeAssistant
 
 # Import llm for API constants
@@ -34,81 +35,6 @@ def get_localized_name(hass: HomeAssistant, zh_name: str, en_name: str) -> str:
         return en_name
 
 
-def _build_edge_tts_languages() -> dict:
-    """从EDGE_TTS_VOICES构建语言映射，避免重复维护."""
-    languages = {}
-    for voice_id, lang_code in EDGE_TTS_VOICES.items():
-        # 提取语音名称（去掉语言代码后缀）
-        voice_name = voice_id.replace(f"{lang_code}-", "")
-
-        if lang_code not in languages:
-            # 获取本地化语言名称
-            if lang_code == "zh-CN":
-                lang_name = "中文（简体）"
-            elif lang_code == "en-US":
-                lang_name = "English (US)"
-            elif lang_code == "en-GB":
-                lang_name = "English (UK)"
-            elif lang_code == "ja-JP":
-                lang_name = "日本語"
-            elif lang_code == "ko-KR":
-                lang_name = "한국어"
-            elif lang_code == "fr-FR":
-                lang_name = "Français"
-            elif lang_code == "de-DE":
-                lang_name = "Deutsch"
-            elif lang_code == "es-ES":
-                lang_name = "Español"
-            elif lang_code == "it-IT":
-                lang_name = "Italiano"
-            elif lang_code == "pt-BR":
-                lang_name = "Português (Brasil)"
-            elif lang_code == "ru-RU":
-                lang_name = "Русский"
-            elif lang_code == "ar-SA":
-                lang_name = "العربية"
-            elif lang_code == "hi-IN":
-                lang_name = "हिन्दी"
-            elif lang_code == "th-TH":
-                lang_name = "ไทย"
-            elif lang_code == "vi-VN":
-                lang_name = "Tiếng Việt"
-            elif lang_code == "id-ID":
-                lang_name = "Bahasa Indonesia"
-            elif lang_code == "ms-MY":
-                lang_name = "Bahasa Melayu"
-            elif lang_code == "tr-TR":
-                lang_name = "Türkçe"
-            elif lang_code == "nl-NL":
-                lang_name = "Nederlands"
-            elif lang_code == "pl-PL":
-                lang_name = "Polski"
-            elif lang_code == "sv-SE":
-                lang_name = "Svenska"
-            elif lang_code == "nb-NO":
-                lang_name = "Norsk"
-            elif lang_code == "da-DK":
-                lang_name = "Dansk"
-            elif lang_code == "fi-FI":
-                lang_name = "Suomi"
-            elif lang_code == "el-GR":
-                lang_name = "Ελληνικά"
-            elif lang_code == "he-IL":
-                lang_name = "עברית"
-            else:
-                lang_name = lang_code
-
-            languages[lang_code] = {
-                "name": lang_name,
-                "voices": {}
-            }
-
-        languages[lang_code]["voices"][voice_id] = voice_name
-
-    return languages
-
-
-
 # Domain
 DOMAIN: Final = "ai_hub"
 
@@ -124,6 +50,113 @@ AI_HUB_STT_URL: Final = f"{AI_HUB_API_BASE}/audio/transcriptions"
 DEFAULT_REQUEST_TIMEOUT: Final = 30000  # milliseconds
 TIMEOUT_SECONDS: Final = 30
 
+# API Key Validation
+# 启动时使用缓存的校验结果，后台再用低成本请求确认
+VALIDATION_STORAGE_KEY: Final = f"{DOMAIN}.validation"
+VALIDATION_STORAGE_VERSION: Final = 1
+VALIDATION_PROBE_TIMEOUT: Final = 10  # seconds
+DATA_VALIDATION_CACHE: Final = f"{DOMAIN}_validation_cache"
+
+# HTTP Connection Pool
+HTTP_POOL_LIMIT: Final = 100            # 所有主机的最大连接数
+HTTP_POOL_LIMIT_PER_HOST: Final = 10    # 单个主机的最大连接数
+HTTP_DNS_CACHE_TTL: Final = 300         # seconds
+HTTP_KEEPALIVE_TIMEOUT: Final = 60      # seconds
+
+# Request Scheduler
+# 优先级：数值越小越优先，低优先级请求会让出并发槽位给高优先级请求
+PRIORITY_INTERACTIVE: Final = 0  # 对话 / STT
+PRIORITY_TASK: Final = 1         # AI Task / 服务调用
+PRIORITY_BACKGROUND: Final = 2   # 组件 / Blueprint 翻译
+PRIORITY_NAMES: Final = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_TASK: "task",
+    PRIORITY_BACKGROUND: "background",
+}
+# 每降低一级优先级，保留给更高优先级的并发槽位数
+SCHEDULER_PRIORITY_RESERVE: Final = 1
+# 每个服务商的限制：最大并发、令牌桶速率(次/秒)与突发容量
+SCHEDULER_PROVIDER_LIMITS: Final = {
+    "open.bigmodel.cn": {"max_concurrency": 5, "rate": 5.0, "burst": 10},
+    "api.siliconflow.cn": {"max_concurrency": 3, "rate": 3.0, "burst": 5},
+    "apis.bemfa.com": {"max_concurrency": 2, "rate": 1.0, "burst": 3},
+}
+SCHEDULER_SLOW_WAIT: Final = 1.0  # seconds, 排队超过该时间时记录日志
+
+# Chat Log Conversion Cache
+# 按 conversation_id 缓存已转换的消息，与 Home Assistant 对话会话的 5 分钟超时一致
+CHAT_CACHE_TTL: Final = 300  # seconds
+CHAT_CACHE_MAX_CONVERSATIONS: Final = 20
+
+# Attachment Cache
+# 已编码图片附件的内存上限（按 base64 字符数计），超出后按 LRU 淘汰
+ATTACHMENT_CACHE_MAX_BYTES: Final = 32 * 1024 * 1024
+
+# Token Estimate
+# 本地估算提示词令牌数：每条消息的固定开销和每张图片按固定值计
+TOKEN_ESTIMATE_PER_MESSAGE: Final = 4
+TOKEN_ESTIMATE_PER_IMAGE: Final = 1000
+
+# Tool Calls
+# 并行执行同一条回复中的多个工具调用时的最大并发数
+TOOL_CALL_MAX_PARALLEL: Final = 4
+
+# Tool Schema Cache
+# 按 LLM API 和工具集指纹缓存已转换并预编码的 tools 数组
+TOOL_CACHE_MAX_ENTRIES: Final = 8
+
+# Request Trace
+# 默认关闭；开启后每 N 个请求记录一次脱敏后的请求摘要
+TRACE_LOGGER_NAME: Final = f"custom_components.{DOMAIN}.trace"
+TRACE_MAX_TEXT: Final = 2000  # 文本字段超过该长度时截断
+TRACE_BINARY_MIN: Final = 256  # 超过该长度的 base64 字符串按二进制处理
+
+# Latency Metrics
+METRICS_WINDOW: Final = 100  # 每个阶段保留的最近样本数
+SIGNAL_METRICS_UPDATED: Final = f"{DOMAIN}_metrics_updated_{{}}"
+# 计数类指标（不是耗时）：(图标, 单位)
+METRICS_COUNTERS: Final = {
+    "tool_iterations": ("mdi:repeat", None),
+    "prompt_tokens": ("mdi:counter", None),
+    "prompt_cache_hit_rate": ("mdi:cached", PERCENTAGE),
+}
+# 各类子条目记录的阶段：(阶段, 中文名称, 英文名称, 默认启用)
+METRICS_STAGES: Final = {
+    "conversation": (
+        ("convert", "消息转换耗时", "Convert latency", False),
+        ("queue", "排队耗时", "Queue latency", False),
+        ("connect", "连接耗时", "Connect latency", False),
+        ("ttfb", "首字节耗时", "Time to first byte", False),
+        ("first_delta", "首个内容耗时", "Time to first content", True),
+        ("total", "请求总耗时", "Request latency", True),
+        ("turn", "对话轮次耗时", "Turn latency", True),
+        ("tool_iterations", "工具调用轮数", "Tool loop iterations", False),
+        ("prompt_tokens", "提示词令牌数", "Prompt tokens", False),
+        ("prompt_cache_hit_rate", "提示词缓存命中率", "Prompt cache hit rate", False),
+    ),
+    "ai_task_data": (
+        ("convert", "消息转换耗时", "Convert latency", False),
+        ("queue", "排队耗时", "Queue latency", False),
+        ("connect", "连接耗时", "Connect latency", False),
+        ("ttfb", "首字节耗时", "Time to first byte", False),
+        ("first_delta", "首个内容耗时", "Time to first content", False),
+        ("total", "请求总耗时", "Request latency", True),
+        ("prompt_tokens", "提示词令牌数", "Prompt tokens", False),
+        ("prompt_cache_hit_rate", "提示词缓存命中率", "Prompt cache hit rate", False),
+    ),
+    "stt": (
+        ("collect", "音频接收耗时", "Audio collect latency", False),
+        ("queue", "排队耗时", "Queue latency", False),
+        ("connect", "连接耗时", "Connect latency", False),
+        ("ttfb", "首字节耗时", "Time to first byte", False),
+        ("total", "识别总耗时", "Transcription latency", True),
+    ),
+    "tts": (
+        ("first_chunk", "首个音频块耗时", "Time to first audio", True),
+        ("total", "合成总耗时", "Synthesis latency", True),
+    ),
+}
+
 # Configuration Keys
 CONF_API_KEY: Final = "api_key"
 CONF_SILICONFLOW_API_KEY: Final = "siliconflow_api_key"
@@ -138,6 +171,9 @@ CONF_LLM_HASS_API: Final = "llm_hass_api"
 CONF_RECOMMENDED: Final = "recommended"
 CONF_WEB_SEARCH: Final = "web_search"
 CONF_MAX_HISTORY_MESSAGES: Final = "max_history_messages"
+CONF_PROMPT_TOKEN_BUDGET: Final = "prompt_token_budget"
+CONF_PARALLEL_TOOL_CALLS: Final = "parallel_tool_calls"
+CONF_EARLY_TOOL_CALLS: Final = "early_tool_calls"
 
 # Recommended Values for Conversation
 RECOMMENDED_CHAT_MODEL: Final = "GLM-4-Flash-250414"
@@ -146,6 +182,7 @@ RECOMMENDED_TOP_P: Final = 0.5
 RECOMMENDED_TOP_K: Final = 1
 RECOMMENDED_MAX_TOKENS: Final = 250
 RECOMMENDED_MAX_HISTORY_MESSAGES: Final = 30  # Keep last 30 messages for continuous conversation
+RECOMMENDED_PROMPT_TOKEN_BUDGET: Final = 16000  # 估算的提示词令牌上限，超出后丢弃最早的对话轮次
 
 # Recommended Values for AI Task
 RECOMMENDED_AI_TASK_MODEL: Final = "GLM-4-Flash-250414"
@@ -205,7 +242,7 @@ SILICONFLOW_STT_AUDIO_FORMATS: Final = [
     "webm",   # WebM格式
 ]
 
-# Edge TTS Voices (完整官方列表)
+# Edge TTS Voices：内置语音列表，语音目录首次从 Edge TTS 获取成功前使用
 EDGE_TTS_VOICES: Final = {
     'zh-CN-XiaoxiaoNeural': 'zh-CN',
     'zh-CN-XiaoyiNeural': 'zh-CN',
@@ -518,9 +555,6 @@ EDGE_TTS_VOICES: Final = {
     'zu-ZA-ThembaNeural': 'zu-ZA',
 }
 
-# Edge TTS Language to Voices Mapping (自动生成，避免重复维护)
-EDGE_TTS_LANGUAGES: Final = _build_edge_tts_languages()
-
 # Edge TTS Configuration Keys
 CONF_TTS_VOICE: Final = "voice"
 CONF_TTS_LANG: Final = "lang"
@@ -535,6 +569,42 @@ TTS_DEFAULT_RATE: Final = "+0%"
 TTS_DEFAULT_VOLUME: Final = "+0%"
 TTS_DEFAULT_PITCH: Final = "+0Hz"
 
+# Streaming TTS
+# 流式合成时单个句子的最大长度，超过后在逗号等位置提前切分
+TTS_SENTENCE_MAX_CHARS: Final = 80
+# 长消息按句子分组并行合成：每组的最大长度和同时进行的合成请求数
+TTS_GROUP_MAX_CHARS: Final = 200
+TTS_MAX_PARALLEL_SYNTHESIS: Final = 3
+
+# Edge TTS Sessions
+# 按语音和输出格式保留空闲的 websocket 连接供后续请求复用
+TTS_SESSION_IDLE_TIMEOUT: Final = 60  # seconds
+# 超过该长度的文本仍由 edge_tts 自行分段并单独建立连接
+TTS_SESSION_MAX_TEXT_BYTES: Final = 2048
+DATA_TTS_SESSION_POOL: Final = f"{DOMAIN}_tts_session_pool"
+
+# TTS Audio Cache
+# 短语级音频缓存保存在配置目录的 .storage 下，超出容量后按 LRU 淘汰；只缓存较短的句子
+TTS_CACHE_DIR: Final = f"{DOMAIN}_tts_cache"
+TTS_CACHE_MAX_BYTES: Final = 64 * 1024 * 1024
+TTS_CACHE_MAX_PHRASE_CHARS: Final = 100
+DATA_TTS_CACHE: Final = f"{DOMAIN}_tts_cache"
+# 启动时预先合成的短语，每行一个
+CONF_TTS_WARMUP_PHRASES: Final = "warmup_phrases"
+DEFAULT_TTS_WARMUP_PHRASES: Final = "好的，已取消。\n好的。\n抱歉，我没有听清，请再说一遍。"
+# 语音助手卫星请求的 WAV 采样率，预热短语时同时缓存该格式
+TTS_WARMUP_WAV_RATE: Final = 16000
+
+# Edge TTS Voice Catalog
+# 语音列表从 Edge TTS 获取后保存在 .storage，超过刷新间隔后在后台更新；
+# 获取失败且没有保存的列表时使用 EDGE_TTS_VOICES
+VOICE_CATALOG_STORAGE_KEY: Final = f"{DOMAIN}.voice_catalog"
+VOICE_CATALOG_STORAGE_VERSION: Final = 1
+VOICE_CATALOG_REFRESH_INTERVAL: Final = 7 * 24 * 3600  # seconds
+VOICE_CATALOG_RETRY_INTERVAL: Final = 3600  # seconds
+VOICE_CATALOG_FETCH_TIMEOUT: Final = 15  # seconds
+DATA_VOICE_CATALOG: Final = f"{DOMAIN}_voice_catalog"
+
 # Silicon Flow STT Configuration
 # STT Configuration Keys
 CONF_STT_FILE: Final = "file"
@@ -544,6 +614,12 @@ CONF_STT_MODEL: Final = "model"
 STT_DEFAULT_MODEL: Final = "FunAudioLLM/SenseVoiceSmall"
 
 
+# STT 连接预热：开始接收音频时提前建立到 ASR/LLM 主机的连接（可选）
+CONF_STT_PREWARM: Final = "prewarm_connections"
+DEFAULT_STT_PREWARM: Final = False
+STT_PREWARM_INTERVAL: Final = 20  # 刷新间隔(秒)，需小于 HTTP_KEEPALIVE_TIMEOUT
+STT_PREWARM_TIMEOUT: Final = 5  # 单次预热请求超时(秒)
+
 # STT File Size Limits
 STT_MAX_FILE_SIZE_MB: Final = 25  # 最大文件大小 25MB
 
@@ -639,6 +715,13 @@ ERROR_GETTING_RESPONSE: Final = "获取响应时出错"
 ERROR_INVALID_API_KEY: Final = "API密钥无效"
 ERROR_CANNOT_CONNECT: Final = "无法连接到AI Hub服务"
 
+# 请求结构化输出时追加在当前输入之前的说明
+STRUCTURED_OUTPUT_INSTRUCTION: Final = (
+    "When providing structured data like automation names/descriptions, respond ONLY "
+    "with valid JSON. Use the exact JSON structure requested in the prompt. Do not "
+    "include any markdown formatting, explanations, or additional text."
+)
+
 # Web Search Tool
 WEB_SEARCH_TOOL: Final = {
     "type": "web_search",
@@ -659,6 +742,9 @@ RECOMMENDED_CONVERSATION_OPTIONS: Final = {
     CONF_TOP_K: RECOMMENDED_TOP_K,
     CONF_MAX_TOKENS: RECOMMENDED_MAX_TOKENS,
     CONF_MAX_HISTORY_MESSAGES: RECOMMENDED_MAX_HISTORY_MESSAGES,
+    CONF_PROMPT_TOKEN_BUDGET: RECOMMENDED_PROMPT_TOKEN_BUDGET,
+    CONF_PARALLEL_TOOL_CALLS: False,
+    CONF_EARLY_TOOL_CALLS: False,
     CONF_WEB_SEARCH: False,
 }
 
@@ -678,6 +764,7 @@ RECOMMENDED_TTS_OPTIONS: Final = {
     CONF_TTS_RATE: TTS_DEFAULT_RATE,
     CONF_TTS_VOLUME: TTS_DEFAULT_VOLUME,
     CONF_TTS_PITCH: TTS_DEFAULT_PITCH,
+    CONF_TTS_WARMUP_PHRASES: DEFAULT_TTS_WARMUP_PHRASES,
 }
 
 
@@ -691,6 +778,7 @@ RECOMMENDED_WECHAT_OPTIONS: Final = {
 RECOMMENDED_STT_OPTIONS: Final = {
     CONF_RECOMMENDED: True,
     CONF_STT_MODEL: STT_DEFAULT_MODEL,
+    CONF_STT_PREWARM: DEFAULT_STT_PREWARM,
 }
 
 # Recommended Options for Translation (simplified)
@@ -709,6 +797,8 @@ SERVICE_STT_TRANSCRIBE: Final = "stt_transcribe"
 SERVICE_SEND_WECHAT_MESSAGE: Final = "send_wechat_message"
 SERVICE_TRANSLATE_COMPONENTS: Final = "translate_components"
 SERVICE_TRANSLATE_BLUEPRINTS: Final = "translate_blueprints"
+SERVICE_SET_REQUEST_TRACE: Final = "set_request_trace"
 
 # Bemfa WeChat Configuration
 BEMFA_API_URL: Final = "https://apis.bemfa.com/vb/wechat/v1/wechatAlertJson"
+
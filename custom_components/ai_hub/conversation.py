@@ -13,6 +13,7 @@ from homeassistant.helpers import intent
 
 from .const import CONF_LLM_HASS_API, CONF_PROMPT, DOMAIN
 from .entity import AIHubBaseLLMEntity
+from .metrics import StageTimer
 from .intents import extract_intent_info
 
 _LOGGER = logging.getLogger(__name__)
@@ -122,12 +123,20 @@ class AIHubConversationEntity(
 
         # Process the chat log with AI Hub
         # Loop to handle tool calls: model may call tools, then we need to call again with results
+        timer = StageTimer()
+        tool_iterations = 0
         while True:
             await self._async_handle_chat_log(chat_log)
 
             # If there are unresponded tool results, continue the loop
             if not chat_log.unresponded_tool_results:
                 break
+            tool_iterations += 1
+
+        timer.count("tool_iterations", tool_iterations)
+        timer.mark("turn")
+        self._client.metrics.async_record(self.subentry.subentry_id, timer)
+        chat_log.async_trace({"ai_hub_turn": timer.as_trace()})
 
         # Return result from chat log
         return conversation.async_get_result_from_chat_log(user_input, chat_log)
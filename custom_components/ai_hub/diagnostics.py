@@ -0,0 +1,45 @@
+"""Diagnostics support for AI Hub."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.core import HomeAssistant
+
+from . import AIHubConfigEntry
+from .const import (
+    CONF_API_KEY,
+    CONF_BEMFA_UID,
+    CONF_SILICONFLOW_API_KEY,
+    DATA_TTS_SESSION_POOL,
+)
+from .tts_cache import async_get_tts_cache
+from .voice_catalog import async_get_voice_catalog_store
+
+TO_REDACT = {CONF_API_KEY, CONF_SILICONFLOW_API_KEY, CONF_BEMFA_UID}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: AIHubConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    client = entry.runtime_data
+    return {
+        "entry": async_redact_data(entry.data, TO_REDACT),
+        "subentries": {
+            subentry_id: {
+                "subentry_type": subentry.subentry_type,
+                "data": async_redact_data(dict(subentry.data), TO_REDACT),
+            }
+            for subentry_id, subentry in entry.subentries.items()
+        },
+        "scheduler": client.scheduler.as_dict(),
+        "metrics": client.metrics.as_dict(),
+        "request_trace": client.tracer.as_dict(),
+        "attachments": client.attachments.as_dict(),
+        "tool_schemas": client.tool_schemas.as_dict(),
+        "tts_cache": async_get_tts_cache(hass).as_dict(),
+        "tts_sessions": pool.as_dict() if (pool := hass.data.get(DATA_TTS_SESSION_POOL)) else None,
+        "voice_catalog": async_get_voice_catalog_store(hass).as_dict(),
+    }
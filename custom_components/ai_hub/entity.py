@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import base64
 from collections.abc import AsyncGenerator, Callable
 import json
 import logging
@@ -20,30 +19,43 @@ from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import HomeAssistantError, TemplateError
 from homeassistant.helpers import config_entry_flow, device_registry as dr, llm
 from homeassistant.helpers.entity import Entity
-from homeassistant.util import ulid
 
+from . import codec
 from .const import (
     CONF_CHAT_MODEL,
+    CONF_EARLY_TOOL_CALLS,
     CONF_LLM_HASS_API,
     CONF_MAX_HISTORY_MESSAGES,
     CONF_MAX_TOKENS,
     CONF_PROMPT,
+    CONF_PROMPT_TOKEN_BUDGET,
     CONF_TEMPERATURE,
     CONF_TOP_K,
     CONF_TOP_P,
     CONF_WEB_SEARCH,
     DOMAIN,
     ERROR_GETTING_RESPONSE,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_TASK,
     RECOMMENDED_IMAGE_ANALYSIS_MODEL,
     RECOMMENDED_MAX_HISTORY_MESSAGES,
     RECOMMENDED_MAX_TOKENS,
+    RECOMMENDED_PROMPT_TOKEN_BUDGET,
     RECOMMENDED_TEMPERATURE,
     RECOMMENDED_TOP_K,
     RECOMMENDED_TOP_P,
+    STRUCTURED_OUTPUT_INSTRUCTION,
     WEB_SEARCH_TOOL,
     AI_HUB_CHAT_URL,
 )
-from .markdown_filter import filter_markdown_content, filter_markdown_streaming
+from .chat_cache import CachedContent, ChatLogCache
+from .client import AIHubClient
+from .metrics import StageTimer
+from .sse import SSE_DONE, async_iter_sse
+from .markdown_filter import StreamingMarkdownFilter
+from .tokens import estimate_message_tokens
+from .tool_executor import ToolCallRunner, tool_call_parallelism, tool_result_delta
+from .tool_stream import ToolCallBuffer
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -67,8 +79,17 @@ class AIHubBaseLLMEntity(Entity):
         self._attr_unique_id = subentry.subentry_id
         self._attr_name = subentry.title
 
-        # Get API key from runtime data
-        self._api_key = entry.runtime_data
+        # Shared HTTP client from runtime data
+        self._client: AIHubClient = entry.runtime_data
+        self._api_key = self._client.api_key
+        # AI Task 请求让位于实时对话
+        self._priority = (
+            PRIORITY_TASK
+            if subentry.subentry_type == "ai_task_data"
+            else PRIORITY_INTERACTIVE
+        )
+        # 每个对话已转换的消息，每轮只转换新增内容
+        self._chat_cache = ChatLogCache()
 
         # Device info
         self._attr_device_info = dr.DeviceInfo(
@@ -87,31 +108,15 @@ class AIHubBaseLLMEntity(Entity):
         # Check if we need to switch to vision model
         final_model = configured_model
         if chat_log:
-            # Detect if any content has attachments
-            has_attachments = any(
-                hasattr(content, 'attachments') and content.attachments
-                for content in chat_log.content
-            )
-
-            # Check if attachments contain images/videos
-            has_media_attachments = False
-            if has_attachments:
-                for content in chat_log.content:
-                    if hasattr(content, 'attachments') and content.attachments:
-                        for attachment in content.attachments:
-                            mime_type = getattr(attachment, 'mime_type', '')
-                            if mime_type.startswith(('image/', 'video/')):
-                                has_media_attachments = True
-                                break
-                    if has_media_attachments:
-                        break
+            # Detect image/video attachments from the per-conversation index
+            has_media_attachments = self._chat_cache.has_media_attachments(chat_log)
 
             # Auto-switch to vision model if needed (prefer free model!)
             if has_media_attachments:
                 vision_models = ["glm-4.1v-thinking", "glm-4v-flash"]
                 if configured_model not in vision_models:
                     final_model = RECOMMENDED_IMAGE_ANALYSIS_MODEL  # GLM-4.1V-Thinking
-                    _LOGGER.info("Auto-switching to vision model %s for media attachments (original: %s)", final_model, configured_model)
+                    _LOGGER.debug("Auto-switching to vision model %s for media attachments (original: %s)", final_model, configured_model)
 
         # Only use parameters that the working service uses (top_p causes API error!)
         return {
@@ -127,32 +132,52 @@ class AIHubBaseLLMEntity(Entity):
     ) -> None:
         """Generate an answer for the chat log."""
         options = self.subentry.data
+        timer = StageTimer()
         model_config = self._get_model_config(chat_log)
 
         # Build messages from chat log (attachment processing will be done during conversion)
-        messages = await self._async_convert_chat_log_to_messages(chat_log)
-
-        # Add JSON format instruction to system message if structure is requested
-        if structure and messages:
-            for i, message in enumerate(messages):
-                if message.get("role") == "system":
-                    # Add JSON format requirement to system message
-                    original_content = message.get("content", "")
-                    if "JSON" not in original_content:
-                        message["content"] = original_content + "\n\nWhen providing structured data like automation names/descriptions, respond ONLY with valid JSON. Use the exact JSON structure requested in the prompt. Do not include any markdown formatting, explanations, or additional text."
-                    break
-
-        # Add tools if available
-        tools = []
+        messages = await self._async_convert_chat_log_to_messages(chat_log, timer)
+        timer.mark("convert")
+
+        # Add JSON format instruction if structure is requested. It goes right
+        # after the current user input so the system prompt and history stay a
+        # byte-stable prefix for the provider's context cache, and never
+        # between an assistant tool call and its tool results.
+        system_message = next(
+            (message for message in messages if message.get("role") == "system"), None
+        )
+        last_user = next(
+            (index for index in range(len(messages) - 1, -1, -1) if messages[index].get("role") == "user"),
+            None,
+        )
+        if (
+            structure
+            and system_message
+            and last_user is not None
+            and "JSON" not in system_message.get("content", "")
+        ):
+            messages.insert(
+                last_user + 1,
+                {"role": "system", "content": STRUCTURED_OUTPUT_INSTRUCTION},
+            )
+
+        # Add tools if available, plus the web search tool if enabled
+        extra_tools = (WEB_SEARCH_TOOL,) if options.get(CONF_WEB_SEARCH, False) else ()
+        tools: list[dict[str, Any]] | codec.RawJSON = list(extra_tools)
+        tool_count = len(extra_tools)
         if chat_log.llm_api:
-            tools.extend([
-                self._format_tool(tool, chat_log.llm_api.custom_serializer)
-                for tool in chat_log.llm_api.tools
-            ])
+            # 已转换的工具定义按工具集缓存，并以预编码的 JSON 复用
+            llm_api = chat_log.llm_api
+            tools = self._client.tool_schemas.get(
+                llm_api,
+                lambda tool: self._format_tool(tool, llm_api.custom_serializer),
+                extra_tools,
+            )
+            tool_count += len(llm_api.tools)
 
-        # Add web search tool if enabled
-        if options.get(CONF_WEB_SEARCH, False):
-            tools.append(WEB_SEARCH_TOOL)
+        # 并行或提前执行时由本集成执行工具调用，而不是交给聊天记录，流出错时可以取消
+        tool_parallelism = tool_call_parallelism(options)
+        tool_llm_api = chat_log.llm_api if tool_parallelism else None
 
         # Build minimal request parameters using only essential parameters
         request_params = {
@@ -161,72 +186,46 @@ class AIHubBaseLLMEntity(Entity):
             "stream": True,
         }
 
-        if tools:
+        if tool_count:
             request_params["tools"] = tools
 
         try:
-            # Debug: Log the request parameters and validate model
-            model_name = model_config.get("model", "unknown")
-            _LOGGER.info("Sending request to AI Hub with model: %s", model_name)
-
-            # Note: Model vision capability check is not needed here since
-            # we auto-switch to vision models when media attachments are detected
-            # This warning is removed to avoid confusion during model switching
-
-            _LOGGER.info("Number of messages: %d", len(messages))
-            for i, msg in enumerate(messages):
-                _LOGGER.info("Message %d: role=%s, content_type=%s", i, msg.get("role"), type(msg.get("content")))
-                if isinstance(msg.get("content"), list):
-                    for j, part in enumerate(msg["content"]):
-                        _LOGGER.info("  Part %d: type=%s", j, part.get("type"))
-                        if part.get("type") == "image_url":
-                            url = part.get("image_url", {}).get("url", "")
-                            _LOGGER.info("    Image URL length: %d", len(url))
-
-            # Debug: Log the full request
-            _LOGGER.info("Full API request parameters: %s", json.dumps(request_params, indent=2, ensure_ascii=False))
-
-            # Additional debugging: Check message structure specifically
-            if messages:
-                first_msg = messages[0]
-                if isinstance(first_msg.get("content"), list):
-                    _LOGGER.info("Message content structure:")
-                    for i, part in enumerate(first_msg["content"]):
-                        _LOGGER.info("  Part %d: %s", i, json.dumps(part, indent=2, ensure_ascii=False))
-                        if part.get("type") == "image_url":
-                            url = part.get("image_url", {}).get("url", "")
-                            if url.startswith("data:image/"):
-                                _LOGGER.info("    Image URL format looks correct (data URI)")
-                            else:
-                                _LOGGER.error("    Image URL format incorrect: %s", url[:100])
-                else:
-                    _LOGGER.info("Message content is simple string: %s", first_msg.get("content", "")[:100])
-
-            # Call AI Hub API with streaming via HTTP
-            headers = {
-                "Authorization": f"Bearer {self._api_key}",
-                "Content-Type": "application/json",
-            }
-
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    AI_HUB_CHAT_URL,
-                    json=request_params,
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=60),
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        _LOGGER.error("API request failed: %s", error_text)
-                        raise HomeAssistantError(f"{ERROR_GETTING_RESPONSE}: {error_text}")
-
-                    # Process streaming response using the new API
-                    [
-                        content
-                        async for content in chat_log.async_add_delta_content_stream(
-                            self.entity_id, self._transform_stream(response)
-                        )
-                    ]
+            # 请求内容通过 set_request_trace 服务按采样记录（已脱敏），这里只记录摘要
+            _LOGGER.debug(
+                "Sending request to AI Hub with model: %s, messages: %d, tools: %d",
+                model_config.get("model", "unknown"),
+                len(messages),
+                tool_count,
+            )
+
+            # Call AI Hub API with streaming via the shared HTTP client
+            async with self._client.post(
+                AI_HUB_CHAT_URL,
+                priority=self._priority,
+                timer=timer,
+                json=request_params,
+                headers=self._client.zhipu_headers(),
+                timeout=aiohttp.ClientTimeout(total=60),
+            ) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    _LOGGER.error("API request failed: %s", error_text)
+                    raise HomeAssistantError(f"{ERROR_GETTING_RESPONSE}: {error_text}")
+
+                # Process streaming response using the new API
+                [
+                    content
+                    async for content in chat_log.async_add_delta_content_stream(
+                        self.entity_id,
+                        self._transform_stream(
+                            response,
+                            timer,
+                            tool_llm_api,
+                            options.get(CONF_EARLY_TOOL_CALLS, False),
+                            tool_parallelism or 1,
+                        ),
+                    )
+                ]
 
         except aiohttp.ClientError as err:
             _LOGGER.error("Network error calling AI Hub API: %s", err)
@@ -235,24 +234,34 @@ class AIHubBaseLLMEntity(Entity):
             _LOGGER.error("Error calling AI Hub API: %s", err)
             raise HomeAssistantError(ERROR_GETTING_RESPONSE) from err
 
+        timer.mark("total")
+        self._client.metrics.async_record(self.subentry.subentry_id, timer)
+        chat_log.async_trace({"ai_hub_timings": timer.as_trace()})
+
     async def _async_convert_chat_log_to_messages(
-        self, chat_log: conversation.ChatLog
+        self, chat_log: conversation.ChatLog, timer: StageTimer | None = None
     ) -> list[dict[str, Any]]:
         """Convert chat log to AI Hub message format."""
         options = self.subentry.data
         max_history = options.get(CONF_MAX_HISTORY_MESSAGES, RECOMMENDED_MAX_HISTORY_MESSAGES)
+        token_budget = options.get(CONF_PROMPT_TOKEN_BUDGET, RECOMMENDED_PROMPT_TOKEN_BUDGET)
 
         messages = []
 
         if not chat_log.content:
             return []
 
+        items = self._chat_cache.sync(chat_log)
+
         # For debugging: Check if we have attachments and simplify format
         last_content = chat_log.content[-1]
         if last_content.role == "user" and last_content.attachments:
-            _LOGGER.info("Simplifying to single message format with attachments (like working service)")
+            _LOGGER.debug("Simplifying to single message format with attachments (like working service)")
             # Only send the last user message with attachments, like the working service
-            return [await self._convert_user_message(last_content)]
+            message = await self._async_convert_content(items[-1])
+            if timer is not None:
+                timer.count("estimated_prompt_tokens", items[-1].tokens)
+            return [message]
 
         # Standard conversation handling for messages without attachments
         # First message is system message (index 0)
@@ -265,48 +274,104 @@ class AIHubBaseLLMEntity(Entity):
                 messages.append({"role": "system", "content": content.content})
 
         # Process history messages (excluding system and last user input)
-        history_content = chat_log.content[1:-1] if len(chat_log.content) > 1 else []
-
-        # Build history messages
-        history_messages = []
-        for content in history_content:
-            if content.role == "user":
-                history_messages.append(await self._convert_user_message(content))
-            elif content.role == "assistant":
-                history_messages.append(self._convert_assistant_message(content))
-            elif content.role == "tool_result":
-                history_messages.append(self._convert_tool_message(content))
+        # Build history messages; content converted in earlier turns comes from
+        # the cache together with its token estimate
+        history: list[tuple[dict[str, Any], int]] = []
+        for item in items[1:-1]:
+            if (message := await self._async_convert_content(item)) is not None:
+                history.append((message, item.tokens))
 
         # Limit history: keep only the most recent conversation turns
         # Count user messages to determine conversation turns
         if max_history > 0:
-            user_message_count = sum(1 for msg in history_messages if msg.get("role") == "user")
+            user_message_count = sum(1 for msg, _ in history if msg.get("role") == "user")
             if user_message_count > max_history:
                 # Find the index to start keeping messages
                 # We want to keep the last max_history user turns and their associated messages
                 user_count = 0
-                start_index = len(history_messages)
-                for i in range(len(history_messages) - 1, -1, -1):
-                    if history_messages[i].get("role") == "user":
+                start_index = len(history)
+                for i in range(len(history) - 1, -1, -1):
+                    if history[i][0].get("role") == "user":
                         user_count += 1
                         if user_count >= max_history:
                             start_index = i
                             break
-                history_messages = history_messages[start_index:]
+                history = history[start_index:]
+
+        current = await self._async_convert_content(items[-1])
+        fixed_tokens = sum(estimate_message_tokens(message) for message in messages)
+        if current is not None:
+            fixed_tokens += items[-1].tokens
+
+        # 系统提示词和当前输入之外的令牌预算留给历史消息
+        if token_budget > 0:
+            history = self._trim_history_to_budget(
+                history,
+                token_budget - fixed_tokens,
+                keep_last_turn=last_content.role != "user",
+            )
 
         # Add history to messages
-        messages.extend(history_messages)
+        messages.extend(message for message, _ in history)
 
         # Add current user input
-        if last_content.role == "user":
-            messages.append(await self._convert_user_message(last_content))
-        elif last_content.role == "assistant":
-            messages.append(self._convert_assistant_message(last_content))
-        elif last_content.role == "tool_result":
-            messages.append(self._convert_tool_message(last_content))
+        if current is not None:
+            messages.append(current)
 
+        if timer is not None:
+            timer.count(
+                "estimated_prompt_tokens",
+                fixed_tokens + sum(tokens for _, tokens in history),
+            )
         return messages
 
+    @staticmethod
+    def _trim_history_to_budget(
+        history: list[tuple[dict[str, Any], int]],
+        budget: int,
+        keep_last_turn: bool,
+    ) -> list[tuple[dict[str, Any], int]]:
+        """Drop the oldest turns until the history fits the token budget.
+
+        History is cut only before a user message, so a tool result never
+        loses the assistant message that called it. While a tool loop is
+        running the last turn belongs to the current request and is kept
+        regardless of the budget.
+        """
+        start = len(history)
+        used = 0
+        last_turn = True
+        for index in range(len(history) - 1, -1, -1):
+            used += history[index][1]
+            if index and history[index][0].get("role") != "user":
+                continue
+            if used > budget and not (last_turn and keep_last_turn):
+                break
+            start = index
+            last_turn = False
+
+        if start:
+            _LOGGER.debug(
+                "Dropped %d of %d history messages to fit the prompt token budget",
+                start,
+                len(history),
+            )
+        return history[start:]
+
+    async def _async_convert_content(self, item: CachedContent) -> dict[str, Any] | None:
+        """Convert one chat log content, reusing the message cached for it."""
+        if item.message is None:
+            content = item.content
+            if content.role == "user":
+                item.message = await self._convert_user_message(content)
+            elif content.role == "assistant":
+                item.message = self._convert_assistant_message(content)
+            elif content.role == "tool_result":
+                item.message = self._convert_tool_message(content)
+            if item.message is not None:
+                item.tokens = estimate_message_tokens(item.message)
+        return item.message
+
     async def _convert_user_message(
         self, content: conversation.Content
     ) -> dict[str, Any]:
@@ -317,11 +382,11 @@ class AIHubBaseLLMEntity(Entity):
         if content.attachments:
             parts = []
             successful_images = []
-            _LOGGER.info("Processing %d attachments for user message", len(content.attachments))
+            _LOGGER.debug("Processing %d attachments for user message", len(content.attachments))
 
             # First, process all attachments and collect successful ones
             for i, attachment in enumerate(content.attachments):
-                _LOGGER.info("Processing attachment %d: %s", i, attachment)
+                _LOGGER.debug("Processing attachment %d: %s", i, attachment)
 
                 if attachment.mime_type and attachment.mime_type.startswith("image/"):
                     try:
@@ -330,50 +395,46 @@ class AIHubBaseLLMEntity(Entity):
 
                         # Handle media_content_id - try direct file path first (more reliable)
                         if hasattr(attachment, 'media_content_id'):
-                            _LOGGER.info("Attachment has media_content_id: %s", attachment.media_content_id)
-                            _LOGGER.info("Attachment attributes: %s", dir(attachment))
+                            _LOGGER.debug("Attachment has media_content_id: %s", attachment.media_content_id)
+                            _LOGGER.debug("Attachment attributes: %s", dir(attachment))
                             # First check if we have a direct file path (most reliable)
                             if hasattr(attachment, 'path') and attachment.path:
                                 try:
-                                    _LOGGER.info("Reading file directly from path: %s", attachment.path)
-                                    import asyncio
-                                    image_bytes = await asyncio.to_thread(self._read_file_bytes, str(attachment.path))
-                                    image_data = base64.b64encode(image_bytes).decode()
-                                    _LOGGER.info("Successfully read file directly, base64 length: %d", len(image_data))
+                                    _LOGGER.debug("Reading file directly from path: %s", attachment.path)
+                                    image_data = await self._client.attachments.async_encode_file(str(attachment.path))
+                                    _LOGGER.debug("Successfully read file directly, base64 length: %d", len(image_data))
                                 except Exception as err:
                                     _LOGGER.error("Failed to read file %s: %s", attachment.path, err, exc_info=True)
                             else:
                                 # Try media source resolution as fallback
-                                _LOGGER.info("No file path, trying media source resolution for %s", attachment.media_content_id)
+                                _LOGGER.debug("No file path, trying media source resolution for %s", attachment.media_content_id)
                                 try:
                                     image_bytes = await self._async_get_media_content(
                                         attachment.media_content_id, mime_type
                                     )
                                     if image_bytes:
-                                        image_data = base64.b64encode(image_bytes).decode()
-                                        _LOGGER.info("Successfully resolved media content, base64 length: %d", len(image_data))
+                                        image_data = self._client.attachments.encode_bytes(image_bytes)
+                                        _LOGGER.debug("Successfully resolved media content, base64 length: %d", len(image_data))
                                     else:
                                         _LOGGER.warning("Failed to resolve media content for: %s", attachment.media_content_id)
                                 except Exception as err:
                                     _LOGGER.error("Error resolving media content %s: %s", attachment.media_content_id, err, exc_info=True)
                         # Check if attachment has resolved content
                         elif hasattr(attachment, 'content'):
-                            _LOGGER.info("Attachment has resolved content")
+                            _LOGGER.debug("Attachment has resolved content")
                             # Direct content (bytes)
                             if isinstance(attachment.content, bytes):
-                                image_data = base64.b64encode(attachment.content).decode()
-                                _LOGGER.info("Converted bytes to base64, length: %d", len(image_data))
+                                image_data = self._client.attachments.encode_bytes(attachment.content)
+                                _LOGGER.debug("Converted bytes to base64, length: %d", len(image_data))
                             elif isinstance(attachment.content, str):
                                 # Already base64 encoded
                                 image_data = attachment.content
-                                _LOGGER.info("Using existing base64 content, length: %d", len(image_data))
+                                _LOGGER.debug("Using existing base64 content, length: %d", len(image_data))
                         elif hasattr(attachment, 'path') and attachment.path:
                             # Traditional file path (handle asynchronously)
-                            _LOGGER.info("Reading image from path: %s", attachment.path)
+                            _LOGGER.debug("Reading image from path: %s", attachment.path)
                             try:
-                                import asyncio
-                                image_bytes = await asyncio.to_thread(self._read_file_bytes, str(attachment.path))
-                                image_data = base64.b64encode(image_bytes).decode()
+                                image_data = await self._client.attachments.async_encode_file(str(attachment.path))
                             except Exception as err:
                                 _LOGGER.error("Failed to read file %s: %s", attachment.path, err, exc_info=True)
                         else:
@@ -388,14 +449,14 @@ class AIHubBaseLLMEntity(Entity):
                                     "url": f"data:image/jpeg;base64,{image_data}"
                                 }
                             })
-                            _LOGGER.info("Successfully added image to message parts using official example format (image/jpeg)")
+                            _LOGGER.debug("Successfully added image to message parts using official example format (image/jpeg)")
                         else:
                             _LOGGER.warning("Could not get image data from attachment: %s", attachment)
 
                     except Exception as err:
                         _LOGGER.error("Failed to process image attachment %s: %s", attachment, err, exc_info=True)
                 else:
-                    _LOGGER.info("Skipping non-image attachment: %s (mime: %s)", attachment, getattr(attachment, 'mime_type', 'unknown'))
+                    _LOGGER.debug("Skipping non-image attachment: %s (mime: %s)", attachment, getattr(attachment, 'mime_type', 'unknown'))
 
             # Build content EXACTLY like our working services.py
             if successful_images:
@@ -408,7 +469,7 @@ class AIHubBaseLLMEntity(Entity):
                 })
 
                 message["content"] = parts
-                _LOGGER.info("Final message content has %d parts (%d images + text) - EXACTLY like working services.py", len(parts), len(successful_images))
+                _LOGGER.debug("Final message content has %d parts (%d images + text) - EXACTLY like working services.py", len(parts), len(successful_images))
             else:
                 # No images processed successfully, fall back to text only
                 _LOGGER.warning("No images were processed successfully, falling back to text only")
@@ -431,7 +492,7 @@ class AIHubBaseLLMEntity(Entity):
                     "type": "function",
                     "function": {
                         "name": tool_call.tool_name,
-                        "arguments": json.dumps(tool_call.tool_args, ensure_ascii=False),
+                        "arguments": codec.dumps(tool_call.tool_args).decode(),
                     },
                 }
                 for tool_call in content.tool_calls
@@ -449,7 +510,7 @@ class AIHubBaseLLMEntity(Entity):
         return {
             "role": "tool",
             "tool_call_id": content.tool_call_id,
-            "content": json.dumps(content.tool_result, ensure_ascii=False),
+            "content": codec.dumps(content.tool_result).decode(),
         }
 
     def _format_tool(
@@ -488,102 +549,111 @@ class AIHubBaseLLMEntity(Entity):
     async def _transform_stream(
         self,
         response: aiohttp.ClientResponse,
+        timer: StageTimer | None = None,
+        tool_llm_api: llm.APIInstance | None = None,
+        early_tool_calls: bool = False,
+        tool_max_parallel: int = 1,
     ) -> AsyncGenerator[
         conversation.AssistantContentDeltaDict | conversation.ToolResultContentDeltaDict
     ]:
-        """Transform AI Hub SSE stream into HA format."""
-        buffer = ""
-        tool_call_buffer: dict[int, dict[str, Any]] = {}
+        """Transform AI Hub SSE stream into HA format.
+
+        If ``tool_llm_api`` is given, the tool calls are marked external and
+        run here, ``tool_max_parallel`` at a time, and their results are
+        yielded in call order. Calls still running when the stream fails or is
+        cancelled are cancelled.
+        With ``early_tool_calls`` each tool call is yielded as soon as its
+        arguments are complete instead of when the stream ends.
+        """
+        tool_call_buffer = ToolCallBuffer(external=tool_llm_api is not None)
+        runner = (
+            ToolCallRunner(self.hass, tool_llm_api, tool_max_parallel) if tool_llm_api else None
+        )
         has_started = False
+        markdown_filter = StreamingMarkdownFilter()
 
-        async for chunk in response.content:
-            if not chunk:
-                continue
-
-            chunk_text = chunk.decode("utf-8", errors="ignore")
-            buffer += chunk_text
-
-            # Process complete lines
-            while "\n" in buffer:
-                line, buffer = buffer.split("\n", 1)
-                line = line.strip()
+        try:
+            async for event in async_iter_sse(response):
+                # Skip empty events and end markers; keep reading to EOF so the
+                # connection goes back to the pool
+                if event.data == SSE_DONE or not event.data.strip():
+                    continue
 
-                # Skip empty lines and end markers
-                if not line or line == "data: [DONE]":
+                try:
+                    data = codec.loads(event.data)
+                except json.JSONDecodeError:
+                    _LOGGER.debug("SSE data parse failed: %s", event.data)
                     continue
 
-                # Process SSE data lines
-                if line.startswith("data: "):
-                    data_str = line[6:]  # Remove "data: " prefix
-                    if not data_str.strip():
-                        continue
+                # 最后一个数据块带有实际的令牌用量
+                if timer is not None and (usage := data.get("usage")):
+                    self._record_usage(timer, usage)
 
-                    try:
-                        data = json.loads(data_str)
-                    except json.JSONDecodeError:
-                        _LOGGER.debug("SSE data parse failed: %s", data_str)
-                        continue
+                if not data.get("choices"):
+                    continue
 
-                    if not data.get("choices"):
-                        continue
+                delta = data["choices"][0].get("delta", {})
 
-                    delta = data["choices"][0].get("delta", {})
+                # Start assistant message if not started
+                if not has_started:
+                    yield {"role": "assistant"}
+                    has_started = True
 
-                    # Start assistant message if not started
-                    if not has_started:
-                        yield {"role": "assistant"}
-                        has_started = True
+                # Handle content delta
+                if timer is not None and (delta.get("content") or delta.get("tool_calls")):
+                    timer.mark("first_delta")
 
-                    # Handle content delta
-                    if "content" in delta and delta["content"]:
-                        # Filter markdown from content using streaming filter to preserve spaces
-                        filtered_content = filter_markdown_streaming(delta["content"])
+                if "content" in delta and delta["content"]:
+                    # Filter markdown across deltas; ambiguous suffixes are held back
+                    if filtered_content := markdown_filter.feed(delta["content"]):
                         yield {"content": filtered_content}
 
-                    # Handle tool calls
-                    if "tool_calls" in delta:
-                        for tc_delta in delta["tool_calls"]:
-                            index = tc_delta.get("index", 0)
-
-                            # Initialize tool call buffer if needed
-                            if index not in tool_call_buffer:
-                                tool_call_buffer[index] = {
-                                    "id": tc_delta.get("id", ulid.ulid_now()),
-                                    "type": "function",
-                                    "function": {
-                                        "name": "",
-                                        "arguments": "",
-                                    },
-                                }
-
-                            # Update tool call data
-                            if "id" in tc_delta:
-                                tool_call_buffer[index]["id"] = tc_delta["id"]
-                            if "function" in tc_delta:
-                                func = tc_delta["function"]
-                                if "name" in func:
-                                    tool_call_buffer[index]["function"]["name"] = func["name"]
-                                if "arguments" in func:
-                                    tool_call_buffer[index]["function"]["arguments"] += func["arguments"]
-
-        # Yield final tool calls if any
-        if tool_call_buffer:
-            tool_calls = []
-            for tc in tool_call_buffer.values():
-                try:
-                    args = json.loads(tc["function"]["arguments"]) if tc["function"]["arguments"] else {}
-                    tool_calls.append(
-                        llm.ToolInput(
-                            id=tc["id"],
-                            tool_name=tc["function"]["name"],
-                            tool_args=args,
-                        )
-                    )
-                except json.JSONDecodeError as err:
-                    _LOGGER.warning("Failed to parse tool call arguments: %s", err)
-
-            if tool_calls:
+                # Handle tool calls
+                if "tool_calls" in delta:
+                    for tc_delta in delta["tool_calls"]:
+                        tool_call_buffer.add(tc_delta)
+                    # 参数完整的调用立即交给聊天记录或并行执行器，与后续输出重叠
+                    if early_tool_calls and (tool_calls := tool_call_buffer.pop_complete()):
+                        if timer is not None:
+                            timer.mark("first_tool_call")
+                        yield {"tool_calls": tool_calls}
+                        if runner is not None:
+                            for tool_call in tool_calls:
+                                runner.submit(tool_call)
+
+            if remaining_content := markdown_filter.flush():
+                yield {"content": remaining_content}
+
+            # Yield final tool calls if any
+            if tool_calls := tool_call_buffer.pop_all():
+                if timer is not None:
+                    timer.mark("first_tool_call")
                 yield {"tool_calls": tool_calls}
+                if runner is not None:
+                    for tool_call in tool_calls:
+                        runner.submit(tool_call)
+
+            if runner:
+                results = await runner.async_results()
+                if timer is not None:
+                    timer.mark("tools")
+                for tool_call, result in results:
+                    yield tool_result_delta(tool_call, result)
+        finally:
+            # 流出错或对话被取消时，不再执行已提前派发的工具调用
+            if runner:
+                runner.cancel()
+
+    @staticmethod
+    def _record_usage(timer: StageTimer, usage: dict[str, Any]) -> None:
+        """Record the token usage and provider-side prompt cache hits of a request."""
+        prompt_tokens = usage.get("prompt_tokens") or 0
+        cached_tokens = (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+        timer.count("prompt_tokens", prompt_tokens)
+        timer.count("completion_tokens", usage.get("completion_tokens") or 0)
+        timer.count("cached_tokens", cached_tokens)
+        if prompt_tokens:
+            timer.count("prompt_cache_hit_rate", round(cached_tokens * 100 / prompt_tokens))
 
     async def _async_iterate_response(self, response: Any):
         """Iterate over streaming response asynchronously."""
@@ -594,25 +664,26 @@ class AIHubBaseLLMEntity(Entity):
     async def _async_download_image_from_url(self, url: str) -> bytes | None:
         """Download image from URL."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    if response.status == 200:
-                        return await response.read()
-                    else:
-                        _LOGGER.warning("Failed to download image from URL: %s, status: %s", url, response.status)
-                        return None
+            async with self._client.get(
+                url, priority=self._priority, timeout=aiohttp.ClientTimeout(total=30)
+            ) as response:
+                if response.status == 200:
+                    return await response.read()
+                else:
+                    _LOGGER.warning("Failed to download image from URL: %s, status: %s", url, response.status)
+                    return None
         except Exception as err:
             _LOGGER.warning("Error downloading image from URL %s: %s", url, err)
             return None
 
     async def _async_get_media_content(self, media_content_id: str, mime_type: str) -> bytes | None:
         """Get media content from Home Assistant media source."""
-        _LOGGER.info("Getting media content for ID: %s, mime_type: %s", media_content_id, mime_type)
+        _LOGGER.debug("Getting media content for ID: %s, mime_type: %s", media_content_id, mime_type)
 
         try:
             # Handle media-source:// URLs
             if media_content_id.startswith("media-source://"):
-                _LOGGER.info("Processing media-source URL: %s", media_content_id)
+                _LOGGER.debug("Processing media-source URL: %s", media_content_id)
 
                 if not media_source.is_media_source_id(media_content_id):
                     _LOGGER.warning("Invalid media source ID: %s", media_content_id)
@@ -623,7 +694,7 @@ class AIHubBaseLLMEntity(Entity):
                     media_item = await media_source.async_resolve_media(
                         self.hass, media_content_id, self.entity_id
                     )
-                    _LOGGER.info("Resolved media item: %s", media_item)
+                    _LOGGER.debug("Resolved media item: %s", media_item)
                 except Exception as err:
                     _LOGGER.error("Error resolving media source %s: %s", media_content_id, err, exc_info=True)
                     return None
@@ -648,7 +719,7 @@ class AIHubBaseLLMEntity(Entity):
                             _LOGGER.warning("Could not get Home Assistant URL, using localhost: %s", err)
                             media_url = f"http://localhost:8123{media_url}"
 
-                    _LOGGER.info("Media item URL: %s", media_url)
+                    _LOGGER.debug("Media item URL: %s", media_url)
 
                     # Download the media content using Home Assistant's session
                     try:
@@ -658,10 +729,10 @@ class AIHubBaseLLMEntity(Entity):
                             media_url,
                             timeout=aiohttp.ClientTimeout(total=30)
                         ) as response:
-                            _LOGGER.info("Response status: %s", response.status)
+                            _LOGGER.debug("Response status: %s", response.status)
                             if response.status == 200:
                                 content = await response.read()
-                                _LOGGER.info("Successfully downloaded media content, size: %d bytes", len(content))
+                                _LOGGER.debug("Successfully downloaded media content, size: %d bytes", len(content))
                                 return content
                             else:
                                 error_text = await response.text()
@@ -688,7 +759,7 @@ class AIHubBaseLLMEntity(Entity):
                 else:
                     url = media_content_id
 
-                _LOGGER.info("Processing serve URL: %s", url)
+                _LOGGER.debug("Processing serve URL: %s", url)
 
                 # Use Home Assistant's internal API client
                 try:
@@ -700,7 +771,7 @@ class AIHubBaseLLMEntity(Entity):
                     ) as response:
                         if response.status == 200:
                             content = await response.read()
-                            _LOGGER.info("Successfully got served image, size: %d bytes", len(content))
+                            _LOGGER.debug("Successfully got served image, size: %d bytes", len(content))
                             return content
                         else:
                             _LOGGER.warning("Failed to get served image: %s, status: %s", url, response.status)
@@ -711,7 +782,7 @@ class AIHubBaseLLMEntity(Entity):
 
             # Handle direct URLs
             elif media_content_id.startswith(("http://", "https://")):
-                _LOGGER.info("Processing direct URL: %s", media_content_id)
+                _LOGGER.debug("Processing direct URL: %s", media_content_id)
                 return await self._async_download_image_from_url(media_content_id)
 
             else:
@@ -722,14 +793,6 @@ class AIHubBaseLLMEntity(Entity):
             _LOGGER.error("Unexpected error getting media content %s: %s", media_content_id, err, exc_info=True)
             return None
 
-    def _read_file_bytes(self, file_path: str) -> bytes:
-        """Read file bytes synchronously (to be used with asyncio.to_thread)."""
-        try:
-            with open(file_path, "rb") as f:
-                return f.read()
-        except Exception as err:
-            raise Exception(f"Failed to read file {file_path}: {err}")
-
 
 class AIHubEntityBase(Entity):
     """Base entity for AI Hub integration."""
@@ -750,8 +813,15 @@ class AIHubEntityBase(Entity):
         self._attr_unique_id = subentry.subentry_id
         self._attr_name = subentry.title
 
-        # Get API key from runtime data
-        self._api_key = entry.runtime_data
+        # Shared HTTP client from runtime data
+        self._client: AIHubClient = entry.runtime_data
+        self._api_key = self._client.api_key
+        # AI Task 请求让位于实时对话
+        self._priority = (
+            PRIORITY_TASK
+            if subentry.subentry_type == "ai_task_data"
+            else PRIORITY_INTERACTIVE
+        )
 
         # Device info
         self._attr_device_info = dr.DeviceInfo(
@@ -6,12 +6,17 @@ import base64
 import io
 import json
 import logging
+import sys
 import wave
 from contextlib import suppress
+from types import ModuleType
 from typing import Any
 
+from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import HomeAssistantError
 
+from . import codec
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -36,6 +41,26 @@ def format_error_message(error: Exception) -> str:
     return f"发生错误: {error_msg}"
 
 
+def _import_edge_tts() -> ModuleType:
+    """Import edge_tts on first use instead of at platform load."""
+    try:
+        import edge_tts
+    except ImportError as err:
+        try:
+            import edgeTTS  # noqa: F401
+        except ImportError:
+            raise HomeAssistantError('edge_tts is required. Please install edge_tts.') from err
+        raise HomeAssistantError('Please uninstall edgeTTS and install edge_tts instead.') from err
+    return edge_tts
+
+
+async def async_get_edge_tts(hass: HomeAssistant) -> ModuleType:
+    """Return edge_tts, importing it in the executor the first time."""
+    if (module := sys.modules.get("edge_tts")) is not None:
+        return module
+    return await hass.async_add_import_executor_job(_import_edge_tts)
+
+
 def truncate_history(
     messages: list[dict[str, Any]], max_messages: int
 ) -> list[dict[str, Any]]:
@@ -98,7 +123,7 @@ def parse_streaming_response(response_text: str) -> list[str]:
         if line.startswith('data: '):
             try:
                 data_str = line[6:]  # Remove 'data: ' prefix
-                data_dict = json.loads(data_str)  # Parse JSON string
+                data_dict = codec.loads(data_str)  # Parse JSON string
 
                 # Extract audio content from streaming response
                 if 'choices' in data_dict and len(data_dict['choices']) > 0:
@@ -1,123 +1,285 @@
 import re
 
-_MARKDOWN_FILTER_PATTERNS = [
-    re.compile(r'^#{1,6}\s+.*$', re.MULTILINE),
-    re.compile(r'^\s*[-*+]\s+', re.MULTILINE),
-    re.compile(r'^\s*>\s+', re.MULTILINE),
-    re.compile(r'```[a-zA-Z0-9_-]*', re.MULTILINE),
-    re.compile(r'```\s*$', re.MULTILINE),
-    re.compile(r'\n{3,}'),
-    re.compile(r'\*\*([^*\n]*)\*\*'),      # 修复粗体：保留内容
-    re.compile(r'\*([^*\n]*)\*'),          # 修复斜体：保留内容
-    re.compile(r'__([^_\n]*)__'),          # 修复粗体：保留内容
-    re.compile(r'_([^_\n]*)_'),            # 修复斜体：保留内容
-    re.compile(r'^\|[^\n]*\|$', re.MULTILINE),
-    re.compile(r'^\|[\s-]*\|[\s-]*\|$', re.MULTILINE),
-    re.compile(r'~~([^~\n]*)~~'),          # 修复删除线：保留内容
-    re.compile(r'`([^`\n]*)`'),            # 修复行内代码：保留内容
-    re.compile(r'^-{3,}$|^_{3,}$|^\*{3,}$', re.MULTILINE),
-    re.compile(r'\[\^[^\]]*\]'),
-    re.compile(r'^\[\^[^\]]*\]:.*$', re.MULTILINE),
-    re.compile(r'<[^>]*>'),
-    re.compile(r'^\s*$\n^\s*$', re.MULTILINE),
-    re.compile(r'^`[a-zA-Z0-9_-]*$', re.MULTILINE)
-]
+# 行内需要判断的字符；其余字符原样批量输出
+_INLINE_SPECIAL = re.compile(r'[*_~`<\[\n]')
+# 代码块 ``` 后面的语言标记
+_FENCE_INFO = re.compile(r'[a-zA-Z0-9_-]*')
+_WHITESPACE_LINE = re.compile(r'^\s+$', re.MULTILINE)
+
+# HTML 标签和脚注引用的最大长度，超过后按普通文本输出
+_MAX_TAG_LENGTH = 256
 
 _BASE_FILTER_PATTERNS = [re.compile(r'')]
 
+
+def _is_space(char: str) -> bool:
+    """空字符串表示文本开头或结尾，按空白处理."""
+    return not char or char.isspace()
+
+
+def _is_word(char: str) -> bool:
+    """ASCII字母或数字；中文字符不算，避免保留中文里的强调标记."""
+    return char.isascii() and char.isalnum()
+
+
+class StreamingMarkdownFilter:
+    """单遍扫描的流式markdown过滤器，状态跨越token边界保留.
+
+    与逐块正则不同，被拆分到多个delta中的 ``**粗体**``、标题和代码块标记也能被
+    正确移除。只有无法判断的最短后缀（例如结尾的 ``*``、`````、``<`` 或尚未结束
+    的表格行）会被暂存，直到下一个delta或 ``flush()``。
+
+    规则与原正则链保持一致：
+    - 标题、表格行、分隔线和脚注定义整行移除
+    - 列表和引用只移除行首标记
+    - 粗体、斜体、删除线和行内代码移除标记、保留内容
+    - 代码块标记和语言名、HTML标签、脚注引用被移除
+    - 连续三个以上换行合并为两个
+
+    与正则不同的是，两侧都是空白的 ``*``、数字之间的 ``*`` 和英文单词内部的
+    ``_``（例如 ``light.living_room``）按普通文本保留。
+    """
+
+    def __init__(self) -> None:
+        """Initialize the filter."""
+        self._pending = ""
+        self._line_start = True
+        self._drop_line = False
+        self._fence_info = False
+        self._prev = ""
+        self._newlines = 0
+
+    def feed(self, text: str) -> str:
+        """过滤一个delta，返回可以立即输出的文本."""
+        if not text:
+            return ""
+        return self._process(self._pending + text, final=False)
+
+    def flush(self) -> str:
+        """流结束时输出暂存的内容."""
+        if not self._pending:
+            return ""
+        return self._process(self._pending, final=True)
+
+    def _process(self, text: str, final: bool) -> str:
+        self._pending = ""
+        out: list[str] = []
+        i = 0
+        length = len(text)
+
+        while i < length:
+            if self._fence_info:
+                end = _FENCE_INFO.match(text, i).end()
+                if end == length and not final:
+                    break
+                self._fence_info = False
+                i = end
+                continue
+
+            if self._drop_line:
+                end = text.find('\n', i)
+                if end == -1:
+                    i = length
+                    break
+                self._drop_line = False
+                i = end
+                continue
+
+            if self._line_start:
+                next_i = self._line_start_construct(text, i, final)
+                if next_i is None:
+                    # 行首还无法判断，等待更多内容
+                    self._pending = text[i:]
+                    return ''.join(out)
+                self._line_start = False
+                i = next_i
+                continue
+
+            match = _INLINE_SPECIAL.search(text, i)
+            end = match.start() if match else length
+            if end > i:
+                self._emit(out, text[i:end])
+                i = end
+            if not match:
+                break
+
+            char = text[i]
+            if char == '\n':
+                self._prev = '\n'
+                if self._newlines < 2:
+                    out.append('\n')
+                self._newlines += 1
+                self._line_start = True
+                i += 1
+                continue
+
+            next_i = self._inline_construct(text, i, final, out)
+            if next_i is None:
+                self._pending = text[i:]
+                return ''.join(out)
+            i = next_i
+
+        return ''.join(out)
+
+    def _emit(self, out: list[str], chunk: str) -> None:
+        out.append(chunk)
+        self._prev = chunk[-1]
+        if not chunk.isspace():
+            self._newlines = 0
+
+    def _line_start_construct(self, text: str, i: int, final: bool) -> int | None:
+        """处理行首语法，返回继续扫描的位置；None 表示需要更多内容."""
+        line_end = text.find('\n', i)
+        complete = line_end != -1 or final
+        if line_end == -1:
+            line_end = len(text)
+
+        j = i
+        while j < line_end and text[j] in ' \t':
+            j += 1
+        if j == line_end:
+            return i if complete else None
+
+        char = text[j]
+        if char not in '#-*+_>|[':
+            return i
+        after = text[j + 1] if j + 1 < line_end else ''
+        if not after and not complete:
+            return None
+
+        if char == '#' and j == i:
+            k = j
+            while k < line_end and text[k] == '#':
+                k += 1
+            if k == line_end and not complete:
+                return None
+            if k - j <= 6 and k < line_end and text[k] in ' \t':
+                self._drop_line = True
+                return k
+
+        if char in '-*_':
+            rest = text[j:line_end].rstrip(' \t')
+            if len(rest.strip(char)) == 0:
+                if not complete:
+                    return None
+                if len(rest) >= 3:
+                    self._drop_line = True
+                    return j
+
+        if char in '-*+' and after in (' ', '\t'):
+            k = j + 1
+            while k < line_end and text[k] in ' \t':
+                k += 1
+            return k
+
+        if char == '>' and after in (' ', '\t'):
+            return j + 2
+
+        if char == '|' and j == i:
+            if not complete:
+                return None
+            if text[j:line_end].rstrip().endswith('|'):
+                self._drop_line = True
+                return j
+
+        if char == '[' and after == '^':
+            close = text.find(']', j, line_end)
+            if close == -1 or close + 1 == line_end:
+                if not complete:
+                    return None
+            elif text[close + 1] == ':':
+                self._drop_line = True
+                return j
+
+        return i
+
+    def _inline_construct(
+        self, text: str, i: int, final: bool, out: list[str]
+    ) -> int | None:
+        """处理行内语法，返回继续扫描的位置；None 表示需要更多内容."""
+        char = text[i]
+        length = len(text)
+
+        if char in '*_~`':
+            end = i
+            while end < length and text[end] == char:
+                end += 1
+            if end == length and not final:
+                return None
+            run = end - i
+            after = text[end] if end < length else ''
+
+            if char == '`':
+                if run >= 3:
+                    self._fence_info = True
+            elif char == '~' and run == 1:
+                self._emit(out, char)
+                return end
+            elif _is_space(self._prev) and _is_space(after):
+                # 两侧都是空白，例如 "2 * 3"
+                self._emit(out, text[i:end])
+                return end
+            elif char == '_' and _is_word(self._prev) and _is_word(after):
+                # 单词内部的下划线，例如实体ID
+                self._emit(out, text[i:end])
+                return end
+            elif char == '*' and run == 1 and self._prev.isdigit() and after.isdigit():
+                # 乘号，例如 "2*3"
+                self._emit(out, char)
+                return end
+
+            self._prev = char
+            return end
+
+        if char in '<[':
+            if i + 1 == length:
+                return None if not final else self._literal(out, char, i)
+            after = text[i + 1]
+            if char == '<' and not (after.isalpha() or after in '/!'):
+                return self._literal(out, char, i)
+            if char == '[' and after != '^':
+                return self._literal(out, char, i)
+
+            close = text.find('>' if char == '<' else ']', i + 1, i + _MAX_TAG_LENGTH)
+            newline = text.find('\n', i + 1, i + _MAX_TAG_LENGTH)
+            if close != -1 and (newline == -1 or close < newline):
+                self._prev = text[close]
+                return close + 1
+            if newline == -1 and length - i < _MAX_TAG_LENGTH and not final:
+                return None
+            return self._literal(out, char, i)
+
+        return self._literal(out, char, i)
+
+    def _literal(self, out: list[str], char: str, i: int) -> int:
+        self._emit(out, char)
+        return i + 1
+
+
 def filter_markdown_content(content: str) -> str:
     """无条件过滤markdown格式内容，保留英文单词间的空格"""
     if not content:
         return ""
 
-    # 定义需要保留内容的模式（这些模式有捕获组，用于移除markdown语法但保留内容）
-    patterns_with_capture = [
-        re.compile(r'\*\*([^*\n]*)\*\*'),      # 粗体：保留内容
-        re.compile(r'\*([^*\n]*)\*'),          # 斜体：保留内容
-        re.compile(r'__([^_\n]*)__'),          # 粗体：保留内容
-        re.compile(r'_([^_\n]*)_'),            # 斜体：保留内容
-        re.compile(r'~~([^~\n]*)~~'),          # 删除线：保留内容
-        re.compile(r'`([^`\n]*)`'),            # 行内代码：保留内容
-    ]
-
-    # 定义需要完全移除的模式（这些模式没有捕获组，用于移除整行markdown语法）
-    patterns_remove = [
-        re.compile(r'^#{1,6}\s+.*$', re.MULTILINE),
-        re.compile(r'^\s*[-*+]\s+', re.MULTILINE),
-        re.compile(r'^\s*>\s+', re.MULTILINE),
-        re.compile(r'```[a-zA-Z0-9_-]*', re.MULTILINE),
-        re.compile(r'```\s*$', re.MULTILINE),
-        re.compile(r'^\|[^\n]*\|$', re.MULTILINE),
-        re.compile(r'^\|[\s-]*\|[\s-]*\|$', re.MULTILINE),
-        re.compile(r'^-{3,}$|^_{3,}$|^\*{3,}$', re.MULTILINE),
-        re.compile(r'\[\^[^\]]*\]'),
-        re.compile(r'^\[\^[^\]]*\]:.*$', re.MULTILINE),
-        re.compile(r'<[^>]*>'),
-        re.compile(r'^\s*$\n^\s*$', re.MULTILINE),
-        re.compile(r'^`[a-zA-Z0-9_-]*$', re.MULTILINE)
-    ]
-
-    # 应用需要保留内容的模式（移除markdown语法但保留内容和空格）
-    for pattern in patterns_with_capture:
-        content = pattern.sub(r'\1', content)
-
-    # 应用需要完全移除的模式
-    for pattern in patterns_remove:
-        content = pattern.sub('', content)
+    markdown_filter = StreamingMarkdownFilter()
+    content = markdown_filter.feed(content) + markdown_filter.flush()
 
-    # 规范化换行符
-    content = re.sub(r'\n{3,}', '\n\n', content)
     # 移除行首尾空白
-    content = re.sub(r'^\s+$', '', content, flags=re.MULTILINE)
+    content = _WHITESPACE_LINE.sub('', content)
 
     return content.strip()
 
 
 def filter_markdown_streaming(content: str) -> str:
-    """专门用于streaming处理的markdown过滤器，保留所有空格"""
+    """过滤单个独立的文本片段，保留所有空格.
+
+    跨delta的流式输出请使用 StreamingMarkdownFilter，它会保留状态。
+    """
     if not content:
         return ""
 
-    # 定义需要保留内容的模式（这些模式有捕获组，用于移除markdown语法但保留内容）
-    patterns_with_capture = [
-        re.compile(r'\*\*([^*\n]*)\*\*'),      # 粗体：保留内容
-        re.compile(r'\*([^*\n]*)\*'),          # 斜体：保留内容
-        re.compile(r'__([^_\n]*)__'),          # 粗体：保留内容
-        re.compile(r'_([^_\n]*)_'),            # 斜体：保留内容
-        re.compile(r'~~([^~\n]*)~~'),          # 删除线：保留内容
-        re.compile(r'`([^`\n]*)`'),            # 行内代码：保留内容
-    ]
-
-    # 定义需要完全移除的模式（只移除整行markdown语法，不影响单个chunk内的空格）
-    patterns_remove = [
-        re.compile(r'^#{1,6}\s+.*$', re.MULTILINE),
-        re.compile(r'^\s*[-*+]\s+', re.MULTILINE),
-        re.compile(r'^\s*>\s+', re.MULTILINE),
-        re.compile(r'```[a-zA-Z0-9_-]*', re.MULTILINE),
-        re.compile(r'```\s*$', re.MULTILINE),
-        re.compile(r'^\|[^\n]*\|$', re.MULTILINE),
-        re.compile(r'^\|[\s-]*\|[\s-]*\|$', re.MULTILINE),
-        re.compile(r'^-{3,}$|^_{3,}$|^\*{3,}$', re.MULTILINE),
-        re.compile(r'\[\^[^\]]*\]'),
-        re.compile(r'^\[\^[^\]]*\]:.*$', re.MULTILINE),
-        re.compile(r'<[^>]*>'),
-        re.compile(r'^\s*$\n^\s*$', re.MULTILINE),
-        re.compile(r'^`[a-zA-Z0-9_-]*$', re.MULTILINE)
-    ]
-
-    # 应用需要保留内容的模式（移除markdown语法但保留内容和空格）
-    for pattern in patterns_with_capture:
-        content = pattern.sub(r'\1', content)
-
-    # 应用需要完全移除的模式
-    for pattern in patterns_remove:
-        content = pattern.sub('', content)
-
-    # 对于streaming，不使用strip()以保留chunk内的所有空格
-    # 只规范化换行符
-    content = re.sub(r'\n{3,}', '\n\n', content)
-
-    return content
+    markdown_filter = StreamingMarkdownFilter()
+    return markdown_filter.feed(content) + markdown_filter.flush()
 
 
 def filter_markdown_content_legacy(content: str, filter_enabled: bool = False) -> str:
@@ -131,4 +293,4 @@ def filter_markdown_content_legacy(content: str, filter_enabled: bool = False) -
     if filter_enabled:
         return filter_markdown_content(content)
 
-    return content.strip() 
\ No newline at end of file
+    return content.strip()
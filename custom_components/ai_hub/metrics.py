@@ -0,0 +1,114 @@
+"""Per-stage latency metrics for the AI Hub integration."""
+
+from __future__ import annotations
+
+from collections import deque
+import statistics
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from .const import METRICS_WINDOW, SIGNAL_METRICS_UPDATED
+
+
+class StageTimer:
+    """Record when each stage of a request finished.
+
+    Every mark is the time in seconds since the timer was created, so the
+    stages of one request can be compared directly (``ttfb`` includes
+    ``connect``, which includes ``queue``, and so on). Only the first mark of
+    a stage counts.
+    """
+
+    def __init__(self) -> None:
+        """Start the timer."""
+        self._start = time.perf_counter()
+        self.timings: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+
+    def mark(self, stage: str) -> None:
+        """Record the end of a stage."""
+        if stage not in self.timings:
+            self.timings[stage] = time.perf_counter() - self._start
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Add to a counter such as the number of tool-loop iterations."""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def as_trace(self) -> dict[str, Any]:
+        """Return the timings in milliseconds for a conversation trace."""
+        return {
+            **{f"{stage}_ms": round(value * 1000, 1) for stage, value in self.timings.items()},
+            **self.counters,
+        }
+
+
+class RollingHistogram:
+    """Keep the most recent samples of one stage."""
+
+    def __init__(self, window: int = METRICS_WINDOW) -> None:
+        """Initialize the histogram."""
+        self._samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, value: float) -> None:
+        """Add a sample."""
+        self._samples.append(value)
+        self.count += 1
+
+    @property
+    def last(self) -> float | None:
+        """Return the latest sample."""
+        return self._samples[-1] if self._samples else None
+
+    def percentile(self, percent: int) -> float | None:
+        """Return a percentile of the window."""
+        if not self._samples:
+            return None
+        if len(self._samples) == 1:
+            return self._samples[0]
+        return statistics.quantiles(self._samples, n=100, method="inclusive")[percent - 1]
+
+    def summary(self) -> dict[str, Any]:
+        """Return count, last, p50, p95 and max of the window."""
+        return {
+            "count": self.count,
+            "last": self.last,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": max(self._samples) if self._samples else None,
+        }
+
+
+class MetricsRegistry:
+    """Rolling histograms per subentry and stage."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the registry."""
+        self.hass = hass
+        self._histograms: dict[str, dict[str, RollingHistogram]] = {}
+
+    def histogram(self, subentry_id: str, stage: str) -> RollingHistogram:
+        """Return the histogram of a stage, creating it if needed."""
+        stages = self._histograms.setdefault(subentry_id, {})
+        if stage not in stages:
+            stages[stage] = RollingHistogram()
+        return stages[stage]
+
+    @callback
+    def async_record(self, subentry_id: str, timer: StageTimer) -> None:
+        """Record a finished request and notify the sensors of the subentry."""
+        for stage, value in timer.timings.items():
+            self.histogram(subentry_id, stage).record(value)
+        for name, value in timer.counters.items():
+            self.histogram(subentry_id, name).record(value)
+        async_dispatcher_send(self.hass, SIGNAL_METRICS_UPDATED.format(subentry_id))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return summaries of every histogram."""
+        return {
+            subentry_id: {stage: hist.summary() for stage, hist in stages.items()}
+            for subentry_id, stages in self._histograms.items()
+        }
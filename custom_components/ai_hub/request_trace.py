@@ -0,0 +1,145 @@
+"""Sampled, redacted request tracing for AI Hub.
+
+Tracing is off by default. When it is enabled with the ``set_request_trace``
+service, one in every ``sample_every`` outbound requests is logged on the
+``custom_components.ai_hub.trace`` logger. Each traced request gets a line
+for the request, one for the response status and one for the total time.
+Binary payloads (bytes, data URIs, long base64 strings) are replaced by their
+size and a short hash, long text is truncated and credentials are masked. No
+formatting work is done for requests that are not traced.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import time
+from typing import Any
+
+import aiohttp
+
+from . import codec
+from .const import PRIORITY_NAMES, TRACE_BINARY_MIN, TRACE_LOGGER_NAME, TRACE_MAX_TEXT
+
+_TRACE_LOGGER = logging.getLogger(TRACE_LOGGER_NAME)
+
+_BASE64 = re.compile(r"[A-Za-z0-9+/=\r\n]+")
+_SECRET_KEYS = {"authorization", "api_key", "apikey", "uid", "token"}
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def _describe_text(value: str) -> str:
+    """Replace binary-looking strings by size and hash, truncate long text."""
+    if value.startswith("data:") and ";base64," in value[:100]:
+        header, _, encoded = value.partition(",")
+        return f"<{header} {len(encoded)} chars sha256:{_digest(encoded.encode())}>"
+    if len(value) >= TRACE_BINARY_MIN and _BASE64.fullmatch(value, 0, TRACE_BINARY_MIN):
+        return f"<base64 {len(value)} chars sha256:{_digest(value.encode())}>"
+    if len(value) > TRACE_MAX_TEXT:
+        return f"{value[:TRACE_MAX_TEXT]}...(+{len(value) - TRACE_MAX_TEXT} chars)"
+    return value
+
+
+def redact(value: Any) -> Any:
+    """Return a copy of a request payload that is safe and cheap to log."""
+    if isinstance(value, str):
+        return _describe_text(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        data = bytes(value)
+        return f"<bytes {len(data)} sha256:{_digest(data)}>"
+    if isinstance(value, dict):
+        return {
+            key: "***" if str(key).lower() in _SECRET_KEYS else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    if isinstance(value, codec.RawJSON):
+        return redact(value.value)
+    if isinstance(value, aiohttp.FormData):
+        # FormData 没有公开的字段列表，只记录类型
+        return "<multipart form-data>"
+    return value
+
+
+class RequestTrace:
+    """Trace of one sampled request."""
+
+    def __init__(
+        self, seq: int, method: str, url: str, priority: int, payload: Any
+    ) -> None:
+        """Log the request."""
+        self.seq = seq
+        self._start = time.perf_counter()
+        _TRACE_LOGGER.info(
+            "#%d %s %s priority=%s body=%s",
+            seq,
+            method,
+            url,
+            PRIORITY_NAMES.get(priority, priority),
+            redact(payload),
+        )
+
+    def response(self, status: int) -> None:
+        """Log the response status and time to headers."""
+        _TRACE_LOGGER.info(
+            "#%d status=%d headers_after=%.1fms",
+            self.seq,
+            status,
+            (time.perf_counter() - self._start) * 1000,
+        )
+
+    def finish(self, error: BaseException | None = None) -> None:
+        """Log the total time once the response has been consumed."""
+        elapsed = (time.perf_counter() - self._start) * 1000
+        if error is None:
+            _TRACE_LOGGER.info("#%d done total=%.1fms", self.seq, elapsed)
+        else:
+            _TRACE_LOGGER.info(
+                "#%d failed total=%.1fms error=%r", self.seq, elapsed, error
+            )
+
+
+class RequestTracer:
+    """Decide which requests are traced."""
+
+    def __init__(self) -> None:
+        """Initialize the tracer, disabled."""
+        self.sample_every = 0
+        self._seq = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Return True if any request is traced."""
+        return self.sample_every > 0
+
+    def configure(self, sample_every: int) -> None:
+        """Trace one in every ``sample_every`` requests; 0 turns tracing off.
+
+        The trace logger is raised to INFO while tracing is on, so it shows up
+        without changing the log level of the whole integration.
+        """
+        self.sample_every = max(sample_every, 0)
+        self._seq = 0
+        _TRACE_LOGGER.setLevel(logging.INFO if self.enabled else logging.NOTSET)
+
+    def start(
+        self, method: str, url: str, priority: int, payload: Any
+    ) -> RequestTrace | None:
+        """Return a trace if this request is sampled, None otherwise."""
+        if not self.sample_every:
+            return None
+        self._seq += 1
+        if (self._seq - 1) % self.sample_every:
+            return None
+        if not _TRACE_LOGGER.isEnabledFor(logging.INFO):
+            return None
+        return RequestTrace(self._seq, method, url, priority, payload)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the tracer settings for diagnostics."""
+        return {"sample_every": self.sample_every, "requests_seen": self._seq}
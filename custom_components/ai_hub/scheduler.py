@@ -0,0 +1,206 @@
+"""Per-provider request scheduler for the AI Hub integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+import heapq
+import itertools
+import logging
+import time
+from typing import Any
+from urllib.parse import urlsplit
+
+from .const import (
+    PRIORITY_INTERACTIVE,
+    PRIORITY_NAMES,
+    SCHEDULER_PRIORITY_RESERVE,
+    SCHEDULER_PROVIDER_LIMITS,
+    SCHEDULER_SLOW_WAIT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class _ClassStats:
+    """Queue statistics for one priority class."""
+
+    queued: int = 0
+    max_queued: int = 0
+    acquired: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics as a dict."""
+        return {
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "acquired": self.acquired,
+            "avg_wait": round(self.total_wait / self.acquired, 4) if self.acquired else 0.0,
+            "max_wait": round(self.max_wait, 4),
+        }
+
+
+class ProviderLimiter:
+    """Concurrency limit plus token bucket for a single provider.
+
+    Waiters are served strictly by priority class, then in arrival order.
+    Lower classes may only use ``max_concurrency - reserve * priority`` slots,
+    so a burst of background work always leaves room for a voice turn.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        rate: float,
+        burst: int,
+        reserve: int = SCHEDULER_PRIORITY_RESERVE,
+    ) -> None:
+        """Initialize the limiter."""
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.rate = rate
+        self.burst = burst
+        self.reserve = reserve
+        self._active = 0
+        self._waiters: list[list[Any]] = []
+        self._seq = itertools.count()
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._stats = {priority: _ClassStats() for priority in PRIORITY_NAMES}
+
+    def _limit(self, priority: int) -> int:
+        """Return how many slots a priority class may occupy."""
+        return max(1, self.max_concurrency - self.reserve * priority)
+
+    def _can_start(self, priority: int) -> bool:
+        """Return True if a request of this class may start right now."""
+        if self._active >= self._limit(priority):
+            return False
+        # 不允许插队到同级或更高优先级的等待者之前
+        return not self._waiters or self._waiters[0][0] > priority
+
+    def _wake_waiters(self) -> None:
+        """Hand free slots to the highest priority waiters."""
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if self._active >= self._limit(priority):
+                break
+            heapq.heappop(self._waiters)
+            self._active += 1
+            future.set_result(None)
+
+    async def _async_take_token(self) -> None:
+        """Wait until the token bucket allows another request."""
+        while True:
+            now = time.monotonic()
+            self._tokens = min(
+                float(self.burst), self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    async def async_acquire(self, priority: int) -> None:
+        """Acquire a slot for a request of the given priority class."""
+        stats = self._stats[priority]
+        start = time.monotonic()
+
+        if self._can_start(priority):
+            self._active += 1
+        else:
+            entry = [priority, next(self._seq), asyncio.get_running_loop().create_future()]
+            heapq.heappush(self._waiters, entry)
+            stats.queued += 1
+            stats.max_queued = max(stats.max_queued, stats.queued)
+            try:
+                await entry[2]
+            except asyncio.CancelledError:
+                if entry[2].done() and not entry[2].cancelled():
+                    # 槽位已经分配给我们，交还给下一个等待者
+                    self.release()
+                else:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                raise
+            finally:
+                stats.queued -= 1
+
+        try:
+            await self._async_take_token()
+        except asyncio.CancelledError:
+            self.release()
+            raise
+
+        waited = time.monotonic() - start
+        stats.acquired += 1
+        stats.total_wait += waited
+        stats.max_wait = max(stats.max_wait, waited)
+        if waited >= SCHEDULER_SLOW_WAIT:
+            _LOGGER.debug(
+                "%s request (%s) waited %.2fs for a slot",
+                self.name,
+                PRIORITY_NAMES[priority],
+                waited,
+            )
+
+    def release(self) -> None:
+        """Release a slot."""
+        self._active -= 1
+        self._wake_waiters()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return limiter state and per-class statistics."""
+        return {
+            "active": self._active,
+            "max_concurrency": self.max_concurrency,
+            "rate": self.rate,
+            "burst": self.burst,
+            "classes": {
+                PRIORITY_NAMES[priority]: stats.as_dict()
+                for priority, stats in self._stats.items()
+            },
+        }
+
+
+class RequestScheduler:
+    """Route requests through per-provider limiters keyed by host name."""
+
+    def __init__(
+        self, limits: dict[str, dict[str, Any]] = SCHEDULER_PROVIDER_LIMITS
+    ) -> None:
+        """Initialize the scheduler."""
+        self._limiters = {
+            host: ProviderLimiter(host, **config) for host, config in limits.items()
+        }
+
+    def limiter_for_url(self, url: str) -> ProviderLimiter | None:
+        """Return the limiter for a URL, or None if the host is not governed."""
+        return self._limiters.get(urlsplit(str(url)).hostname or "")
+
+    @asynccontextmanager
+    async def slot(
+        self, url: str, priority: int = PRIORITY_INTERACTIVE
+    ) -> AsyncIterator[None]:
+        """Hold a provider slot for the duration of the block."""
+        limiter = self.limiter_for_url(url)
+        if limiter is None:
+            yield
+            return
+
+        await limiter.async_acquire(priority)
+        try:
+            yield
+        finally:
+            limiter.release()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return statistics for every provider."""
+        return {host: limiter.as_dict() for host, limiter in self._limiters.items()}
@@ -0,0 +1,128 @@
+"""Latency sensors for AI Hub."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry, ConfigSubentry
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .client import AIHubClient
+from .const import (
+    DOMAIN,
+    METRICS_COUNTERS,
+    METRICS_STAGES,
+    SIGNAL_METRICS_UPDATED,
+    get_localized_name,
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up latency sensors for every subentry that records metrics."""
+    for subentry in config_entry.subentries.values():
+        stages = METRICS_STAGES.get(subentry.subentry_type)
+        if not stages:
+            continue
+
+        async_add_entities(
+            [
+                AIHubLatencySensor(hass, config_entry, subentry, stage, zh_name, en_name, enabled)
+                for stage, zh_name, en_name, enabled in stages
+            ],
+            config_subentry_id=subentry.subentry_id,
+        )
+
+
+class AIHubLatencySensor(SensorEntity):
+    """Rolling median of one request stage of a subentry."""
+
+    _attr_has_entity_name = False
+    _attr_should_poll = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        subentry: ConfigSubentry,
+        stage: str,
+        zh_name: str,
+        en_name: str,
+        enabled: bool,
+    ) -> None:
+        """Initialize the sensor."""
+        self._client: AIHubClient = entry.runtime_data
+        self._subentry = subentry
+        self._stage = stage
+        self._is_duration = stage not in METRICS_COUNTERS
+
+        self._attr_unique_id = f"{subentry.subentry_id}_latency_{stage}"
+        self._attr_name = f"{subentry.title} {get_localized_name(hass, zh_name, en_name)}"
+        self._attr_entity_registry_enabled_default = enabled
+        if self._is_duration:
+            self._attr_device_class = SensorDeviceClass.DURATION
+            self._attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+            self._attr_suggested_display_precision = 0
+        else:
+            self._attr_icon, self._attr_native_unit_of_measurement = METRICS_COUNTERS[stage]
+            self._attr_suggested_display_precision = 1
+
+        # Attach to the device of the subentry
+        self._attr_device_info = dr.DeviceInfo(
+            identifiers={(DOMAIN, subentry.subentry_id)},
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to metric updates of the subentry."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_METRICS_UPDATED.format(self._subentry.subentry_id),
+                self._async_metrics_updated,
+            )
+        )
+
+    @callback
+    def _async_metrics_updated(self) -> None:
+        """Write the new rolling values."""
+        self.async_write_ha_state()
+
+    def _scaled(self, value: float | None) -> float | None:
+        """Convert seconds to milliseconds for duration stages."""
+        if value is None:
+            return None
+        return round(value * 1000, 1) if self._is_duration else value
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the rolling median."""
+        histogram = self._client.metrics.histogram(self._subentry.subentry_id, self._stage)
+        return self._scaled(histogram.percentile(50))
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return p95, max, last sample and sample count."""
+        summary = self._client.metrics.histogram(
+            self._subentry.subentry_id, self._stage
+        ).summary()
+        return {
+            "p95": self._scaled(summary["p95"]),
+            "max": self._scaled(summary["max"]),
+            "last": self._scaled(summary["last"]),
+            "count": summary["count"],
+        }
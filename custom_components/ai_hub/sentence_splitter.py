@@ -0,0 +1,75 @@
+"""CJK-aware sentence boundary detection for streaming TTS."""
+
+from __future__ import annotations
+
+import re
+
+from .const import TTS_SENTENCE_MAX_CHARS
+
+# 句末标点（含紧随其后的右引号和右括号）；英文句点后必须跟空白，避免切开小数和网址
+_CLOSERS = "”’\"'）)」』】]"
+_BOUNDARY = re.compile(rf"(?:[。！？!?；;…\n]+|\.(?=\s))[{re.escape(_CLOSERS)}]*")
+# 句子过长时可以提前切分的位置
+_SOFT_BREAK = re.compile(r"[，,、：:]")
+
+
+def _speakable(sentence: str) -> bool:
+    """Return True if the sentence has something to say besides punctuation."""
+    return any(char.isalnum() for char in sentence)
+
+
+class SentenceSplitter:
+    """Split text fed in arbitrary fragments into complete sentences.
+
+    Sentences end at Chinese and Western terminal punctuation or a newline.
+    A ``.`` only ends a sentence when whitespace follows, so ``3.14`` and
+    ``light.living_room`` stay intact; a trailing ``.`` waits for the next
+    fragment. Sentences longer than ``max_chars`` are split at the last comma
+    so the first audio is not held back by a long first sentence. Fragments
+    without letters or digits are dropped since they produce no speech.
+    """
+
+    def __init__(self, max_chars: int = TTS_SENTENCE_MAX_CHARS) -> None:
+        """Initialize the splitter."""
+        self._max_chars = max_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> list[str]:
+        """Add text and return the sentences it completed."""
+        self._buffer += text
+        sentences: list[str] = []
+        start = 0
+        for match in _BOUNDARY.finditer(self._buffer):
+            # 右引号可能还在下一个片段中，结尾处的匹配等到后续内容再确认
+            if match.end() == len(self._buffer) and self._buffer[-1] not in _CLOSERS + "\n":
+                break
+            self._add(sentences, self._buffer[start:match.end()])
+            start = match.end()
+        self._buffer = self._buffer[start:]
+
+        while len(self._buffer) > self._max_chars:
+            soft = None
+            for soft in _SOFT_BREAK.finditer(self._buffer, 0, self._max_chars):
+                pass
+            end = soft.end() if soft else self._max_chars
+            self._add(sentences, self._buffer[:end])
+            self._buffer = self._buffer[end:]
+        return sentences
+
+    def flush(self) -> list[str]:
+        """Return the remaining text as the last sentence."""
+        sentences: list[str] = []
+        self._add(sentences, self._buffer)
+        self._buffer = ""
+        return sentences
+
+    @staticmethod
+    def _add(sentences: list[str], sentence: str) -> None:
+        if _speakable(sentence := sentence.strip()):
+            sentences.append(sentence)
+
+
+def split_sentences(text: str, max_chars: int = TTS_SENTENCE_MAX_CHARS) -> list[str]:
+    """Split a complete text into sentences."""
+    splitter = SentenceSplitter(max_chars)
+    return [*splitter.feed(text), *splitter.flush()]
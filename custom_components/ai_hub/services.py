@@ -4,26 +4,24 @@ from __future__ import annotations
 
 import asyncio
 import base64
+import hashlib
 import io
 import json
 import logging
 import os
 import re
-import tempfile
 import time
 from pathlib import Path
 
-import yaml
-
 import aiohttp
-import requests
 import voluptuous as vol
 from homeassistant.components import camera
 from homeassistant.core import HomeAssistant, ServiceCall
 from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
-from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import config_validation as cv, entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+from . import codec
 from .const import (
     AI_HUB_CHAT_URL,
     AI_HUB_IMAGE_GEN_URL,
@@ -31,7 +29,6 @@ from .const import (
     AI_HUB_STT_MODELS,
     BEMFA_API_URL,
     CONF_API_KEY,
-    CONF_BEMFA_UID,
     CONF_CHAT_MODEL,
     CONF_MAX_TOKENS,
     CONF_STT_FILE,
@@ -41,9 +38,10 @@ from .const import (
     CONF_TARGET_COMPONENT,
     DEFAULT_REQUEST_TIMEOUT,
     DOMAIN,
-    EDGE_TTS_VOICES,
     ERROR_GETTING_RESPONSE,
     IMAGE_SIZES,
+    PRIORITY_BACKGROUND,
+    PRIORITY_TASK,
     RECOMMENDED_IMAGE_ANALYSIS_MODEL,
     RECOMMENDED_IMAGE_MODEL,
     RECOMMENDED_MAX_TOKENS,
@@ -56,13 +54,20 @@ from .const import (
     SERVICE_SEND_WECHAT_MESSAGE,
     SERVICE_TRANSLATE_COMPONENTS,
     SERVICE_TRANSLATE_BLUEPRINTS,
+    SERVICE_SET_REQUEST_TRACE,
     SILICONFLOW_ASR_URL,
+    SILICONFLOW_STT_AUDIO_FORMATS,
     STT_MAX_FILE_SIZE_MB,
     TTS_DEFAULT_PITCH,
     TTS_DEFAULT_RATE,
     TTS_DEFAULT_VOICE,
     TTS_DEFAULT_VOLUME,
 )
+from .client import AIHubClient
+from .singleflight import SingleFlight
+from .sse import SSE_DONE, async_iter_sse
+from .tts import async_synthesize_message
+from .voice_catalog import async_get_voice_catalog_store
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -87,7 +92,8 @@ IMAGE_GENERATOR_SCHEMA = {
 # Schema for Edge TTS service
 TTS_SCHEMA = {
     vol.Required("text"): cv.string,
-    vol.Optional("voice", default=TTS_DEFAULT_VOICE): vol.In(list(EDGE_TTS_VOICES.keys())),
+    # 语音在调用时按语音目录校验，目录刷新后新增的语音也可以使用
+    vol.Optional("voice", default=TTS_DEFAULT_VOICE): cv.string,
     vol.Optional("rate", default=TTS_DEFAULT_RATE): cv.string,
     vol.Optional("volume", default=TTS_DEFAULT_VOLUME): cv.string,
     vol.Optional("pitch", default=TTS_DEFAULT_PITCH): cv.string,
@@ -122,23 +128,26 @@ BLUEPRINTS_TRANSLATION_SCHEMA = {
     vol.Optional("force_translation", default=False): cv.boolean,
 }
 
+# Schema for request trace service
+REQUEST_TRACE_SCHEMA = {
+    vol.Required("sample_every"): vol.All(vol.Coerce(int), vol.Range(min=0, max=1000)),
+}
+
 
 async def async_setup_services(hass: HomeAssistant, config_entry) -> None:
     """Set up services for AI Hub integration."""
 
-    api_key = config_entry.runtime_data
-    bemfa_uid = config_entry.data.get(CONF_BEMFA_UID) if hasattr(config_entry, 'data') else None
-
-    # Store bemfa_uid in config_entry for easy access
-    if bemfa_uid:
-        setattr(config_entry, 'bemfa_uid', bemfa_uid)
+    client: AIHubClient = config_entry.runtime_data
 
     # Function to check if we have required API keys for services
     def has_zhipu_api_key() -> bool:
-        return api_key is not None and api_key.strip() != ""
+        return client.has_api_key
 
     def has_bemfa_uid() -> bool:
-        return bemfa_uid is not None and bemfa_uid.strip() != ""
+        return client.bemfa_uid is not None and client.bemfa_uid.strip() != ""
+
+    # Coalesce identical concurrent service calls
+    flights = SingleFlight()
 
     async def handle_analyze_image(call: ServiceCall) -> dict:
         """Handle image analysis service call."""
@@ -156,16 +165,16 @@ async def async_setup_services(hass: HomeAssistant, config_entry) -> None:
                 image_data = await _load_image_from_file(hass, image_file)
 
             # Get image from camera entity
+            # 同一摄像头的并发调用共享一次快照抓取
             elif image_entity := call.data.get("image_entity"):
-                image_data = await _load_image_from_camera(hass, image_entity)
+                image_data = await flights.run(
+                    ("snapshot", image_entity),
+                    lambda: _load_image_from_camera(hass, image_entity),
+                )
 
             if not image_data:
                 raise ServiceValidationError("必须提供 image_file 或 image_entity 参数")
 
-            # Resize and convert image to save bandwidth
-            processed_image_data = await _process_image(image_data)
-            base64_image = base64.b64encode(processed_image_data).decode()
-
             # Prepare API request
             model = call.data.get("model", RECOMMENDED_IMAGE_ANALYSIS_MODEL)
             message = call.data["message"]
@@ -173,60 +182,21 @@ async def async_setup_services(hass: HomeAssistant, config_entry) -> None:
             max_tokens = call.data.get("max_tokens", RECOMMENDED_MAX_TOKENS)
             stream = call.data.get("stream", False)
 
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            }
-
-            # Try exact format from AI Hub official documentation
-            payload = {
-                "model": model,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{base64_image}"
-                                }
-                            },
-                            {
-                                "type": "text",
-                                "text": message
-                            }
-                        ]
-                    }
-                ]
-            }
-
-            # Only add non-problematic parameters
-            if stream:
-                payload["stream"] = True
-
-            # Make API call
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    AI_HUB_CHAT_URL,
-                    json=payload,
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=60),
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        _LOGGER.error("API request failed: %s", error_text)
-                        raise HomeAssistantError(f"{ERROR_GETTING_RESPONSE}: {error_text}")
-
-                    if stream:
-                        return await _handle_stream_response(hass, response)
-                    else:
-                        result = await response.json()
-                        content = result["choices"][0]["message"]["content"]
-                        return {
-                            "success": True,
-                            "content": content,
-                            "model": model,
-                        }
+            # 相同模型、提示词和图像内容的并发调用只请求一次
+            key = (
+                "analyze",
+                model,
+                message,
+                temperature,
+                max_tokens,
+                stream,
+                hashlib.sha256(image_data).hexdigest(),
+            )
+            return dict(
+                await flights.run(
+                    key, lambda: _analyze_image(image_data, model, message, stream)
+                )
+            )
 
         except Exception as err:
             _LOGGER.error("Error analyzing image: %s", err)
@@ -235,6 +205,64 @@ async def async_setup_services(hass: HomeAssistant, config_entry) -> None:
                 "error": str(err)
             }
 
+    async def _analyze_image(
+        image_data: bytes, model: str, message: str, stream: bool
+    ) -> dict:
+        """Encode the image and send it to the vision model."""
+        # Resize and convert image to save bandwidth
+        processed_image_data = await _process_image(image_data)
+        base64_image = base64.b64encode(processed_image_data).decode()
+
+        # Try exact format from AI Hub official documentation
+        payload = {
+            "model": model,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": f"data:image/jpeg;base64,{base64_image}"
+                            }
+                        },
+                        {
+                            "type": "text",
+                            "text": message
+                        }
+                    ]
+                }
+            ]
+        }
+
+        # Only add non-problematic parameters
+        if stream:
+            payload["stream"] = True
+
+        # Make API call
+        async with client.post(
+            AI_HUB_CHAT_URL,
+            priority=PRIORITY_TASK,
+            json=payload,
+            headers=client.zhipu_headers(),
+            timeout=aiohttp.ClientTimeout(total=60),
+        ) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                _LOGGER.error("API request failed: %s", error_text)
+                raise HomeAssistantError(f"{ERROR_GETTING_RESPONSE}: {error_text}")
+
+            if stream:
+                return await _handle_stream_response(hass, response)
+            else:
+                result = await response.json(loads=codec.loads)
+                content = result["choices"][0]["message"]["content"]
+                return {
+                    "success": True,
+                    "content": content,
+                    "model": model,
+                }
+
     async def handle_generate_image(call: ServiceCall) -> dict:
         """Handle image generation service call."""
         try:
@@ -247,11 +275,6 @@ async def async_setup_services(hass: HomeAssistant, config_entry) -> None:
             size = call.data.get("size", "1024x1024")
             model = call.data.get("model", RECOMMENDED_IMAGE_MODEL)
 
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            }
-
             payload = {
                 "model": model,
                 "prompt": prompt,
@@ -259,45 +282,45 @@ async def async_setup_services(hass: HomeAssistant, config_entry) -> None:
             }
 
             # Make API call
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    AI_HUB_IMAGE_GEN_URL,
-                    json=payload,
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=120),  # Image generation takes longer
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        _LOGGER.error("Image generation API request failed: %s", error_text)
-                        raise HomeAssistantError(f"{ERROR_GETTING_RESPONSE}: {error_text}")
-
-                    result = await response.json()
-
-                    # Process the response based on AI Hub's actual API response format
-                    if "data" in result and len(result["data"]) > 0:
-                        image_data = result["data"][0]
-                        image_url = image_data.get("url", "")
-                        if image_url:
+            async with client.post(
+                AI_HUB_IMAGE_GEN_URL,
+                priority=PRIORITY_TASK,
+                json=payload,
+                headers=client.zhipu_headers(),
+                timeout=aiohttp.ClientTimeout(total=120),  # Image generation takes longer
+            ) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    _LOGGER.error("Image generation API request failed: %s", error_text)
+                    raise HomeAssistantError(f"{ERROR_GETTING_RESPONSE}: {error_text}")
+
+                result = await response.json(loads=codec.loads)
+
+                # Process the response based on AI Hub's actual API response format
+                if "data" in result and len(result["data"]) > 0:
+                    image_data = result["data"][0]
+                    image_url = image_data.get("url", "")
+                    if image_url:
+                        return {
+                            "success": True,
+                            "image_url": image_url,
+                            "prompt": prompt,
+                            "size": size,
+                            "model": model,
+                        }
+                    else:
+                        # If base64 image is returned instead of URL
+                        b64_json = image_data.get("b64_json", "")
+                        if b64_json:
                             return {
                                 "success": True,
-                                "image_url": image_url,
+                                "image_base64": b64_json,
                                 "prompt": prompt,
                                 "size": size,
                                 "model": model,
                             }
-                        else:
-                            # If base64 image is returned instead of URL
-                            b64_json = image_data.get("b64_json", "")
-                            if b64_json:
-                                return {
-                                    "success": True,
-                                    "image_base64": b64_json,
-                                    "prompt": prompt,
-                                    "size": size,
-                                    "model": model,
-                                }
-
-                    raise HomeAssistantError("无法获取生成的图像")
+
+                raise HomeAssistantError("无法获取生成的图像")
 
         except Exception as err:
             _LOGGER.error("Error generating image: %s", err)
@@ -307,179 +330,71 @@ async def async_setup_services(hass: HomeAssistant, config_entry) -> None:
             }
 
     async def handle_tts_speech(call: ServiceCall) -> dict:
-        """Handle TTS service call."""
+        """Handle Edge TTS service call."""
         try:
-            if not has_zhipu_api_key():
-                return {
-                    "success": False,
-                    "error": "智谱AI API密钥未配置，请先在集成配置中设置API密钥"
-                }
             text = call.data["text"]
-            voice = call.data.get("voice", TTS_DEFAULT_VOICE)
-            speed = float(call.data.get("speed", TTS_DEFAULT_VOLUME))
-            volume = float(call.data.get("volume", TTS_DEFAULT_VOLUME))
-            response_format = call.data.get("response_format", TTS_DEFAULT_RATE)
-            encode_format = call.data.get("encode_format", TTS_DEFAULT_VOICE)
-            stream = call.data.get("stream", TTS_DEFAULT_PITCH)
+            voice = call.data["voice"]
+            opt = {
+                "rate": call.data["rate"],
+                "volume": call.data["volume"],
+                "pitch": call.data["pitch"],
+            }
             media_player_entity = call.data.get("media_player_entity")
 
             # 验证参数
             if not text or not text.strip():
                 raise ServiceValidationError("文本内容不能为空")
+            if voice not in await async_get_voice_catalog_store(hass).async_load():
+                raise ServiceValidationError(f"不支持的语音: {voice}")
+
+            # 如果指定了媒体播放器实体，通过本集成的 TTS 实体播放
+            if media_player_entity:
+                registry = er.async_get(hass)
+                tts_entities = [
+                    entity.entity_id
+                    for entity in er.async_entries_for_config_entry(registry, config_entry.entry_id)
+                    if entity.domain == "tts"
+                ]
+                if not tts_entities:
+                    return {"success": False, "error": "未找到 Edge TTS 语音实体，无法播放"}
+                try:
+                    await hass.services.async_call(
+                        "tts",
+                        "speak",
+                        {
+                            "entity_id": tts_entities[0],
+                            "media_player_entity_id": media_player_entity,
+                            "message": text,
+                            "options": {"voice": voice, **opt},
+                        },
+                        blocking=True,
+                    )
+                except Exception as exc:
+                    _LOGGER.error("媒体播放失败: %s", exc)
+                    return {"success": False, "error": f"媒体播放失败: {exc}"}
 
-            if voice not in EDGE_TTS_VOICES:
-                raise ServiceValidationError(f"不支持的语音类型: {voice}")
-
-            if response_format not in TTS_DEFAULT_RATE:
-                raise ServiceValidationError(f"不支持的响应格式: {response_format}")
-
-            if encode_format not in TTS_DEFAULT_VOICE:
-                raise ServiceValidationError(f"不支持的编码格式: {encode_format}")
-
-            if not 0.25 <= speed <= 4.0:
-                raise ServiceValidationError("语速必须在 0.25 到 4.0 之间")
-
-            if not 0.1 <= volume <= 2.0:
-                raise ServiceValidationError("音量必须在 0.1 到 2.0 之间")
-
-            # 构建 TTS API 请求
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            }
+                return {
+                    "success": True,
+                    "message": "语音播放成功",
+                    "media_player": media_player_entity,
+                }
 
-            payload = {
-                "model": "cogtts",
-                "input": text,
+            # 与 TTS 实体共用合成流程和短语音频缓存，返回音频数据供其他用途
+            audio_data = await async_synthesize_message(hass, text, voice, opt)
+            return {
+                "success": True,
+                "audio_data": base64.b64encode(audio_data).decode(),
+                "audio_format": "mp3",
                 "voice": voice,
-                "response_format": response_format,
-                "encode_format": encode_format,
-                "stream": stream,
-                "speed": speed,
-                "volume": volume,
+                **opt,
             }
 
-            timeout = aiohttp.ClientTimeout(total=DEFAULT_REQUEST_TIMEOUT / 1000)
-
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(
-                    EDGE_TTS_VOICES,
-                    headers=headers,
-                    json=payload
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        _LOGGER.error(
-                            "智谱AI TTS API 错误: %s - %s",
-                            response.status,
-                            error_text
-                        )
-                        return {
-                            "success": False,
-                            "error": f"TTS API 请求失败: {response.status}"
-                        }
-
-                    if stream:
-                        # 处理流式响应
-                        response_text = await response.text()
-                        from .helpers import parse_streaming_response, combine_audio_chunks
-
-                        audio_chunks = parse_streaming_response(response_text)
-
-                        if not audio_chunks:
-                            return {"success": False, "error": "未从流式响应中获取到音频数据"}
-
-                        # 合并音频块
-                        combined_audio = audio_chunks[0]  # 对于 TTS，通常第一个块就包含完整数据
-
-                        # 如果有多个块，尝试合并
-                        if len(audio_chunks) > 1:
-                            try:
-                                combined_audio = combine_audio_chunks(audio_chunks)
-                            except Exception as exc:
-                                _LOGGER.warning("音频合并失败，使用第一个音频块: %s", exc)
-
-                        audio_base64 = combined_audio
-                    else:
-                        # 处理非流式响应
-                        response_data = await response.json()
-
-                        if "choices" not in response_data or not response_data["choices"]:
-                            return {"success": False, "error": "API 响应格式错误"}
-
-                        # 从非流式响应中提取音频数据
-                        choice = response_data["choices"][0]
-                        if "audio" in choice:
-                            audio_base64 = choice["audio"]["content"]
-                        elif "message" in choice and "content" in choice["message"]:
-                            audio_base64 = choice["message"]["content"]
-                        else:
-                            return {"success": False, "error": "无法从响应中提取音频数据"}
-
-                    # 解码音频为 WAV 格式
-                    from .helpers import decode_base64_audio
-                    wav_audio_data = decode_base64_audio(audio_base64)
-
-                    # 如果指定了媒体播放器实体，直接播放
-                    if media_player_entity:
-                        try:
-                            # 将音频数据保存为临时文件
-                            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                                temp_file.write(wav_audio_data)
-                                temp_file_path = temp_file.name
-
-                            # 调用媒体播放器的播放服务
-                            await hass.services.async_call(
-                                "media_player",
-                                "play_media",
-                                {
-                                    "entity_id": media_player_entity,
-                                    "media_content_id": f"file://{temp_file_path}",
-                                    "media_content_type": "audio/wav",
-                                },
-                                blocking=True,
-                            )
-
-                            # 延迟删除临时文件
-                            await asyncio.sleep(1)
-                            try:
-                                os.unlink(temp_file_path)
-                            except OSError:
-                                pass  # 文件可能已被系统删除
-
-                            return {
-                                "success": True,
-                                "message": "语音播放成功",
-                                "media_player": media_player_entity,
-                            }
-
-                        except Exception as exc:
-                            _LOGGER.error("媒体播放失败: %s", exc)
-                            return {
-                                "success": False,
-                                "error": f"媒体播放失败: {exc}",
-                                "audio_data": audio_base64,
-                            }
-
-                    # 返回音频数据供其他用途
-                    return {
-                        "success": True,
-                        "audio_data": audio_base64,
-                        "audio_format": "wav",
-                        "voice": voice,
-                        "speed": speed,
-                        "volume": volume,
-                    }
-
         except ServiceValidationError as exc:
             _LOGGER.error("TTS service validation error: %s", exc)
             return {"success": False, "error": str(exc)}
-        except aiohttp.ClientError as exc:
-            _LOGGER.error("TTS service network error: %s", exc)
-            return {"success": False, "error": f"网络请求失败: {exc}"}
-        except asyncio.TimeoutError as exc:
-            _LOGGER.error("TTS service timeout: %s", exc)
-            return {"success": False, "error": "请求超时"}
+        except HomeAssistantError as exc:
+            _LOGGER.error("TTS service error: %s", exc)
+            return {"success": False, "error": str(exc)}
         except Exception as exc:
             _LOGGER.error("TTS service error: %s", exc, exc_info=True)
             return {"success": False, "error": f"TTS 生成失败: {exc}"}
@@ -488,8 +403,7 @@ async def async_setup_services(hass: HomeAssistant, config_entry) -> None:
         """Handle Silicon Flow STT service call."""
         try:
             # Check if Silicon Flow API key is configured
-            siliconflow_api_key = getattr(config_entry, 'data', {}).get(CONF_SILICONFLOW_API_KEY) if hasattr(config_entry, 'data') else None
-            if not siliconflow_api_key or not siliconflow_api_key.strip():
+            if not client.has_siliconflow_api_key:
                 return {
                     "success": False,
                     "error": "Silicon Flow API密钥未配置，请先在集成配置中设置"
@@ -534,9 +448,7 @@ async def async_setup_services(hass: HomeAssistant, config_entry) -> None:
                 raise ServiceValidationError(f"读取音频文件失败: {err}")
 
             # 构建 STT API 请求
-            headers = {
-                "Authorization": f"Bearer {siliconflow_api_key}",
-            }
+            headers = client.siliconflow_headers()
 
             # 准备文件上传
             form_data = aiohttp.FormData()
@@ -550,60 +462,41 @@ async def async_setup_services(hass: HomeAssistant, config_entry) -> None:
 
             timeout = aiohttp.ClientTimeout(total=DEFAULT_REQUEST_TIMEOUT / 1000)
 
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(
-                    SILICONFLOW_ASR_URL,
-                    headers=headers,
-                    data=form_data
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        _LOGGER.error(
-                            "智谱AI STT API 错误: %s - %s",
-                            response.status,
-                            error_text
-                        )
-                        return {
-                            "success": False,
-                            "error": f"STT API 请求失败: {response.status}"
-                        }
+            async with client.post(
+                SILICONFLOW_ASR_URL,
+                priority=PRIORITY_TASK,
+                timeout=timeout,
+                headers=headers,
+                data=form_data
+            ) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    _LOGGER.error(
+                        "智谱AI STT API 错误: %s - %s",
+                        response.status,
+                        error_text
+                    )
+                    return {
+                        "success": False,
+                        "error": f"STT API 请求失败: {response.status}"
+                    }
 
-                    if stream:
-                        # 处理流式响应
-                        full_text = ""
-                        async for line in response.content:
-                            if line:
-                                line_text = line.decode('utf-8').strip()
-                                if line_text.startswith('data: '):
-                                    try:
-                                        data_str = line_text[6:]  # Remove 'data: ' prefix
-                                        data_dict = json.loads(data_str)
-
-                                        if "text" in data_dict:
-                                            full_text += data_dict["text"]
-                                    except (json.JSONDecodeError, KeyError) as exc:
-                                        _LOGGER.warning("解析流式响应失败: %s", exc)
-                                        continue
-
-                        transcribed_text = full_text.strip()
-                    else:
-                        # 处理非流式响应
-                        response_data = await response.json()
+                # 转录接口一次性返回 JSON，不是 SSE 流
+                response_data = await response.json(loads=codec.loads)
 
-                        if "text" not in response_data:
-                            _LOGGER.error("STT API 响应格式错误: %s", response_data)
-                            return {"success": False, "error": "API 响应格式错误"}
+                if "text" not in response_data:
+                    _LOGGER.error("STT API 响应格式错误: %s", response_data)
+                    return {"success": False, "error": "API 响应格式错误"}
 
-                        transcribed_text = response_data["text"]
+                transcribed_text = response_data["text"]
 
-                    return {
-                        "success": True,
-                        "text": transcribed_text,
-                        "model": model,
-                        "language": language,
-                        "audio_file": audio_file,
-                        "file_size_mb": round(file_size / (1024 * 1024), 2),
-                    }
+                return {
+                    "success": True,
+                    "text": transcribed_text,
+                    "model": model,
+                    "audio_file": audio_file,
+                    "file_size_mb": round(file_size / (1024 * 1024), 2),
+                }
 
         except ServiceValidationError as exc:
             _LOGGER.error("STT service validation error: %s", exc)
@@ -622,7 +515,7 @@ async def async_setup_services(hass: HomeAssistant, config_entry) -> None:
         """Handle Bemfa WeChat message service call."""
         try:
             # Get Bemfa UID from config entry or service data
-            bemfa_uid = getattr(config_entry, 'bemfa_uid', None) or call.data.get("bemfa_uid")
+            bemfa_uid = client.bemfa_uid or call.data.get("bemfa_uid")
 
             if not bemfa_uid or not bemfa_uid.strip():
                 return {
@@ -664,27 +557,28 @@ async def async_setup_services(hass: HomeAssistant, config_entry) -> None:
             headers = {"Content-Type": "application/json; charset=utf-8"}
 
             timeout = aiohttp.ClientTimeout(total=10)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(
-                    BEMFA_API_URL,
-                    json=payload,
-                    headers=headers
-                ) as response:
-                    resp_text = await response.text()
-                    if response.status == 200:
-                        _LOGGER.info("微信消息发送成功")
-                        return {
-                            "success": True,
-                            "message": "微信消息发送成功",
-                            "device": device_entity,
-                            "group": group
-                        }
-                    else:
-                        _LOGGER.error("发送失败 [%s]: %s", response.status, resp_text)
-                        return {
-                            "success": False,
-                            "error": f"发送失败 [{response.status}]: {resp_text}"
-                        }
+            async with client.post(
+                BEMFA_API_URL,
+                priority=PRIORITY_TASK,
+                timeout=timeout,
+                json=payload,
+                headers=headers
+            ) as response:
+                resp_text = await response.text()
+                if response.status == 200:
+                    _LOGGER.info("微信消息发送成功")
+                    return {
+                        "success": True,
+                        "message": "微信消息发送成功",
+                        "device": device_entity,
+                        "group": group
+                    }
+                else:
+                    _LOGGER.error("发送失败 [%s]: %s", response.status, resp_text)
+                    return {
+                        "success": False,
+                        "error": f"发送失败 [{response.status}]: {resp_text}"
+                    }
 
         except aiohttp.ClientError as exc:
             _LOGGER.error("网络请求错误: %s", exc)
@@ -719,7 +613,7 @@ async def async_setup_services(hass: HomeAssistant, config_entry) -> None:
             result = await hass.async_add_executor_job(
                 translate_all_components,
                 "custom_components",
-                api_key if not list_components else None,
+                client if not list_components else None,
                 force_translation,
                 target_component,
                 list_components
@@ -764,7 +658,7 @@ async def async_setup_services(hass: HomeAssistant, config_entry) -> None:
             # Run in background thread
             result = await hass.async_add_executor_job(
                 translate_all_blueprints,
-                api_key if not list_blueprints else None,
+                client if not list_blueprints else None,
                 force_translation,
                 target_blueprint,
                 list_blueprints
@@ -782,6 +676,17 @@ async def async_setup_services(hass: HomeAssistant, config_entry) -> None:
                 "error": f"Blueprint翻译服务错误: {exc}"
             }
 
+    async def handle_set_request_trace(call: ServiceCall) -> dict:
+        """Handle request trace service call."""
+        client.tracer.configure(call.data["sample_every"])
+        _LOGGER.info(
+            "Request trace %s",
+            f"enabled, 1 in {client.tracer.sample_every} requests"
+            if client.tracer.enabled
+            else "disabled",
+        )
+        return {"success": True, **client.tracer.as_dict()}
+
     # Register services
     hass.services.async_register(
         DOMAIN,
@@ -839,6 +744,14 @@ async def async_setup_services(hass: HomeAssistant, config_entry) -> None:
         supports_response=True
     )
 
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_REQUEST_TRACE,
+        handle_set_request_trace,
+        schema=vol.Schema(REQUEST_TRACE_SCHEMA),
+        supports_response=True
+    )
+
 
 async def _load_image_from_file(hass: HomeAssistant, image_file: str) -> bytes:
     """Load image from file path."""
@@ -921,32 +834,26 @@ async def _handle_stream_response(hass: HomeAssistant, response: aiohttp.ClientR
         hass.bus.async_fire(f"{DOMAIN}_image_analysis_start", {"event_id": event_id})
 
         accumulated_text = ""
-        async for line in response.content:
-            if line:
-                try:
-                    line_text = line.decode('utf-8').strip()
-                    if line_text.startswith('data: '):
-                        line_text = line_text[6:]  # Remove 'data: ' prefix
-
-                    if line_text == '[DONE]':
-                        break
-
-                    if line_text:
-                        json_data = json.loads(line_text)
-                        if 'choices' in json_data and len(json_data['choices']) > 0:
-                            content = json_data['choices'][0].get('delta', {}).get('content', '')
-                            if content:
-                                accumulated_text += content
-                                hass.bus.async_fire(
-                                    f"{DOMAIN}_image_analysis_token",
-                                    {
-                                        "event_id": event_id,
-                                        "content": content,
-                                        "full_content": accumulated_text
-                                    }
-                                )
-                except json.JSONDecodeError:
-                    continue
+        async for event in async_iter_sse(response):
+            if event.data == SSE_DONE or not event.data.strip():
+                continue
+            try:
+                json_data = codec.loads(event.data)
+            except json.JSONDecodeError:
+                continue
+
+            if 'choices' in json_data and len(json_data['choices']) > 0:
+                content = json_data['choices'][0].get('delta', {}).get('content', '')
+                if content:
+                    accumulated_text += content
+                    hass.bus.async_fire(
+                        f"{DOMAIN}_image_analysis_token",
+                        {
+                            "event_id": event_id,
+                            "content": content,
+                            "full_content": accumulated_text
+                        }
+                    )
 
         return {
             "success": True,
@@ -963,7 +870,7 @@ async def _handle_stream_response(hass: HomeAssistant, response: aiohttp.ClientR
 
 
 # Translation functionality (adapted from translation_localizer)
-def translate_all_components(custom_components_path: str, api_key: str, force_translation: bool = False, target_component: str = "", list_components: bool = False) -> dict:
+def translate_all_components(custom_components_path: str, client: AIHubClient, force_translation: bool = False, target_component: str = "", list_components: bool = False) -> dict:
     """Translate or list components in the custom_components directory."""
     # Find the custom components directory
     base_path = None
@@ -1055,7 +962,7 @@ def translate_all_components(custom_components_path: str, api_key: str, force_tr
 
     for component_dir in component_dirs:
         try:
-            result = translate_component(component_dir, api_key, force_translation)
+            result = translate_component(component_dir, client, force_translation)
             if result == "translated":
                 translated += 1
                 translated_components.append(component_dir.name)
@@ -1080,7 +987,7 @@ def translate_all_components(custom_components_path: str, api_key: str, force_tr
     }
 
 
-def translate_component(component_dir: Path, api_key: str, force_translation: bool = False) -> str:
+def translate_component(component_dir: Path, client: AIHubClient, force_translation: bool = False) -> str:
     """Translate a single component."""
     translations_dir = component_dir / "translations"
     en_file = translations_dir / "en.json"
@@ -1106,7 +1013,7 @@ def translate_component(component_dir: Path, api_key: str, force_translation: bo
             en_data = json.load(f)
 
         # Translate the data
-        zh_data = translate_json_values(en_data, api_key)
+        zh_data = translate_json_values(en_data, client)
 
         # Save Chinese translations
         with open(zh_file, 'w', encoding='utf-8') as f:
@@ -1120,20 +1027,20 @@ def translate_component(component_dir: Path, api_key: str, force_translation: bo
         return "error"
 
 
-def translate_json_values(data: any, api_key: str) -> any:
+def translate_json_values(data: any, client: AIHubClient) -> any:
     """Recursively translate JSON values."""
     if isinstance(data, dict):
-        return {key: translate_json_values(value, api_key) for key, value in data.items()}
+        return {key: translate_json_values(value, client) for key, value in data.items()}
     elif isinstance(data, list):
-        return [translate_json_values(item, api_key) for item in data]
+        return [translate_json_values(item, client) for item in data]
     elif isinstance(data, str) and data.strip():
         # Translate strings
-        return translate_text(data, api_key)
+        return translate_text(data, client)
     else:
         return data
 
 
-def translate_text(text: str, api_key: str) -> str:
+def translate_text(text: str, client: AIHubClient) -> str:
     """Translate text using Zhipu AI while preserving placeholders."""
     if not text or len(text.strip()) < 2:
         return text
@@ -1155,7 +1062,7 @@ def translate_text(text: str, api_key: str) -> str:
 
     if not placeholders:
         # No placeholders, translate directly
-        return _translate_simple_text(text, api_key)
+        return _translate_simple_text(text, client)
 
     # Extract placeholders and replace them with temporary markers
     placeholder_map = {}
@@ -1166,7 +1073,7 @@ def translate_text(text: str, api_key: str) -> str:
         temp_text = temp_text.replace(placeholder, marker, 1)
 
     # Translate the text with placeholders removed
-    translated_temp = _translate_simple_text(temp_text, api_key)
+    translated_temp = _translate_simple_text(temp_text, client)
 
     # Restore the original placeholders
     translated_text = translated_temp
@@ -1176,13 +1083,11 @@ def translate_text(text: str, api_key: str) -> str:
     return translated_text
 
 
-def _translate_simple_text(text: str, api_key: str) -> str:
-    """Simple translation function for text without placeholders."""
-    url = "https://open.bigmodel.cn/api/paas/v4/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
+def _translate_simple_text(text: str, client: AIHubClient) -> str:
+    """Simple translation function for text without placeholders.
+
+    Runs in an executor thread and hands the request to the shared session.
+    """
 
     payload = {
         "model": "glm-4-flash-250414",
@@ -1201,10 +1106,13 @@ def _translate_simple_text(text: str, api_key: str) -> str:
     }
 
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
-        response.raise_for_status()
-
-        result = response.json()
+        result = client.post_json_blocking(
+            AI_HUB_CHAT_URL,
+            payload,
+            client.zhipu_headers(),
+            30,
+            priority=PRIORITY_BACKGROUND,
+        )
         translated = result["choices"][0]["message"]["content"].strip()
 
         _LOGGER.debug(f"Translated: {text} -> {translated}")
@@ -1215,8 +1123,10 @@ def _translate_simple_text(text: str, api_key: str) -> str:
         return text  # Return original on failure
 
 
-def translate_all_blueprints(api_key: str, force_translation: bool = False, target_blueprint: str = "", list_blueprints: bool = False) -> dict:
+def translate_all_blueprints(client: AIHubClient, force_translation: bool = False, target_blueprint: str = "", list_blueprints: bool = False) -> dict:
     """Translate or list blueprints in the standard Home Assistant blueprints directory."""
+    import yaml  # 仅在翻译蓝图时需要
+
     # Use standard Home Assistant blueprints directory
     blueprints_path = "/config/blueprints"
     base_path = Path(blueprints_path)
@@ -1312,7 +1222,7 @@ def translate_all_blueprints(api_key: str, force_translation: bool = False, targ
                 except Exception:
                     pass
 
-            result = translate_blueprint_file(yaml_file, api_key, force_translation)
+            result = translate_blueprint_file(yaml_file, client, force_translation)
             if result == "translated":
                 translated += 1
                 translated_blueprints.append(str(yaml_file.relative_to(base_path)))
@@ -1336,8 +1246,10 @@ def translate_all_blueprints(api_key: str, force_translation: bool = False, targ
     }
 
 
-def translate_blueprint_file(yaml_file: Path, api_key: str, force_translation: bool = False) -> str:
+def translate_blueprint_file(yaml_file: Path, client: AIHubClient, force_translation: bool = False) -> str:
     """Translate a single blueprint YAML file in-place."""
+    import yaml
+
     # Always translate the original file directly
     _LOGGER.info(f"Translating {yaml_file.name}")
 
@@ -1364,14 +1276,14 @@ def translate_blueprint_file(yaml_file: Path, api_key: str, force_translation: b
 
         # Translate name and description
         if 'name' in blueprint_section and isinstance(blueprint_section['name'], str):
-            blueprint_section['name'] = translate_text(blueprint_section['name'], api_key)
+            blueprint_section['name'] = translate_text(blueprint_section['name'], client)
 
         if 'description' in blueprint_section and isinstance(blueprint_section['description'], str):
-            blueprint_section['description'] = translate_text(blueprint_section['description'], api_key)
+            blueprint_section['description'] = translate_text(blueprint_section['description'], client)
 
         # Translate input fields
         if 'input' in blueprint_section and isinstance(blueprint_section['input'], dict):
-            translate_blueprint_inputs(blueprint_section['input'], api_key)
+            translate_blueprint_inputs(blueprint_section['input'], client)
 
         # Update the blueprint section
         blueprint_data['blueprint'] = blueprint_section
@@ -1396,7 +1308,7 @@ def translate_blueprint_file(yaml_file: Path, api_key: str, force_translation: b
         return "error"
 
 
-def translate_blueprint_inputs(inputs: dict, api_key: str) -> None:
+def translate_blueprint_inputs(inputs: dict, client: AIHubClient) -> None:
     """Translate input fields in a blueprint while preserving technical parameters."""
     for input_key, input_config in inputs.items():
         if not isinstance(input_config, dict):
@@ -1404,10 +1316,10 @@ def translate_blueprint_inputs(inputs: dict, api_key: str) -> None:
 
         # Translate name and description
         if 'name' in input_config and isinstance(input_config['name'], str):
-            input_config['name'] = translate_text(input_config['name'], api_key)
+            input_config['name'] = translate_text(input_config['name'], client)
 
         if 'description' in input_config and isinstance(input_config['description'], str):
-            input_config['description'] = translate_text(input_config['description'], api_key)
+            input_config['description'] = translate_text(input_config['description'], client)
 
         # Do not translate default values if they look like technical parameters
         if 'default' in input_config:
@@ -1418,4 +1330,4 @@ def translate_blueprint_inputs(inputs: dict, api_key: str) -> None:
                 not default_val.isupper() and
                 not any(char in default_val for char in ['.', '_', '-']) and
                 len(default_val.split()) > 1):
-                input_config['default'] = translate_text(default_val, api_key)
\ No newline at end of file
+                input_config['default'] = translate_text(default_val, client)
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""Single-flight coalescing of identical concurrent requests."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+import logging
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _Call:
+    """An in-flight call shared by every caller with the same key."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Let concurrent callers with the same key share one execution.
+
+    The first caller starts the work as a task; callers arriving while it is
+    still running await the same task instead of starting their own. The work
+    is only cancelled once every caller waiting on it has been cancelled.
+    Nothing is cached: once the task finishes the next call runs again.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the coalescer."""
+        self._calls: dict[Hashable, _Call] = {}
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``factory()`` unless an identical call is already in flight."""
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(factory()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        else:
+            self.coalesced += 1
+            _LOGGER.debug("Coalesced duplicate request: %s", key)
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        """Drop a finished call so the next request runs again."""
+        if self._calls.get(key) is call:
+            del self._calls[key]
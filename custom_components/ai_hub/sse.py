@@ -0,0 +1,129 @@
+"""Incremental Server-Sent Events decoder for AI Hub streaming responses."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+
+import aiohttp
+
+SSE_DONE = "[DONE]"
+
+
+@dataclass(slots=True)
+class SSEEvent:
+    """One dispatched server-sent event."""
+
+    data: str
+    event: str = "message"
+    id: str | None = None
+    retry: int | None = None
+
+
+class SSEDecoder:
+    """Decode a ``text/event-stream`` body fed in arbitrary byte chunks.
+
+    Bytes are buffered in a ``bytearray`` and a cursor remembers how far the
+    buffer was already searched for a line break, so a long line split over
+    many chunks is scanned only once. Lines are split on the LF byte, which
+    never occurs inside a multi-byte UTF-8 sequence. Each complete line is
+    therefore decoded whole, and a Chinese character split across two chunks
+    stays intact. Lines may end in LF or CRLF.
+
+    Fields follow the WHATWG event stream format: ``data`` lines accumulate
+    (joined by newlines) until a blank line dispatches the event. ``event``,
+    ``id`` and ``retry`` are supported, and lines starting with ``:`` are
+    comments.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the decoder."""
+        self._buffer = bytearray()
+        self._scan_pos = 0
+        self._data: list[str] = []
+        self._event = ""
+        self._retry: int | None = None
+        self.last_event_id: str | None = None
+
+    def feed(self, chunk: bytes) -> list[SSEEvent]:
+        """Add bytes and return the events completed by them."""
+        self._buffer += chunk
+        events: list[SSEEvent] = []
+        start = 0
+        while (end := self._buffer.find(b"\n", self._scan_pos)) != -1:
+            line_end = end - 1 if end > start and self._buffer[end - 1] == 0x0D else end
+            line = self._buffer[start:line_end].decode("utf-8", errors="replace")
+            start = self._scan_pos = end + 1
+            if (event := self._process_line(line)) is not None:
+                events.append(event)
+
+        if start:
+            # 只在每次 feed 结束时压缩一次，避免逐行移动剩余数据
+            del self._buffer[:start]
+        self._scan_pos = len(self._buffer)
+        return events
+
+    def flush(self) -> list[SSEEvent]:
+        """Finish the stream and return any event left without a blank line.
+
+        Servers often close the stream right after the last ``data`` line, so
+        a trailing partial line and undispatched data are still delivered.
+        """
+        events: list[SSEEvent] = []
+        if self._buffer:
+            line = self._buffer.rstrip(b"\r").decode("utf-8", errors="replace")
+            self._buffer.clear()
+            self._scan_pos = 0
+            if (event := self._process_line(line)) is not None:
+                events.append(event)
+        if (event := self._dispatch()) is not None:
+            events.append(event)
+        return events
+
+    def _process_line(self, line: str) -> SSEEvent | None:
+        """Apply one line of the stream."""
+        if not line:
+            return self._dispatch()
+        if line[0] == ":":
+            return None
+
+        field, sep, value = line.partition(":")
+        if sep and value[:1] == " ":
+            value = value[1:]
+
+        if field == "data":
+            self._data.append(value)
+        elif field == "event":
+            self._event = value
+        elif field == "id":
+            if "\0" not in value:
+                self.last_event_id = value
+        elif field == "retry":
+            if value.isdigit():
+                self._retry = int(value)
+        return None
+
+    def _dispatch(self) -> SSEEvent | None:
+        """Return the pending event and reset the event state."""
+        if not self._data:
+            self._event = ""
+            return None
+        event = SSEEvent(
+            data="\n".join(self._data),
+            event=self._event or "message",
+            id=self.last_event_id,
+            retry=self._retry,
+        )
+        self._data = []
+        self._event = ""
+        return event
+
+
+async def async_iter_sse(response: aiohttp.ClientResponse) -> AsyncIterator[SSEEvent]:
+    """Yield the events of a streaming response as the bytes arrive."""
+    decoder = SSEDecoder()
+    async for chunk in response.content.iter_any():
+        for event in decoder.feed(chunk):
+            yield event
+    for event in decoder.flush():
+        yield event
@@ -0,0 +1,43 @@
+"""Fast local estimate of prompt tokens."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from .const import TOKEN_ESTIMATE_PER_IMAGE, TOKEN_ESTIMATE_PER_MESSAGE
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens of a text.
+
+    CJK characters take about one token each in GLM and most BPE
+    vocabularies, other text about four characters per token. CJK characters
+    are three bytes in UTF-8, so the wide characters are counted from the
+    encoded length without a Python-level loop over the text.
+    """
+    if not text:
+        return 0
+    length = len(text)
+    if text.isascii():
+        return (length + 3) // 4
+    wide = (len(text.encode("utf-8", "surrogatepass")) - length) // 2
+    return wide + (length - wide + 3) // 4
+
+
+def estimate_message_tokens(message: dict[str, Any]) -> int:
+    """Estimate the tokens of one API message, including tool calls."""
+    tokens = TOKEN_ESTIMATE_PER_MESSAGE
+    content = message.get("content")
+    if isinstance(content, str):
+        tokens += estimate_tokens(content)
+    elif isinstance(content, list):
+        for part in content:
+            if part.get("type") == "text":
+                tokens += estimate_tokens(part.get("text", ""))
+            else:
+                tokens += TOKEN_ESTIMATE_PER_IMAGE
+    for tool_call in message.get("tool_calls") or ():
+        function = tool_call.get("function", {})
+        tokens += estimate_tokens(function.get("name", ""))
+        tokens += estimate_tokens(function.get("arguments", ""))
+    return tokens
@@ -0,0 +1,137 @@
+"""Cache of converted and pre-encoded tool definitions."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+import logging
+from types import FunctionType
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.helpers import llm
+
+from . import codec
+from .const import TOOL_CACHE_MAX_ENTRIES
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _fingerprint(value: Any, active: frozenset[int] = frozenset()) -> Hashable:
+    """Return a hashable description of a tool schema.
+
+    Home Assistant builds new tool and schema objects for every request, so
+    schemas are compared by structure instead of identity. Functions are
+    described by name and closure, which covers validators and defaults.
+    """
+    if isinstance(value, (str, int, float, bool, type(None))):
+        return value
+    if id(value) in active:
+        # 校验器会引用所属的 Schema，避免循环
+        return "<cycle>"
+    active = active | {id(value)}
+
+    if isinstance(value, vol.Marker):
+        return (
+            type(value).__name__,
+            _fingerprint(value.schema, active),
+            value.description,
+            _fingerprint(getattr(value, "default", None), active),
+        )
+    if isinstance(value, vol.Schema):
+        return ("Schema", _fingerprint(value.schema, active), value.extra, value.required)
+    if isinstance(value, dict):
+        return tuple(
+            (_fingerprint(key, active), _fingerprint(item, active))
+            for key, item in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return (type(value).__name__, *(_fingerprint(item, active) for item in value))
+    if isinstance(value, FunctionType):
+        return (
+            value.__module__,
+            value.__qualname__,
+            *(_fingerprint(cell.cell_contents, active) for cell in value.__closure__ or ()),
+        )
+    if isinstance(value, type):
+        return (value.__module__, value.__qualname__)
+    if hasattr(value, "__dict__"):
+        # 校验器和选择器：按公开属性比较，跳过 _compiled 等内部缓存
+        return (
+            type(value).__qualname__,
+            *(
+                (name, _fingerprint(item, active))
+                for name, item in vars(value).items()
+                if not name.startswith("_")
+            ),
+        )
+    hash(value)
+    return value
+
+
+class ToolSchemaCache:
+    """Converted ``tools`` arrays keyed by LLM API, serializer and tool set.
+
+    Converting every tool with ``voluptuous_openapi`` is the most expensive
+    part of building a request when the Assist API exposes many tools. The
+    result is kept pre-encoded as ``codec.RawJSON`` and reused until the
+    exposed tools change, which gives a new key. The least recently used
+    entries beyond ``TOOL_CACHE_MAX_ENTRIES`` are dropped.
+    """
+
+    def __init__(self, max_entries: int = TOOL_CACHE_MAX_ENTRIES) -> None:
+        """Initialize the cache."""
+        self._max_entries = max_entries
+        self._entries: OrderedDict[Hashable, codec.RawJSON] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        llm_api: llm.APIInstance,
+        convert: Callable[[llm.Tool], dict[str, Any]],
+        extra: tuple[dict[str, Any], ...] = (),
+    ) -> codec.RawJSON:
+        """Return the encoded tools of an LLM API followed by ``extra`` tools.
+
+        Tools are sorted by name, so the tool block is byte-identical between
+        requests whatever order the API lists them in. Providers can then
+        serve the prompt prefix from their context cache.
+        """
+        api_tools = sorted(llm_api.tools, key=lambda tool: tool.name)
+        try:
+            key: Hashable = (
+                llm_api.api.id,
+                llm_api.custom_serializer,
+                tuple(
+                    (tool.name, tool.description, _fingerprint(tool.parameters))
+                    for tool in api_tools
+                ),
+                _fingerprint(extra),
+            )
+            hash(key)
+        except (TypeError, RecursionError) as err:
+            _LOGGER.debug("Tool schemas cannot be cached: %s", err)
+            key = None
+
+        if key is not None and (tools := self._entries.get(key)) is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return tools
+
+        self.misses += 1
+        tools = codec.RawJSON([*(convert(tool) for tool in api_tools), *extra])
+        if key is not None:
+            self._entries[key] = tools
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return tools
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return cache statistics for diagnostics."""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
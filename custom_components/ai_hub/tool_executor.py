@@ -0,0 +1,130 @@
+"""Concurrent execution of the tool calls of one assistant message."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Hashable, Mapping
+import logging
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import llm
+from homeassistant.util.json import JsonObjectType
+
+from .const import CONF_EARLY_TOOL_CALLS, CONF_PARALLEL_TOOL_CALLS, TOOL_CALL_MAX_PARALLEL
+
+_LOGGER = logging.getLogger(__name__)
+
+# 指定操作目标的工具参数；目标相同的调用按原顺序依次执行
+_TARGET_ARGS = ("name", "entity_id", "area", "floor")
+
+
+def _target(tool_call: llm.ToolInput) -> Hashable:
+    """Return the target of a tool call, or the call id if it names none."""
+    target = tuple(
+        str(tool_call.tool_args.get(arg)) for arg in _TARGET_ARGS if arg in tool_call.tool_args
+    )
+    return target or tool_call.id
+
+
+async def _async_call_tool(
+    llm_api: llm.APIInstance, tool_call: llm.ToolInput
+) -> JsonObjectType:
+    """Call one tool, reporting errors the same way as the chat log."""
+    try:
+        return await llm_api.async_call_tool(tool_call)
+    except (HomeAssistantError, vol.Invalid) as err:
+        result: JsonObjectType = {"error": type(err).__name__}
+        if str(err):
+            result["error_text"] = str(err)
+        return result
+
+
+def tool_call_parallelism(options: Mapping[str, Any]) -> int | None:
+    """Return how many tool calls the integration runs at once.
+
+    None leaves the tool calls to the chat log. Early dispatched calls are
+    always run here, one at a time unless parallel mode is on, so they can
+    be cancelled when the stream fails.
+    """
+    if options.get(CONF_PARALLEL_TOOL_CALLS, False):
+        return TOOL_CALL_MAX_PARALLEL
+    if options.get(CONF_EARLY_TOOL_CALLS, False):
+        return 1
+    return None
+
+
+class ToolCallRunner:
+    """Run tool calls concurrently as they are submitted.
+
+    At most ``max_parallel`` tools run at once. Calls that address the same
+    target (for example turning on a light and then setting its brightness)
+    still run one after the other in submission order. Results are returned
+    in submission order too.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        llm_api: llm.APIInstance,
+        max_parallel: int = TOOL_CALL_MAX_PARALLEL,
+    ) -> None:
+        """Initialize the runner."""
+        self.hass = hass
+        self._llm_api = llm_api
+        self._semaphore = asyncio.Semaphore(max_parallel)
+        self._tasks: list[tuple[llm.ToolInput, asyncio.Task[JsonObjectType]]] = []
+        # 每个目标最近提交的调用，后续调用等待它完成
+        self._last_by_target: dict[Hashable, asyncio.Task[JsonObjectType]] = {}
+
+    def __bool__(self) -> bool:
+        """Return True if any tool call was submitted."""
+        return bool(self._tasks)
+
+    def submit(self, tool_call: llm.ToolInput) -> None:
+        """Start a tool call."""
+        target = _target(tool_call)
+        task = self.hass.async_create_task(
+            self._async_run(tool_call, self._last_by_target.get(target)),
+            name=f"ai_hub_tool_{tool_call.id}",
+        )
+        self._last_by_target[target] = task
+        self._tasks.append((tool_call, task))
+
+    async def _async_run(
+        self,
+        tool_call: llm.ToolInput,
+        previous: asyncio.Task[JsonObjectType] | None,
+    ) -> JsonObjectType:
+        if previous is not None:
+            await asyncio.wait([previous])
+        async with self._semaphore:
+            return await _async_call_tool(self._llm_api, tool_call)
+
+    async def async_results(self) -> list[tuple[llm.ToolInput, JsonObjectType]]:
+        """Wait for every submitted call and return the results in order."""
+        _LOGGER.debug(
+            "Waiting for %d tool calls on %d targets",
+            len(self._tasks),
+            len(self._last_by_target),
+        )
+        return [(tool_call, await task) for tool_call, task in self._tasks]
+
+    def cancel(self) -> None:
+        """Cancel the calls that have not finished yet."""
+        for _tool_call, task in self._tasks:
+            if not task.done():
+                task.cancel()
+
+
+def tool_result_delta(tool_call: llm.ToolInput, result: JsonObjectType) -> dict[str, Any]:
+    """Return the chat log delta of a tool result."""
+    return {
+        "role": "tool_result",
+        "tool_call_id": tool_call.id,
+        "tool_name": tool_call.tool_name,
+        "tool_result": result,
+    }
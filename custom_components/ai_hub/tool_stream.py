@@ -0,0 +1,139 @@
+"""Assembly of tool calls from streamed chat completion deltas."""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any
+
+from homeassistant.helpers import llm
+from homeassistant.util import ulid
+
+from . import codec
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _JsonCloseScanner:
+    """Detect the end of a JSON object streamed in fragments.
+
+    Only braces outside of strings are counted, so the scan is linear in the
+    total length of the arguments and nothing is parsed until it closes.
+    """
+
+    __slots__ = ("depth", "in_string", "escape", "closed")
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.closed = False
+
+    def feed(self, fragment: str) -> None:
+        for char in fragment:
+            if self.closed:
+                return
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char == "{":
+                self.depth += 1
+            elif char == "}":
+                self.depth -= 1
+                self.closed = self.depth == 0
+
+
+class _PendingToolCall:
+    """One tool call being assembled."""
+
+    __slots__ = ("id", "name", "arguments", "scanner", "complete")
+
+    def __init__(self, tool_call_id: str) -> None:
+        self.id = tool_call_id
+        self.name = ""
+        self.arguments = ""
+        self.scanner = _JsonCloseScanner()
+        self.complete = False
+
+
+class ToolCallBuffer:
+    """Collect ``tool_calls`` deltas by index and build ``llm.ToolInput``.
+
+    A call is complete once its ``arguments`` object closes or a call with a
+    higher index starts. ``pop_complete`` returns the complete calls as soon
+    as they are known, so they can be dispatched while the model is still
+    streaming. ``pop_all`` returns whatever is left when the stream ends.
+    """
+
+    def __init__(self, external: bool = False) -> None:
+        """Initialize the buffer."""
+        self._external = external
+        self._calls: dict[int, _PendingToolCall] = {}
+        self._popped: set[int] = set()
+
+    def __bool__(self) -> bool:
+        """Return True if any tool call was streamed."""
+        return bool(self._calls)
+
+    def add(self, delta: dict[str, Any]) -> None:
+        """Apply one entry of a ``tool_calls`` delta."""
+        index = delta.get("index", 0)
+        if (call := self._calls.get(index)) is None:
+            # 更高序号的调用开始，说明之前的调用已经完整
+            for other_index, other in self._calls.items():
+                if other_index < index:
+                    other.complete = True
+            call = self._calls[index] = _PendingToolCall(delta.get("id") or ulid.ulid_now())
+
+        if delta.get("id"):
+            call.id = delta["id"]
+        if function := delta.get("function"):
+            if "name" in function:
+                call.name = function["name"]
+            if fragment := function.get("arguments"):
+                call.arguments += fragment
+                call.scanner.feed(fragment)
+                if call.scanner.closed:
+                    call.complete = True
+
+    def pop_complete(self) -> list[llm.ToolInput]:
+        """Return the complete calls that were not returned yet."""
+        return self._pop(complete_only=True)
+
+    def pop_all(self) -> list[llm.ToolInput]:
+        """Return every call that was not returned yet."""
+        return self._pop(complete_only=False)
+
+    def _pop(self, complete_only: bool) -> list[llm.ToolInput]:
+        tool_calls: list[llm.ToolInput] = []
+        for index in sorted(self._calls):
+            call = self._calls[index]
+            if index in self._popped or (
+                complete_only and not (call.complete and call.name)
+            ):
+                continue
+            try:
+                args = codec.loads(call.arguments) if call.arguments else {}
+            except json.JSONDecodeError as err:
+                if complete_only:
+                    # 提前判断有误时等到流结束再解析
+                    continue
+                _LOGGER.warning("Failed to parse tool call arguments: %s", err)
+                self._popped.add(index)
+                continue
+            self._popped.add(index)
+            tool_calls.append(
+                llm.ToolInput(
+                    id=call.id,
+                    tool_name=call.name,
+                    tool_args=args,
+                    external=self._external,
+                )
+            )
+        return tool_calls
@@ -2,64 +2,238 @@
 
 from __future__ import annotations
 
+from collections.abc import AsyncGenerator, Mapping
+from functools import partial
 import logging
+from types import ModuleType
 from typing import Any
+import uuid
 
 from propcache.api import cached_property
 
 from homeassistant.components.tts import (
+    ATTR_PREFERRED_FORMAT,
+    ATTR_PREFERRED_SAMPLE_CHANNELS,
+    ATTR_PREFERRED_SAMPLE_RATE,
     ATTR_VOICE,
     TextToSpeechEntity,
+    TTSAudioRequest,
+    TTSAudioResponse,
     TtsAudioType,
     Voice,
 )
 from homeassistant.config_entries import ConfigEntry, ConfigSubentry
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-try:
-    import edge_tts
-    import edge_tts.exceptions
-except ImportError:
-    try:
-        import edgeTTS
-        raise Exception('Please uninstall edgeTTS and install edge_tts instead.')
-    except ImportError:
-        raise Exception('edge_tts is required. Please install edge_tts.')
-
 from .const import (
     CONF_TTS_VOICE,
     CONF_TTS_LANG,
     CONF_TTS_RATE,
     CONF_TTS_VOLUME,
     CONF_TTS_PITCH,
+    CONF_TTS_WARMUP_PHRASES,
+    DATA_TTS_SESSION_POOL,
+    DEFAULT_TTS_WARMUP_PHRASES,
     TTS_DEFAULT_VOICE,
     TTS_DEFAULT_LANG,
     TTS_DEFAULT_RATE,
     TTS_DEFAULT_VOLUME,
     TTS_DEFAULT_PITCH,
-    EDGE_TTS_VOICES,
+    TTS_GROUP_MAX_CHARS,
+    TTS_MAX_PARALLEL_SYNTHESIS,
+    TTS_SESSION_IDLE_TIMEOUT,
+    TTS_SESSION_MAX_TEXT_BYTES,
+    TTS_WARMUP_WAV_RATE,
     DOMAIN,
 )
 
-# Create supported languages dynamically like edge_tts
-SUPPORTED_LANGUAGES = {
-    **dict(zip(EDGE_TTS_VOICES.values(), EDGE_TTS_VOICES.keys())),
-    'zh-CN': 'zh-CN-XiaoxiaoNeural',
-}
+from .audio_format import (
+    MP3_OUTPUT,
+    OUTPUT_FORMAT_MP3,
+    AudioOutput,
+    PcmConverter,
+    negotiate_output,
+    wav_header,
+)
 from .entity import AIHubEntityBase
+from .helpers import async_get_edge_tts
+from .metrics import StageTimer
+from .sentence_splitter import SentenceSplitter, split_sentences
+from .tts_cache import TTSAudioCache, async_get_tts_cache
+from .tts_session import EdgeTTSSessionPool
+from .tts_synthesis import async_synthesize_groups, group_sentences
+from .voice_catalog import VoiceCatalog, async_get_voice_catalog_store
 from homeassistant.helpers import device_registry as dr
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _edge_connect_target(edge_tts: ModuleType) -> tuple[str, Mapping[str, str]]:
+    """Return the URL and headers of a new Edge TTS websocket connection."""
+    url = (
+        f"{edge_tts.constants.WSS_URL}"
+        f"&Sec-MS-GEC={edge_tts.drm.DRM.generate_sec_ms_gec()}"
+        f"&Sec-MS-GEC-Version={edge_tts.constants.SEC_MS_GEC_VERSION}"
+        f"&ConnectionId={uuid.uuid4().hex}"
+    )
+    return url, edge_tts.constants.WSS_HEADERS
+
+
+@callback
+def _async_get_session_pool(hass: HomeAssistant, edge_tts: ModuleType) -> EdgeTTSSessionPool | None:
+    """Return the Edge TTS connection pool shared by all entries.
+
+    Returns None if the installed edge_tts does not expose the connection
+    details, in which case every request opens its own connection.
+    """
+    if DATA_TTS_SESSION_POOL not in hass.data:
+        pool = None
+        if hasattr(edge_tts, "constants") and hasattr(edge_tts, "drm"):
+            pool = EdgeTTSSessionPool(
+                lambda: async_get_clientsession(hass),
+                partial(_edge_connect_target, edge_tts),
+                TTS_SESSION_IDLE_TIMEOUT,
+                TTS_MAX_PARALLEL_SYNTHESIS,
+            )
+
+            async def _async_close_pool(event: Event) -> None:
+                await pool.async_close()
+
+            hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_pool)
+        hass.data[DATA_TTS_SESSION_POOL] = pool
+    return hass.data[DATA_TTS_SESSION_POOL]
+
+
+async def async_negotiate_output(hass: HomeAssistant, options: Mapping[str, Any]) -> AudioOutput:
+    """Return the audio output for the preferred format options of a request.
+
+    WAV needs the raw PCM formats of the connection pool; without the pool,
+    or once the service has rejected the format, MP3 is returned and Home
+    Assistant converts it as before.
+    """
+    output = negotiate_output(
+        options.get(ATTR_PREFERRED_FORMAT),
+        options.get(ATTR_PREFERRED_SAMPLE_RATE),
+        options.get(ATTR_PREFERRED_SAMPLE_CHANNELS),
+    )
+    if not output.is_pcm:
+        return output
+    pool = _async_get_session_pool(hass, await async_get_edge_tts(hass))
+    if pool is None or not pool.supports(output.edge_format):
+        return MP3_OUTPUT
+    return output
+
+
+async def _async_edge_stream(
+    hass: HomeAssistant,
+    text: str,
+    voice: str,
+    opt: Mapping[str, Any],
+    output_format: str = OUTPUT_FORMAT_MP3,
+) -> AsyncGenerator[bytes]:
+    """Yield the audio chunks of one text as Edge TTS produces them."""
+    edge_tts = await async_get_edge_tts(hass)
+    rate = opt.get('rate', TTS_DEFAULT_RATE)
+    volume = opt.get('volume', TTS_DEFAULT_VOLUME)
+    pitch = opt.get('pitch', TTS_DEFAULT_PITCH)
+    try:
+        pool = _async_get_session_pool(hass, edge_tts)
+        # edge_tts.Communicate 只能输出 MP3，其他格式总是走连接池
+        if pool is not None and (
+            output_format != OUTPUT_FORMAT_MP3 or len(text.encode()) <= TTS_SESSION_MAX_TEXT_BYTES
+        ):
+            # 复用已建立的 websocket 连接，省去每次请求的握手
+            async for chunk in pool.async_stream(text, voice, rate, volume, pitch, output_format):
+                yield chunk
+            return
+
+        communicate = edge_tts.Communicate(
+            text=text, voice=voice, pitch=pitch, rate=rate, volume=volume
+        )
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                yield chunk["data"]
+    except Exception as exc:
+        _LOGGER.error("Edge TTS 生成失败: %s", exc)
+        raise HomeAssistantError(f"TTS 生成失败: {exc}") from exc
+
+
+def _cache_key(
+    cache: TTSAudioCache,
+    text: str,
+    voice: str,
+    opt: Mapping[str, Any],
+    output_format: str = OUTPUT_FORMAT_MP3,
+) -> str | None:
+    return cache.key(
+        text,
+        voice,
+        opt.get('rate', TTS_DEFAULT_RATE),
+        opt.get('volume', TTS_DEFAULT_VOLUME),
+        opt.get('pitch', TTS_DEFAULT_PITCH),
+        output_format,
+    )
+
+
+async def async_synthesize(
+    hass: HomeAssistant,
+    text: str,
+    voice: str,
+    opt: Mapping[str, Any],
+    output_format: str = OUTPUT_FORMAT_MP3,
+) -> AsyncGenerator[bytes]:
+    """Yield the audio of one phrase, from the audio cache when possible."""
+    cache = async_get_tts_cache(hass)
+    key = _cache_key(cache, text, voice, opt, output_format)
+    if key is not None and (audio := await cache.async_get(key)) is not None:
+        yield audio
+        return
+
+    chunks: list[bytes] = []
+    async for chunk in _async_edge_stream(hass, text, voice, opt, output_format):
+        chunks.append(chunk)
+        yield chunk
+    if key is not None and chunks:
+        await cache.async_put(key, b"".join(chunks))
+
+
+async def async_synthesize_message(
+    hass: HomeAssistant,
+    message: str,
+    voice: str,
+    opt: Mapping[str, Any],
+    timer: StageTimer | None = None,
+    output_format: str = OUTPUT_FORMAT_MP3,
+) -> bytes:
+    """Return the audio of a whole message in the Edge TTS output format.
+
+    Long messages are split into sentence groups that are synthesized in
+    parallel and joined in order; short ones are a single cached phrase.
+    """
+    groups = group_sentences(split_sentences(message), TTS_GROUP_MAX_CHARS) or [message]
+    audio_bytes = await async_synthesize_groups(
+        lambda text: async_synthesize(hass, text, voice, opt, output_format),
+        groups,
+        TTS_MAX_PARALLEL_SYNTHESIS,
+        None if timer is None else lambda: timer.mark("first_chunk"),
+    )
+    if not audio_bytes:
+        raise HomeAssistantError("未生成音频数据")
+    return audio_bytes
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up TTS entities."""
+    # 读取保存的语音目录，过期时在后台刷新
+    await async_get_voice_catalog_store(hass).async_load()
     for subentry in config_entry.subentries.values():
         if subentry.subentry_type != "tts":
             continue
@@ -74,12 +248,23 @@ class AIHubTextToSpeechEntity(TextToSpeechEntity, AIHubEntityBase):
     """AI Hub text-to-speech entity using Edge TTS."""
 
     _attr_has_entity_name = False
-    _attr_supported_options = ['voice', 'rate', 'volume', 'pitch']
+    # 不声明采样位数：只输出 16 位 PCM，其他位数由 Home Assistant 转换
+    _attr_supported_options = [
+        'voice',
+        'rate',
+        'volume',
+        'pitch',
+        ATTR_PREFERRED_FORMAT,
+        ATTR_PREFERRED_SAMPLE_RATE,
+        ATTR_PREFERRED_SAMPLE_CHANNELS,
+    ]
 
     def __init__(self, config_entry: ConfigEntry, subentry: ConfigSubentry) -> None:
         """Initialize the TTS entity."""
         super().__init__(config_entry, subentry, TTS_DEFAULT_VOICE)
         self._attr_available = True
+        self._voice_lists: dict[str | None, list[Voice]] = {}
+        self._voice_lists_catalog: VoiceCatalog | None = None
 
         # Override device info for TTS
         self._attr_device_info = dr.DeviceInfo(
@@ -90,6 +275,53 @@ class AIHubTextToSpeechEntity(TextToSpeechEntity, AIHubEntityBase):
             entry_type=dr.DeviceEntryType.SERVICE,
         )
 
+    async def async_added_to_hass(self) -> None:
+        """Pre-synthesize the warm-up phrases in the background."""
+        await super().async_added_to_hass()
+        phrases = [
+            phrase.strip()
+            for phrase in self.subentry.data.get(CONF_TTS_WARMUP_PHRASES, DEFAULT_TTS_WARMUP_PHRASES).splitlines()
+            if phrase.strip()
+        ]
+        if phrases:
+            self.entry.async_create_background_task(
+                self.hass,
+                self._async_warm_up(phrases),
+                f"{DOMAIN} tts warm-up {self.subentry.subentry_id}",
+            )
+
+    async def _async_warm_up(self, phrases: list[str]) -> None:
+        """Synthesize the phrases that are not in the audio cache yet.
+
+        Phrases are cached as MP3 and in the WAV format voice satellites
+        request, which also finds out early if the service rejects it.
+        """
+        voice, opt = self._resolve_voice(self.default_language, self.subentry.data, {})
+        cache = async_get_tts_cache(self.hass)
+        warmed = 0
+        try:
+            wav = await async_negotiate_output(
+                self.hass, {ATTR_PREFERRED_FORMAT: "wav", ATTR_PREFERRED_SAMPLE_RATE: TTS_WARMUP_WAV_RATE}
+            )
+        except HomeAssistantError:
+            wav = MP3_OUTPUT
+        output_formats = list(dict.fromkeys((OUTPUT_FORMAT_MP3, wav.edge_format)))
+        for phrase in phrases:
+            for output_format in output_formats:
+                key = _cache_key(cache, phrase, voice, opt, output_format)
+                if key is None or await cache.async_contains(key):
+                    continue
+                try:
+                    async for _ in async_synthesize(self.hass, phrase, voice, opt, output_format):
+                        pass
+                except HomeAssistantError as err:
+                    _LOGGER.debug("TTS warm-up of %r as %s failed: %s", phrase, output_format, err)
+                    continue
+                warmed += 1
+        _LOGGER.debug(
+            "Pre-synthesized %d of %d TTS warm-up phrases", warmed, len(phrases) * len(output_formats)
+        )
+
     @property
     def options(self) -> dict[str, Any]:
         """Return the options for this entity."""
@@ -111,27 +343,32 @@ class AIHubTextToSpeechEntity(TextToSpeechEntity, AIHubEntityBase):
 
         # Extract language from configured voice ID (e.g., "zh-CN-XiaoxiaoNeural" -> "zh-CN")
         voice = self.subentry.data.get(CONF_TTS_VOICE, TTS_DEFAULT_VOICE)
-        return EDGE_TTS_VOICES.get(voice, TTS_DEFAULT_LANG)
+        return self._catalog.language_of(voice) or TTS_DEFAULT_LANG
+
+    @property
+    def _catalog(self) -> VoiceCatalog:
+        """Return the current voice catalog."""
+        return async_get_voice_catalog_store(self.hass).catalog
 
     @property
     def supported_languages(self) -> list[str]:
         """Return list of supported languages."""
-        return list([*SUPPORTED_LANGUAGES.keys(), *EDGE_TTS_VOICES.keys()])
+        return self._catalog.language_codes
 
     @property
     def supported_formats(self) -> list[str]:
         """Return a list of supported audio formats."""
-        return ["wav", "mp3", "ogg", "flac"]
+        return ["wav", "mp3"]
 
     @property
     def supported_codecs(self) -> list[str]:
         """Return a list of supported audio codecs."""
-        return ["pcm", "mp3", "wav", "flac", "aac", "ogg"]
+        return ["pcm", "mp3"]
 
     @property
     def supported_sample_rates(self) -> list[int]:
         """Return a list of supported sample rates."""
-        return [8000, 11025, 16000, 22050, 44100, 48000]
+        return [8000, 16000, 22050, 24000, 44100, 48000]
 
     @property
     def supported_bit_rates(self) -> list[int]:
@@ -143,56 +380,24 @@ class AIHubTextToSpeechEntity(TextToSpeechEntity, AIHubEntityBase):
         """Return a list of supported audio channels."""
         return [1, 2]
 
-    @property
-    def _supported_voices(self) -> list[Voice]:
-        """Return supported voices."""
-        voices = []
-        for voice_id in EDGE_TTS_VOICES.keys():
-            voices.append(Voice(voice_id, voice_id))
-        return voices
-
     @callback
     def async_get_supported_voices(self, language: str) -> list[Voice]:
         """Return a list of supported voices for a language."""
-        if language is None:
-            return self._supported_voices
-
-        # Return voices for the specified language
-        voices = []
-        for voice_id, voice_lang in EDGE_TTS_VOICES.items():
-            if voice_lang == language:
-                voices.append(Voice(voice_id, voice_id))
+        catalog = self._catalog
+        if catalog is not self._voice_lists_catalog:
+            # 语音目录刷新后重新生成
+            self._voice_lists_catalog = catalog
+            self._voice_lists = {}
+        if (voices := self._voice_lists.get(language)) is None:
+            voices = self._voice_lists[language] = [
+                Voice(voice.voice_id, voice.label) for voice in catalog.voices(language)
+            ]
         return voices
 
     def _get_default_voice_for_language(self, language: str) -> str:
         """Get default voice for a language."""
-        # Default voices for each language
-        default_voices = {
-            "zh-CN": "zh-CN-XiaoxiaoNeural",    # 晓晓 - 中文简体女声
-            "zh-TW": "zh-TW-HsiaochenNeural",   # 曉臻 - 中文繁体女声
-            "zh-HK": "zh-HK-HiuMaanNeural",     # 曉嫻 - 中文香港女声
-            "en-US": "en-US-JennyNeural",       # Jenny - 美式英语女声
-            "en-GB": "en-GB-LibbyNeural",       # Libby - 英式英语女声
-            "en-AU": "en-AU-NatashaNeural",     # Natasha - 澳式英语女声
-            "en-CA": "en-CA-ClaraNeural",       # Clara - 加式英语女声
-            "en-IN": "en-IN-NeerjaNeural",      # Neerja - 印式英语女声
-            "ja-JP": "ja-JP-NanamiNeural",     # Nanami - 日语女声
-            "ko-KR": "ko-KR-SunHiNeural",      # SunHi - 韩语女声
-            "es-ES": "es-ES-ElviraNeural",     # Elvira - 西班牙女声
-            "es-MX": "es-MX-DaliaNeural",      # Dalia - 墨西哥西班牙语女声
-            "fr-FR": "fr-FR-DeniseNeural",     # Denise - 法语女声
-            "fr-CA": "fr-CA-SylvieNeural",     # Sylvie - 加拿大法语女声
-            "de-DE": "de-DE-KatjaNeural",      # Katja - 德语女声
-            "it-IT": "it-IT-ElsaNeural",       # Elsa - 意大利语女声
-            "pt-BR": "pt-BR-FranciscaNeural",  # Francisca - 巴西葡萄牙语女声
-            "pt-PT": "pt-PT-RaquelNeural",     # Raquel - 葡萄牙葡萄牙语女声
-            "ru-RU": "ru-RU-SvetlanaNeural",   # Svetlana - 俄语女声
-            "ar-SA": "ar-SA-ZariyahNeural",    # Zariyah - 阿拉伯语女声
-            "hi-IN": "hi-IN-SwaraNeural",      # Swara - 印地语女声
-        }
-
         # Return language-specific default if available, otherwise fallback to Chinese
-        return default_voices.get(language, TTS_DEFAULT_VOICE)
+        return self._catalog.default_voice(language) or TTS_DEFAULT_VOICE
 
     async def async_get_tts_audio(
         self, message: str, language: str, options: dict[str, Any] | None = None
@@ -206,75 +411,101 @@ class AIHubTextToSpeechEntity(TextToSpeechEntity, AIHubEntityBase):
             options or {}
         )
 
-    async def _process_tts_audio(
-        self,
-        message: str,
-        language: str,
-        config: dict,
-        options: dict[str, Any]
-    ) -> TtsAudioType:
-        """Shared TTS processing logic similar to edge_tts."""
-        if not message or not message.strip():
-            raise HomeAssistantError("文本内容不能为空")
-
+    async def async_stream_tts_audio(self, request: TTSAudioRequest) -> TTSAudioResponse:
+        """Synthesize streamed text sentence by sentence.
+
+        Text from the LLM is split into sentences as it arrives, and each
+        sentence is synthesized as soon as it is complete. MP3 chunks are
+        passed on as Edge TTS produces them, so playback can start after the
+        first sentence instead of after the whole answer. Sentences found in
+        the audio cache are played without calling Edge TTS.
+
+        WAV requests are served from Edge TTS raw PCM behind an open ended
+        WAV header, already at the requested sample rate and channels.
+        """
+        voice, opt = self._resolve_voice(request.language, self.subentry.data, request.options)
+        output = await async_negotiate_output(self.hass, request.options)
+        converter = PcmConverter(output) if output.is_pcm else None
+
+        async def synthesize(sentence: str) -> AsyncGenerator[bytes]:
+            async for chunk in async_synthesize(self.hass, sentence, voice, opt, output.edge_format):
+                if converter is not None:
+                    chunk = converter.feed(chunk)
+                if chunk:
+                    yield chunk
+
+        async def data_gen() -> AsyncGenerator[bytes]:
+            timer = StageTimer()
+            splitter = SentenceSplitter()
+            if converter is not None:
+                yield wav_header(output.sample_rate, output.channels)
+            async for text in request.message_gen:
+                for sentence in splitter.feed(text):
+                    async for chunk in synthesize(sentence):
+                        timer.mark("first_chunk")
+                        yield chunk
+            for sentence in splitter.flush():
+                async for chunk in synthesize(sentence):
+                    timer.mark("first_chunk")
+                    yield chunk
+            timer.mark("total")
+            self._client.metrics.async_record(self.subentry.subentry_id, timer)
+
+        return TTSAudioResponse(output.extension, data_gen())
+
+    def _resolve_voice(
+        self, language: str, config: dict[str, Any], options: dict[str, Any]
+    ) -> tuple[str, dict[str, Any]]:
+        """Return the voice to use and the merged options."""
         # Priority order for voice selection:
         # 1. Voice from options (Voice Assistant explicit choice)
         # 2. Configured voice from integration settings
         # 3. Default voice for the requested language
         # 4. Global default voice
-
-        voice = None
-
-        # Check if Voice Assistant specified a voice in options
-        if 'voice' in options and options['voice']:
-            voice = options['voice']
-            _LOGGER.debug("Using Voice Assistant specified voice: %s", voice)
-        else:
-            # Use configured voice from integration
-            voice = config.get(CONF_TTS_VOICE, TTS_DEFAULT_VOICE)
-            _LOGGER.debug("Using integration configured voice: %s", voice)
+        voice = options.get('voice') or config.get(CONF_TTS_VOICE, TTS_DEFAULT_VOICE)
 
         # Verify the voice exists in our supported voices
-        if voice not in EDGE_TTS_VOICES:
+        catalog = self._catalog
+        if voice not in catalog:
             _LOGGER.warning("Voice '%s' not found in supported voices, using default for language %s", voice, language)
             # Try to get default voice for the language
             voice = self._get_default_voice_for_language(language)
-            if voice not in EDGE_TTS_VOICES:
-                voice = TTS_DEFAULT_VOICE
 
         # Extract the actual language from the selected voice
-        actual_language = EDGE_TTS_VOICES.get(voice, TTS_DEFAULT_LANG)
+        actual_language = catalog.language_of(voice) or TTS_DEFAULT_LANG
 
         # Log language/voice mapping for debugging
         if language and actual_language and language != actual_language:
-            _LOGGER.info("Language mapping: Voice Assistant requested '%s', using voice '%s' (language: %s)",
-                        language, voice, actual_language)
+            _LOGGER.debug("Language mapping: Voice Assistant requested '%s', using voice '%s' (language: %s)",
+                          language, voice, actual_language)
+        return voice, {**config, **options}
 
-        # Merge configuration options
-        opt = {**config, **options}
-
-        _LOGGER.debug('TTS: message="%s", voice="%s", requested_lang="%s", actual_lang="%s"',
-                     message, voice, language, actual_language)
-
-        try:
-            communicate = edge_tts.Communicate(
-                text=message,
-                voice=voice,
-                pitch=opt.get('pitch', TTS_DEFAULT_PITCH),
-                rate=opt.get('rate', TTS_DEFAULT_RATE),
-                volume=opt.get('volume', TTS_DEFAULT_VOLUME),
-            )
+    async def _process_tts_audio(
+        self,
+        message: str,
+        language: str,
+        config: dict,
+        options: dict[str, Any]
+    ) -> TtsAudioType:
+        """Shared TTS processing logic similar to edge_tts."""
+        if not message or not message.strip():
+            raise HomeAssistantError("文本内容不能为空")
 
-            audio_bytes = b""
-            async for chunk in communicate.stream():
-                if chunk["type"] == "audio":
-                    audio_bytes += chunk["data"]
+        voice, opt = self._resolve_voice(language, config, options)
 
-            if not audio_bytes:
-                raise HomeAssistantError("未生成音频数据")
+        _LOGGER.debug('TTS: message="%s", voice="%s", requested_lang="%s"',
+                      message, voice, language)
 
-            return "mp3", audio_bytes
+        # 长消息按句子分组并行合成，再按顺序拼接
+        timer = StageTimer()
+        output = await async_negotiate_output(self.hass, options)
+        audio_bytes = await async_synthesize_message(
+            self.hass, message, voice, opt, timer, output.edge_format
+        )
+        if output.is_pcm:
+            audio_bytes = PcmConverter(output).feed(audio_bytes)
+            audio_bytes = wav_header(output.sample_rate, output.channels, len(audio_bytes)) + audio_bytes
 
-        except Exception as exc:
-            _LOGGER.error("Edge TTS 生成失败: %s", exc)
-            raise HomeAssistantError(f"TTS 生成失败: {exc}") from exc
\ No newline at end of file
+        timer.mark("total")
+        self._client.metrics.async_record(self.subentry.subentry_id, timer)
+        return output.extension, audio_bytes
@@ -0,0 +1,196 @@
+"""Persistent phrase-level cache of synthesized TTS audio."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Any
+import unicodedata
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DATA_TTS_CACHE,
+    TTS_CACHE_DIR,
+    TTS_CACHE_MAX_BYTES,
+    TTS_CACHE_MAX_PHRASE_CHARS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_MP3_SUFFIX = ".mp3"
+_PCM_SUFFIX = ".pcm"
+
+
+def normalize_text(text: str) -> str:
+    """Return the text in the form used for cache keys.
+
+    Full-width and half-width forms are unified and runs of whitespace are
+    collapsed, since neither changes the synthesized speech.
+    """
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def _scan(directory: Path) -> list[tuple[str, int]]:
+    """Return the cached files as (name, size), least recently used first."""
+    directory.mkdir(parents=True, exist_ok=True)
+    files = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.name.endswith((_MP3_SUFFIX, _PCM_SUFFIX)):
+            stat = entry.stat()
+            files.append((stat.st_mtime_ns, entry.name, stat.st_size))
+        elif entry.name.endswith(".tmp"):
+            # 上次写入被中断留下的临时文件
+            os.unlink(entry.path)
+    files.sort()
+    return [(name, size) for _, name, size in files]
+
+
+def _read(path: Path) -> bytes:
+    data = path.read_bytes()
+    # 更新修改时间，重启后按它恢复 LRU 顺序
+    os.utime(path)
+    return data
+
+
+def _write(path: Path, data: bytes, evicted: list[Path]) -> None:
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    for old in evicted:
+        old.unlink(missing_ok=True)
+
+
+class TTSAudioCache:
+    """LRU cache of synthesized phrases on disk within a size budget.
+
+    Entries are keyed by the normalized text, the voice, rate, volume and
+    pitch and the Edge TTS output format, and stored as one MP3 or raw PCM
+    file per phrase as the service returned it, so canned responses survive
+    restarts. The LRU order is kept in memory and restored from the file
+    modification times on the first lookup; a hit touches its file. Only
+    phrases up to ``max_phrase_chars`` are cached, so long one-off answers do
+    not push out the short confirmations that repeat.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        directory: Path,
+        max_bytes: int = TTS_CACHE_MAX_BYTES,
+        max_phrase_chars: int = TTS_CACHE_MAX_PHRASE_CHARS,
+    ) -> None:
+        """Initialize the cache."""
+        self.hass = hass
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._max_phrase_chars = max_phrase_chars
+        self._entries: OrderedDict[str, int] | None = None
+        self._load_lock = asyncio.Lock()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def key(
+        self,
+        text: str,
+        voice: str,
+        rate: str,
+        volume: str,
+        pitch: str,
+        output_format: str | None = None,
+    ) -> str | None:
+        """Return the cache key of a phrase, or None if it is not cached."""
+        text = normalize_text(text)
+        if not text or len(text) > self._max_phrase_chars:
+            return None
+        parts = [text, voice, rate, volume, pitch]
+        # MP3 的键不带格式，保持与已有缓存文件兼容
+        if output_format is not None and not output_format.endswith("-mp3"):
+            parts.append(output_format)
+            suffix = _PCM_SUFFIX
+        else:
+            suffix = _MP3_SUFFIX
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest() + suffix
+
+    async def _async_entries(self) -> OrderedDict[str, int]:
+        if self._entries is None:
+            async with self._load_lock:
+                if self._entries is None:
+                    try:
+                        files = await self.hass.async_add_executor_job(_scan, self._directory)
+                    except OSError as err:
+                        _LOGGER.warning("Failed to load TTS cache from %s: %s", self._directory, err)
+                        files = []
+                    self._entries = OrderedDict(files)
+                    self._size = sum(self._entries.values())
+                    _LOGGER.debug("Loaded %d cached TTS phrases", len(self._entries))
+        return self._entries
+
+    async def async_contains(self, key: str) -> bool:
+        """Return True if the phrase is cached."""
+        return key in await self._async_entries()
+
+    async def async_get(self, key: str) -> bytes | None:
+        """Return the cached audio of a phrase."""
+        entries = await self._async_entries()
+        if key not in entries:
+            self.misses += 1
+            return None
+        try:
+            data = await self.hass.async_add_executor_job(_read, self._directory / key)
+        except OSError:
+            # 文件被外部删除
+            self._size -= entries.pop(key, 0)
+            self.misses += 1
+            return None
+        if key in entries:
+            entries.move_to_end(key)
+        self.hits += 1
+        return data
+
+    async def async_put(self, key: str, data: bytes) -> None:
+        """Store the audio of a phrase, evicting the least recently used ones."""
+        if not data or len(data) > self._max_bytes:
+            return
+        entries = await self._async_entries()
+        self._size -= entries.pop(key, 0)
+        entries[key] = len(data)
+        self._size += len(data)
+        evicted: list[Path] = []
+        while self._size > self._max_bytes:
+            name, size = entries.popitem(last=False)
+            self._size -= size
+            evicted.append(self._directory / name)
+        try:
+            await self.hass.async_add_executor_job(
+                _write, self._directory / key, data, evicted
+            )
+        except OSError as err:
+            _LOGGER.warning("Failed to write TTS cache entry: %s", err)
+            if entries.pop(key, None) is not None:
+                self._size -= len(data)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return cache statistics for diagnostics."""
+        return {
+            "loaded": self._entries is not None,
+            "entries": len(self._entries or ()),
+            "bytes": self._size,
+            "max_bytes": self._max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def async_get_tts_cache(hass: HomeAssistant) -> TTSAudioCache:
+    """Return the TTS audio cache shared by all entries."""
+    if DATA_TTS_CACHE not in hass.data:
+        hass.data[DATA_TTS_CACHE] = TTSAudioCache(
+            hass, Path(hass.config.path(".storage", TTS_CACHE_DIR))
+        )
+    return hass.data[DATA_TTS_CACHE]
@@ -0,0 +1,294 @@
+"""Reusable websocket sessions to the Edge TTS service.
+
+This module has no Home Assistant imports so the benchmarks can load it by
+path.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator, Callable, Mapping
+import logging
+import re
+import time
+from typing import Any
+import uuid
+from xml.sax.saxutils import escape
+
+import aiohttp
+
+_LOGGER = logging.getLogger(__name__)
+
+OUTPUT_FORMAT_MP3 = "audio-24khz-48kbitrate-mono-mp3"
+
+# 服务不接受的控制字符（保留 \t \n \r）
+_INCOMPATIBLE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_SHORT_VOICE = re.compile(r"^([a-z]{2,})-([A-Z]{2,})-(.+Neural)$")
+
+
+class EdgeTTSError(Exception):
+    """Error reported by or while talking to the Edge TTS service."""
+
+
+def _timestamp() -> str:
+    """Return the JavaScript style date string the service expects."""
+    return time.strftime(
+        "%a %b %d %Y %H:%M:%S GMT+0000 (Coordinated Universal Time)", time.gmtime()
+    )
+
+
+def _voice_name(voice: str) -> str:
+    """Expand ``zh-CN-XiaoxiaoNeural`` to the full service voice name."""
+    if (match := _SHORT_VOICE.match(voice)) is None:
+        return voice
+    lang, region, name = match.groups()
+    if "-" in name:
+        # zh-CN-liaoning-XiaobeiNeural
+        variant, name = name.split("-", 1)
+        region = f"{region}-{variant}"
+    return f"Microsoft Server Speech Text to Speech Voice ({lang}-{region}, {name})"
+
+
+def _speech_config(output_format: str) -> str:
+    return (
+        f"X-Timestamp:{_timestamp()}\r\n"
+        "Content-Type:application/json; charset=utf-8\r\n"
+        "Path:speech.config\r\n\r\n"
+        '{"context":{"synthesis":{"audio":{"metadataoptions":{'
+        '"sentenceBoundaryEnabled":"false","wordBoundaryEnabled":"false"},'
+        f'"outputFormat":"{output_format}"'
+        "}}}}\r\n"
+    )
+
+
+def _ssml_request(request_id: str, text: str, voice: str, rate: str, volume: str, pitch: str) -> str:
+    text = escape(_INCOMPATIBLE.sub(" ", text))
+    return (
+        f"X-RequestId:{request_id}\r\n"
+        "Content-Type:application/ssml+xml\r\n"
+        # 末尾的 Z 与 Edge 浏览器一致
+        f"X-Timestamp:{_timestamp()}Z\r\n"
+        "Path:ssml\r\n\r\n"
+        "<speak version='1.0' xmlns='http://www.w3.org/2001/10/synthesis' xml:lang='en-US'>"
+        f"<voice name='{_voice_name(voice)}'>"
+        f"<prosody pitch='{pitch}' rate='{rate}' volume='{volume}'>{text}</prosody>"
+        "</voice></speak>"
+    )
+
+
+def _parse_headers(data: bytes) -> dict[bytes, bytes]:
+    headers = {}
+    for line in data.split(b"\r\n"):
+        key, _, value = line.partition(b":")
+        headers[key] = value
+    return headers
+
+
+class _Session:
+    """One websocket connection with its output format configured."""
+
+    __slots__ = ("key", "ws", "idle_handle")
+
+    def __init__(self, key: tuple[str, str], ws: aiohttp.ClientWebSocketResponse) -> None:
+        self.key = key
+        self.ws = ws
+        self.idle_handle: asyncio.TimerHandle | None = None
+
+
+class EdgeTTSSessionPool:
+    """Keep warm Edge TTS websocket connections per voice and output format.
+
+    Synthesizing over a new connection costs a TLS and websocket handshake
+    before the first audio byte. The service accepts any number of
+    consecutive requests on one connection, so finished connections are kept
+    and reused for the next request with the same voice and format. Up to
+    ``max_idle`` connections are kept per key, enough for the concurrent
+    sentence groups of one message. A connection that stays idle for
+    ``idle_timeout`` seconds is closed.
+
+    If a reused connection turns out to be dead (the service closes idle
+    connections on its own), the request is retried once on a new
+    connection, as long as no audio was produced yet. An output format the
+    service answers without audio on a new connection is remembered as
+    unsupported, so callers can fall back to MP3.
+    """
+
+    def __init__(
+        self,
+        get_session: Callable[[], aiohttp.ClientSession],
+        connect_target: Callable[[], tuple[str, Mapping[str, str]]],
+        idle_timeout: float,
+        max_idle: int,
+        receive_timeout: float = 30,
+    ) -> None:
+        """Initialize the pool.
+
+        ``connect_target`` returns the websocket URL and headers of a new
+        connection; the URL carries a time based token, so it is called for
+        every connection.
+        """
+        self._get_session = get_session
+        self._connect_target = connect_target
+        self._idle_timeout = idle_timeout
+        self._max_idle = max_idle
+        self._receive_timeout = receive_timeout
+        self._idle: dict[tuple[str, str], list[_Session]] = {}
+        self._closing: set[asyncio.Task] = set()
+        self.unsupported_formats: set[str] = set()
+        self.connects = 0
+        self.reuses = 0
+        self.reconnects = 0
+
+    async def _async_connect(self, key: tuple[str, str]) -> _Session:
+        url, headers = self._connect_target()
+        ws = await self._get_session().ws_connect(url, headers=headers, compress=15)
+        self.connects += 1
+        try:
+            await ws.send_str(_speech_config(key[1]))
+        except BaseException:
+            self._discard(_Session(key, ws))
+            raise
+        return _Session(key, ws)
+
+    def _acquire_idle(self, key: tuple[str, str]) -> _Session | None:
+        idle = self._idle.get(key)
+        while idle:
+            session = idle.pop()
+            if session.idle_handle is not None:
+                session.idle_handle.cancel()
+                session.idle_handle = None
+            if not session.ws.closed:
+                return session
+        return None
+
+    def _release(self, session: _Session) -> None:
+        idle = self._idle.setdefault(session.key, [])
+        if session.ws.closed or len(idle) >= self._max_idle:
+            self._discard(session)
+            return
+        session.idle_handle = asyncio.get_running_loop().call_later(
+            self._idle_timeout, self._expire, session
+        )
+        idle.append(session)
+
+    def _expire(self, session: _Session) -> None:
+        idle = self._idle.get(session.key, [])
+        if session in idle:
+            idle.remove(session)
+        session.idle_handle = None
+        self._discard(session)
+
+    def _discard(self, session: _Session) -> None:
+        """Close a connection in the background."""
+        if session.ws.closed:
+            return
+        task = asyncio.get_running_loop().create_task(session.ws.close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _async_turn(
+        self,
+        session: _Session,
+        text: str,
+        voice: str,
+        rate: str,
+        volume: str,
+        pitch: str,
+    ) -> AsyncGenerator[bytes]:
+        """Run one synthesis request on a connection and yield its audio."""
+        request_id = uuid.uuid4().hex
+        await session.ws.send_str(_ssml_request(request_id, text, voice, rate, volume, pitch))
+        while True:
+            message = await session.ws.receive(timeout=self._receive_timeout)
+            if message.type is aiohttp.WSMsgType.TEXT:
+                head, _, _ = message.data.encode().partition(b"\r\n\r\n")
+                headers = _parse_headers(head)
+                if headers.get(b"X-RequestId", request_id.encode()) != request_id.encode():
+                    continue
+                if headers.get(b"Path") == b"turn.end":
+                    return
+            elif message.type is aiohttp.WSMsgType.BINARY:
+                data = message.data
+                if len(data) < 2:
+                    raise EdgeTTSError("Binary message without header length")
+                header_length = int.from_bytes(data[:2], "big")
+                headers = _parse_headers(data[2 : 2 + header_length])
+                if headers.get(b"X-RequestId", request_id.encode()) != request_id.encode():
+                    continue
+                if headers.get(b"Path") == b"audio" and (audio := data[2 + header_length :]):
+                    yield audio
+            else:
+                raise EdgeTTSError(f"Connection closed ({message.type.name})")
+
+    async def async_stream(
+        self,
+        text: str,
+        voice: str,
+        rate: str,
+        volume: str,
+        pitch: str,
+        output_format: str = OUTPUT_FORMAT_MP3,
+    ) -> AsyncGenerator[bytes]:
+        """Yield the audio of one text, reusing a warm connection if possible."""
+        key = (voice, output_format)
+        while True:
+            session = self._acquire_idle(key)
+            reused = session is not None
+            if session is None:
+                session = await self._async_connect(key)
+            else:
+                self.reuses += 1
+            produced = False
+            try:
+                async for chunk in self._async_turn(session, text, voice, rate, volume, pitch):
+                    produced = True
+                    yield chunk
+            except (aiohttp.ClientError, EdgeTTSError, TimeoutError) as err:
+                self._discard(session)
+                if produced or not reused:
+                    self._check_format(output_format, produced, err)
+                    raise
+                _LOGGER.debug("Reconnecting to Edge TTS after stale connection: %s", err)
+                self.reconnects += 1
+                continue
+            except BaseException:
+                # 请求中途被放弃，连接上可能还有未读完的音频
+                self._discard(session)
+                raise
+            self._release(session)
+            if not produced:
+                err = EdgeTTSError("No audio was received")
+                self._check_format(output_format, produced, err)
+                raise err
+            return
+
+    def supports(self, output_format: str) -> bool:
+        """Return False if the service produced no audio in this format."""
+        return output_format not in self.unsupported_formats
+
+    def _check_format(self, output_format: str, produced: bool, err: Exception) -> None:
+        if produced or not isinstance(err, EdgeTTSError) or output_format == OUTPUT_FORMAT_MP3:
+            return
+        _LOGGER.warning("Edge TTS output format %s is not supported, using MP3: %s", output_format, err)
+        self.unsupported_formats.add(output_format)
+
+    async def async_close(self) -> None:
+        """Close every idle connection."""
+        for idle in self._idle.values():
+            for session in idle:
+                if session.idle_handle is not None:
+                    session.idle_handle.cancel()
+                self._discard(session)
+        self._idle.clear()
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return pool statistics for diagnostics."""
+        return {
+            "idle": sum(len(idle) for idle in self._idle.values()),
+            "connects": self.connects,
+            "reuses": self.reuses,
+            "reconnects": self.reconnects,
+            "unsupported_formats": sorted(self.unsupported_formats),
+        }
@@ -0,0 +1,81 @@
+"""Concurrent synthesis of long TTS messages in sentence groups.
+
+This module has no Home Assistant imports so the benchmarks can load it by
+path.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Callable
+import unicodedata
+
+
+def _is_wide(char: str) -> bool:
+    """Return True for CJK characters and full-width punctuation."""
+    return unicodedata.east_asian_width(char) in ("W", "F")
+
+
+def _join_sentences(sentences: list[str]) -> str:
+    """Join sentences, separating them by a space unless CJK meets at the join."""
+    text = sentences[0]
+    for sentence in sentences[1:]:
+        # 中文句子之间不加空格，英文句子之间需要空格
+        if not (_is_wide(text[-1]) or _is_wide(sentence[0])):
+            text += " "
+        text += sentence
+    return text
+
+
+def group_sentences(sentences: list[str], max_chars: int) -> list[str]:
+    """Join consecutive sentences into groups of at most ``max_chars``.
+
+    Every group is one synthesis request, so groups should be long enough
+    that the connection setup of a request is small next to its audio. A
+    sentence longer than ``max_chars`` forms a group of its own. Sentences
+    are separated by a space unless either side of the join is CJK.
+    """
+    groups: list[str] = []
+    current: list[str] = []
+    length = 0
+    for sentence in sentences:
+        if current and length + len(sentence) > max_chars:
+            groups.append(_join_sentences(current))
+            current = []
+            length = 0
+        current.append(sentence)
+        length += len(sentence) + 1
+    if current:
+        groups.append(_join_sentences(current))
+    return groups
+
+
+async def async_synthesize_groups(
+    synthesize: Callable[[str], AsyncIterator[bytes]],
+    groups: list[str],
+    max_parallel: int,
+    on_first_chunk: Callable[[], None] | None = None,
+) -> bytes:
+    """Synthesize groups concurrently and return their audio in order.
+
+    At most ``max_parallel`` groups are synthesized at once. Chunks are
+    collected per group and joined once at the end, so merging is linear in
+    the audio size. MP3 frames are self-contained, so the segments can be
+    concatenated as they are. ``on_first_chunk`` is called when the first
+    group produces its first chunk.
+    """
+    semaphore = asyncio.Semaphore(max_parallel)
+    segments: list[list[bytes]] = [[] for _ in groups]
+
+    async def run(index: int, text: str) -> None:
+        async with semaphore:
+            chunks = segments[index]
+            async for chunk in synthesize(text):
+                if index == 0 and not chunks and on_first_chunk is not None:
+                    on_first_chunk()
+                chunks.append(chunk)
+
+    async with asyncio.TaskGroup() as group:
+        for index, text in enumerate(groups):
+            group.create_task(run(index, text))
+    return b"".join(chunk for chunks in segments for chunk in chunks)
@@ -0,0 +1,97 @@
+"""Cached API key validation for AI Hub."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+from typing import Any
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .client import AIHubClient
+from .const import (
+    AI_HUB_CHAT_URL,
+    DATA_VALIDATION_CACHE,
+    PRIORITY_BACKGROUND,
+    RECOMMENDED_CHAT_MODEL,
+    VALIDATION_PROBE_TIMEOUT,
+    VALIDATION_STORAGE_KEY,
+    VALIDATION_STORAGE_VERSION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _fingerprint(api_key: str) -> str:
+    """Return a short hash identifying an API key without storing it."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+class ValidationCache:
+    """Remember which config entry last passed validation with which key."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, VALIDATION_STORAGE_VERSION, VALIDATION_STORAGE_KEY
+        )
+        self._data: dict[str, Any] | None = None
+
+    async def _async_data(self) -> dict[str, Any]:
+        if self._data is None:
+            self._data = await self._store.async_load() or {}
+        return self._data
+
+    async def async_is_valid(self, entry_id: str, api_key: str) -> bool:
+        """Return True if this key was accepted for this entry before."""
+        data = await self._async_data()
+        return data.get(entry_id) == _fingerprint(api_key)
+
+    async def async_set(self, entry_id: str, api_key: str | None, valid: bool) -> None:
+        """Record the result of a validation."""
+        data = await self._async_data()
+        if valid and api_key:
+            data[entry_id] = _fingerprint(api_key)
+        else:
+            data.pop(entry_id, None)
+        self._store.async_delay_save(lambda: data, 1)
+
+
+def async_get_validation_cache(hass: HomeAssistant) -> ValidationCache:
+    """Return the validation cache shared by all entries."""
+    if DATA_VALIDATION_CACHE not in hass.data:
+        hass.data[DATA_VALIDATION_CACHE] = ValidationCache(hass)
+    return hass.data[DATA_VALIDATION_CACHE]
+
+
+async def async_probe_api_key(client: AIHubClient) -> bool | None:
+    """Check the Zhipu API key without running a completion.
+
+    The request carries an empty message list. The API authenticates before
+    it validates the body, so a rejected key returns 401/403. An accepted key
+    returns a 4xx parameter error and no tokens are consumed.
+
+    Returns True if the key is accepted, False if it is rejected, and None if
+    the result is unknown (network error or server error).
+    """
+    try:
+        async with client.post(
+            AI_HUB_CHAT_URL,
+            priority=PRIORITY_BACKGROUND,
+            json={"model": RECOMMENDED_CHAT_MODEL, "messages": []},
+            headers=client.zhipu_headers(),
+            timeout=aiohttp.ClientTimeout(total=VALIDATION_PROBE_TIMEOUT),
+        ) as response:
+            if response.status in (401, 403):
+                return False
+            if response.status >= 500:
+                _LOGGER.debug("API key probe got server error %s", response.status)
+                return None
+            return True
+    except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+        _LOGGER.debug("API key probe failed: %s", err)
+        return None
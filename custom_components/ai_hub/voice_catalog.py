@@ -0,0 +1,320 @@
+"""Edge TTS voice catalog, persisted and indexed for lookups."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+import logging
+import time
+from types import ModuleType
+from typing import Any
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DATA_VOICE_CATALOG,
+    DOMAIN,
+    EDGE_TTS_VOICES,
+    VOICE_CATALOG_FETCH_TIMEOUT,
+    VOICE_CATALOG_REFRESH_INTERVAL,
+    VOICE_CATALOG_RETRY_INTERVAL,
+    VOICE_CATALOG_STORAGE_KEY,
+    VOICE_CATALOG_STORAGE_VERSION,
+)
+from .helpers import async_get_edge_tts
+
+_LOGGER = logging.getLogger(__name__)
+
+# 各语言的默认语音；按语言前缀查找时按此顺序选择（zh -> zh-CN，en -> en-US）
+_PREFERRED_VOICES = {
+    "zh-CN": "zh-CN-XiaoxiaoNeural",    # 晓晓 - 中文简体女声
+    "zh-TW": "zh-TW-HsiaoChenNeural",   # 曉臻 - 中文繁体女声
+    "zh-HK": "zh-HK-HiuMaanNeural",     # 曉嫻 - 中文香港女声
+    "en-US": "en-US-JennyNeural",       # Jenny - 美式英语女声
+    "en-GB": "en-GB-LibbyNeural",       # Libby - 英式英语女声
+    "en-AU": "en-AU-NatashaNeural",     # Natasha - 澳式英语女声
+    "en-CA": "en-CA-ClaraNeural",       # Clara - 加式英语女声
+    "en-IN": "en-IN-NeerjaNeural",      # Neerja - 印式英语女声
+    "ja-JP": "ja-JP-NanamiNeural",      # Nanami - 日语女声
+    "ko-KR": "ko-KR-SunHiNeural",       # SunHi - 韩语女声
+    "es-ES": "es-ES-ElviraNeural",      # Elvira - 西班牙女声
+    "es-MX": "es-MX-DaliaNeural",       # Dalia - 墨西哥西班牙语女声
+    "fr-FR": "fr-FR-DeniseNeural",      # Denise - 法语女声
+    "fr-CA": "fr-CA-SylvieNeural",      # Sylvie - 加拿大法语女声
+    "de-DE": "de-DE-KatjaNeural",       # Katja - 德语女声
+    "it-IT": "it-IT-ElsaNeural",        # Elsa - 意大利语女声
+    "pt-BR": "pt-BR-FranciscaNeural",   # Francisca - 巴西葡萄牙语女声
+    "pt-PT": "pt-PT-RaquelNeural",      # Raquel - 葡萄牙葡萄牙语女声
+    "ru-RU": "ru-RU-SvetlanaNeural",    # Svetlana - 俄语女声
+    "ar-SA": "ar-SA-ZariyahNeural",     # Zariyah - 阿拉伯语女声
+    "hi-IN": "hi-IN-SwaraNeural",       # Swara - 印地语女声
+}
+
+
+def _key(value: str) -> str:
+    """Return the lookup key of a language, gender or style."""
+    return value.replace("_", "-").lower()
+
+
+@dataclass(frozen=True, slots=True)
+class VoiceInfo:
+    """One Edge TTS voice."""
+
+    voice_id: str
+    locale: str
+    gender: str | None = None
+    styles: tuple[str, ...] = ()
+
+    @property
+    def language(self) -> str:
+        """Return the language prefix of the locale, e.g. ``zh``."""
+        return self.locale.split("-", 1)[0]
+
+    @property
+    def label(self) -> str:
+        """Return a display name such as ``XiaoxiaoNeural (zh-CN, Female)``."""
+        name = self.voice_id.removeprefix(f"{self.locale}-")
+        details = self.locale if self.gender is None else f"{self.locale}, {self.gender}"
+        return f"{name} ({details})"
+
+
+def _pick_default(voices: Sequence[VoiceInfo]) -> VoiceInfo:
+    """Return the preferred voice of a group, else its first female voice."""
+    by_id = {voice.voice_id: voice for voice in voices}
+    for voice_id in _PREFERRED_VOICES.values():
+        if voice_id in by_id:
+            return by_id[voice_id]
+    return next((voice for voice in voices if voice.gender == "Female"), voices[0])
+
+
+class VoiceCatalog:
+    """Immutable set of voices indexed by id, language, gender and style.
+
+    Languages are looked up by locale (``zh-CN``) or language prefix
+    (``zh``), case-insensitively. A voice id also works as a language that
+    has only that voice, as Home Assistant may pass one as the language.
+    Every index, including the default voice of each language and gender, is
+    built once in the constructor, so all lookups are dictionary hits.
+    """
+
+    def __init__(self, voices: Iterable[VoiceInfo]) -> None:
+        """Build the indexes."""
+        ordered = sorted(voices, key=lambda voice: (voice.locale, voice.voice_id))
+        self._voices = {voice.voice_id: voice for voice in ordered}
+        self._all = tuple(self._voices.values())
+        by_language: dict[str, list[VoiceInfo]] = {}
+        by_gender: dict[str, list[VoiceInfo]] = {}
+        by_style: dict[str, list[VoiceInfo]] = {}
+        for voice in self._all:
+            for language in dict.fromkeys((_key(voice.locale), _key(voice.language))):
+                by_language.setdefault(language, []).append(voice)
+            by_language[_key(voice.voice_id)] = [voice]
+            if voice.gender:
+                by_gender.setdefault(_key(voice.gender), []).append(voice)
+            for style in voice.styles:
+                by_style.setdefault(_key(style), []).append(voice)
+        self._by_language = {key: tuple(group) for key, group in by_language.items()}
+        self._by_gender = {key: tuple(group) for key, group in by_gender.items()}
+        self._by_style = {key: tuple(group) for key, group in by_style.items()}
+
+        self._defaults: dict[tuple[str, str | None], str] = {}
+        for language, group in self._by_language.items():
+            self._defaults[(language, None)] = _pick_default(group).voice_id
+            for gender in {_key(voice.gender) for voice in group if voice.gender}:
+                subset = [voice for voice in group if voice.gender and _key(voice.gender) == gender]
+                self._defaults[(language, gender)] = _pick_default(subset).voice_id
+
+        self.locales: list[str] = sorted({voice.locale for voice in self._all})
+        # 语言区域在前，再加上语言前缀
+        self.languages: list[str] = [
+            *self.locales,
+            *sorted({voice.language for voice in self._all} - set(self.locales)),
+        ]
+        # TTS 实体的 supported_languages：与旧版本一致，语音ID也作为语言代码
+        self.language_codes: list[str] = [*self.languages, *self._voices]
+
+    @classmethod
+    def from_edge_voices(cls, voices: Iterable[Mapping[str, Any]]) -> VoiceCatalog:
+        """Build a catalog from the voice list returned by Edge TTS."""
+        infos = []
+        for voice in voices:
+            if not (voice_id := voice.get("ShortName")) or not (locale := voice.get("Locale")):
+                continue
+            tag = voice.get("VoiceTag") or {}
+            styles = [
+                style.strip()
+                for style in (*tag.get("ContentCategories", ()), *tag.get("VoicePersonalities", ()))
+                if style.strip()
+            ]
+            infos.append(
+                VoiceInfo(voice_id, locale, voice.get("Gender"), tuple(dict.fromkeys(styles)))
+            )
+        return cls(infos)
+
+    @classmethod
+    def from_builtin(cls) -> VoiceCatalog:
+        """Build a catalog from the built-in voice list, without genders."""
+        return cls(VoiceInfo(voice_id, locale) for voice_id, locale in EDGE_TTS_VOICES.items())
+
+    def __contains__(self, voice_id: object) -> bool:
+        """Return True if the voice exists."""
+        return voice_id in self._voices
+
+    def __len__(self) -> int:
+        """Return the number of voices."""
+        return len(self._voices)
+
+    def get(self, voice_id: str) -> VoiceInfo | None:
+        """Return a voice by id."""
+        return self._voices.get(voice_id)
+
+    def voices(self, language: str | None = None) -> tuple[VoiceInfo, ...]:
+        """Return the voices of a locale, language prefix or voice id, or all voices."""
+        if language is None:
+            return self._all
+        return self._by_language.get(_key(language), ())
+
+    def voices_by_gender(self, gender: str) -> tuple[VoiceInfo, ...]:
+        """Return the voices of a gender (``Female`` / ``Male``)."""
+        return self._by_gender.get(_key(gender), ())
+
+    def voices_by_style(self, style: str) -> tuple[VoiceInfo, ...]:
+        """Return the voices tagged with a content category or personality."""
+        return self._by_style.get(_key(style), ())
+
+    def language_of(self, voice_id: str) -> str | None:
+        """Return the locale of a voice."""
+        voice = self._voices.get(voice_id)
+        return None if voice is None else voice.locale
+
+    def default_voice(self, language: str, gender: str | None = None) -> str | None:
+        """Return the default voice of a language, optionally of one gender."""
+        return self._defaults.get((_key(language), None if gender is None else _key(gender)))
+
+
+class VoiceCatalogStore:
+    """Keep the voice catalog in .storage and refresh it from Edge TTS.
+
+    The stored catalog is loaded on first use; until then, and when nothing
+    has been stored yet, the built-in voice list is used. A catalog older
+    than the refresh interval is fetched again in the background, so setup
+    never waits for the network. After a failed fetch the next attempt waits
+    for the retry interval.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the store."""
+        self.hass = hass
+        self._store: Store[dict[str, Any]] = Store(
+            hass, VOICE_CATALOG_STORAGE_VERSION, VOICE_CATALOG_STORAGE_KEY
+        )
+        self.catalog = VoiceCatalog.from_builtin()
+        self.source = "builtin"
+        self._updated: float | None = None
+        self._last_attempt: float | None = None
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
+
+    async def async_load(self) -> VoiceCatalog:
+        """Return the catalog, loading it from storage the first time."""
+        if not self._loaded:
+            async with self._load_lock:
+                if not self._loaded:
+                    data = await self._store.async_load()
+                    if data and (catalog := VoiceCatalog.from_edge_voices(data.get("voices", ()))):
+                        self.catalog = catalog
+                        self.source = "stored"
+                        self._updated = data.get("updated")
+                    self._loaded = True
+        if self._refresh_task is None and self._refresh_due(now := time.time()):
+            self._last_attempt = now
+            self._refresh_task = self.hass.async_create_background_task(
+                self._async_refresh(), f"{DOMAIN} voice catalog refresh"
+            )
+        return self.catalog
+
+    def _refresh_due(self, now: float) -> bool:
+        """Return True if the catalog is stale and no attempt was made recently."""
+        # 获取失败后不在每次加载时重试，避免反复请求和告警
+        if self._last_attempt is not None and now - self._last_attempt < VOICE_CATALOG_RETRY_INTERVAL:
+            return False
+        return self._updated is None or now - self._updated > VOICE_CATALOG_REFRESH_INTERVAL
+
+    async def _async_refresh(self) -> None:
+        """Fetch the voice list and store it; keep the current catalog on failure."""
+        try:
+            voices = await self._async_fetch()
+        except (HomeAssistantError, aiohttp.ClientError, TimeoutError, ValueError) as err:
+            _LOGGER.warning("Failed to refresh the Edge TTS voice list: %s", err)
+            return
+        finally:
+            self._refresh_task = None
+        if not (catalog := VoiceCatalog.from_edge_voices(voices)):
+            return
+        self.catalog = catalog
+        self.source = "edge_tts"
+        self._updated = updated = time.time()
+        stored = [
+            {key: voice[key] for key in ("ShortName", "Locale", "Gender", "VoiceTag") if key in voice}
+            for voice in voices
+        ]
+        self._store.async_delay_save(lambda: {"updated": updated, "voices": stored}, 1)
+        _LOGGER.debug("Refreshed the Edge TTS voice list: %d voices", len(catalog))
+
+    async def _async_fetch(self) -> list[dict[str, Any]]:
+        """Return the Edge TTS voice list.
+
+        Uses the shared client session with the URL and token of edge_tts;
+        ``edge_tts.list_voices()`` loads certificates inside the event loop,
+        so it is only used when edge_tts does not expose them.
+        """
+        edge_tts = await async_get_edge_tts(self.hass)
+        if not (hasattr(edge_tts, "constants") and hasattr(edge_tts, "drm")):
+            return await edge_tts.list_voices()
+        session = async_get_clientsession(self.hass)
+        try:
+            return await self._async_request(session, edge_tts)
+        except aiohttp.ClientResponseError as err:
+            if err.status != 403:
+                raise
+            # 403 表示本机时钟偏差导致令牌失效，校正后重试一次
+            edge_tts.drm.DRM.handle_client_response_error(err)
+        return await self._async_request(session, edge_tts)
+
+    async def _async_request(
+        self, session: aiohttp.ClientSession, edge_tts: ModuleType
+    ) -> list[dict[str, Any]]:
+        async with session.get(
+            f"{edge_tts.constants.VOICE_LIST}"
+            f"&Sec-MS-GEC={edge_tts.drm.DRM.generate_sec_ms_gec()}"
+            f"&Sec-MS-GEC-Version={edge_tts.constants.SEC_MS_GEC_VERSION}",
+            headers=edge_tts.constants.VOICE_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=VOICE_CATALOG_FETCH_TIMEOUT),
+            raise_for_status=True,
+        ) as response:
+            return await response.json(content_type=None)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return catalog statistics for diagnostics."""
+        return {
+            "source": self.source,
+            "voices": len(self.catalog),
+            "languages": len(self.catalog.languages),
+            "updated": self._updated,
+            "last_attempt": self._last_attempt,
+        }
+
+
+@callback
+def async_get_voice_catalog_store(hass: HomeAssistant) -> VoiceCatalogStore:
+    """Return the voice catalog store shared by all entries."""
+    if DATA_VOICE_CATALOG not in hass.data:
+        hass.data[DATA_VOICE_CATALOG] = VoiceCatalogStore(hass)
+    return hass.data[DATA_VOICE_CATALOG]
@@ -0,0 +1,7 @@
+"""Tests for the AI Hub integration.
+
+Run from the repository root in an environment with Home Assistant
+installed::
+
+    python -m pytest tests
+"""
@@ -0,0 +1,88 @@
+"""Tests for TTS output format negotiation and PCM conversion."""
+
+from __future__ import annotations
+
+import io
+import math
+import struct
+import wave
+
+from custom_components.ai_hub.audio_format import (
+    MP3_OUTPUT,
+    PcmConverter,
+    negotiate_output,
+    wav_header,
+)
+
+
+def _pcm(samples: list[int]) -> bytes:
+    return struct.pack(f"<{len(samples)}h", *samples)
+
+
+def _tone(rate: int, count: int) -> bytes:
+    return _pcm([int(8000 * math.sin(2 * math.pi * 220 * i / rate)) for i in range(count)])
+
+
+def _convert(converter: PcmConverter, data: bytes, size: int) -> bytes:
+    return b"".join(converter.feed(data[i : i + size]) for i in range(0, len(data), size))
+
+
+def test_negotiate_output() -> None:
+    """WAV uses the native or next higher PCM rate; anything else is MP3."""
+    assert negotiate_output(None) is MP3_OUTPUT
+    assert negotiate_output("flac", 16000, 1) is MP3_OUTPUT
+
+    native = negotiate_output("wav", 16000, 1)
+    assert (native.edge_format, native.source_rate, native.sample_rate, native.channels) == (
+        "raw-16khz-16bit-mono-pcm", 16000, 16000, 1
+    )
+    assert native.is_pcm and not MP3_OUTPUT.is_pcm
+
+    resampled = negotiate_output("wav", 11025, 2)
+    assert (resampled.source_rate, resampled.sample_rate, resampled.channels) == (16000, 11025, 2)
+    assert negotiate_output("wav").sample_rate == 24000
+    # 超过最高原生采样率时从最高采样率插值
+    assert negotiate_output("wav", 96000).source_rate == 48000
+
+
+def test_wav_header_is_readable() -> None:
+    """The header with a known size is a valid 16-bit WAV file."""
+    data = _tone(16000, 160)
+    with wave.open(io.BytesIO(wav_header(16000, 2, len(data)) + data)) as wav:
+        assert wav.getframerate() == 16000
+        assert wav.getnchannels() == 2
+        assert wav.getsampwidth() == 2
+        assert wav.getnframes() == 80
+    assert wav_header(16000, 1)[4:8] == b"\xff\xff\xff\xff"
+
+
+def test_native_rate_passes_through() -> None:
+    """At the native rate the samples are returned unchanged."""
+    data = _tone(16000, 1000)
+    assert _convert(PcmConverter(negotiate_output("wav", 16000, 1)), data, 333) == data
+
+
+def test_conversion_does_not_depend_on_chunk_split() -> None:
+    """Resampling continues across chunks, even when they split a sample."""
+    output = negotiate_output("wav", 11025, 1)
+    data = _tone(16000, 4000)
+    whole = PcmConverter(output).feed(data)
+    # 16000 -> 11025 的输出约为输入的 11025/16000
+    assert abs(len(whole) // 2 - 4000 * 11025 // 16000) <= 1
+    for size in (1, 3, 64, 1001):
+        assert _convert(PcmConverter(output), data, size) == whole
+
+
+def test_stereo_duplicates_samples() -> None:
+    """Mono samples are written to both channels."""
+    converter = PcmConverter(negotiate_output("wav", 16000, 2))
+    assert converter.feed(_pcm([1, -2, 300])) == _pcm([1, 1, -2, -2, 300, 300])
+
+
+def test_odd_byte_is_kept_for_the_next_chunk() -> None:
+    """Half a sample waits for the rest of it."""
+    converter = PcmConverter(negotiate_output("wav", 16000, 1))
+    data = _pcm([258, -3])
+    assert converter.feed(data[:1]) == b""
+    assert converter.feed(data[1:3]) == data[:2]
+    assert converter.feed(data[3:]) == data[2:]
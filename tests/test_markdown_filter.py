@@ -0,0 +1,62 @@
+"""Tests for the streaming markdown filter."""
+
+from __future__ import annotations
+
+from custom_components.ai_hub.markdown_filter import (
+    StreamingMarkdownFilter,
+    filter_markdown_content,
+)
+
+REPLY = (
+    "# 标题\n"
+    "好的，**客厅灯**已打开。\n\n\n\n"
+    "- 第一项\n"
+    "> 引用\n"
+    "| a | b |\n"
+    "|---|---|\n"
+    "```yaml\n"
+    "light.living_room: on\n"
+    "```\n"
+    "2 * 3 = 6，2*3=6\n"
+    "<b>粗</b>体[^1]\n"
+    "---\n"
+    "~~删除~~ ok"
+)
+SPOKEN = (
+    "\n好的，客厅灯已打开。\n\n"
+    "第一项\n"
+    "引用\n\n"
+    "light.living_room: on\n\n"
+    "2 * 3 = 6，2*3=6\n"
+    "粗体\n\n"
+    "删除 ok"
+)
+
+
+def _stream(text: str, size: int) -> str:
+    markdown_filter = StreamingMarkdownFilter()
+    out = "".join(markdown_filter.feed(text[i : i + size]) for i in range(0, len(text), size))
+    return out + markdown_filter.flush()
+
+
+def test_whole_reply() -> None:
+    """Block and inline markup is removed; entity ids and arithmetic are kept."""
+    assert _stream(REPLY, len(REPLY)) == SPOKEN
+
+
+def test_markup_split_across_deltas() -> None:
+    """Markers split over several deltas are removed the same way."""
+    for size in (1, 2, 3, 5, 8):
+        assert _stream(REPLY, size) == SPOKEN, size
+
+
+def test_pending_suffix_is_held_until_flush() -> None:
+    """An undecidable trailing marker is held back, then emitted as text."""
+    markdown_filter = StreamingMarkdownFilter()
+    assert markdown_filter.feed("价格 <") == "价格 "
+    assert markdown_filter.flush() == "<"
+
+
+def test_filter_markdown_content_strips_edges() -> None:
+    """The one-shot helper also trims surrounding whitespace."""
+    assert filter_markdown_content(REPLY) == SPOKEN.strip()
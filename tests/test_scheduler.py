@@ -0,0 +1,134 @@
+"""Tests for the per-provider request scheduler."""
+
+from __future__ import annotations
+
+import asyncio
+
+from custom_components.ai_hub.const import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_TASK,
+)
+from custom_components.ai_hub.scheduler import ProviderLimiter, RequestScheduler
+
+
+def _limiter(max_concurrency: int = 1, reserve: int = 0) -> ProviderLimiter:
+    # 令牌桶足够大，测试只关心并发槽位
+    return ProviderLimiter("test", max_concurrency, rate=1000, burst=1000, reserve=reserve)
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_waiters_are_served_by_priority_then_arrival() -> None:
+    """A freed slot goes to the highest priority class, FIFO within a class."""
+
+    async def run() -> list[str]:
+        limiter = _limiter()
+        order: list[str] = []
+        await limiter.async_acquire(PRIORITY_INTERACTIVE)
+
+        async def request(name: str, priority: int) -> None:
+            await limiter.async_acquire(priority)
+            order.append(name)
+            limiter.release()
+
+        tasks = [
+            asyncio.create_task(request("background", PRIORITY_BACKGROUND)),
+            asyncio.create_task(request("task-1", PRIORITY_TASK)),
+            asyncio.create_task(request("interactive", PRIORITY_INTERACTIVE)),
+            asyncio.create_task(request("task-2", PRIORITY_TASK)),
+        ]
+        await _settle()
+        assert order == []
+        limiter.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(run()) == ["interactive", "task-1", "task-2", "background"]
+
+
+def test_reserved_slots_stay_free_for_interactive_requests() -> None:
+    """Background work cannot take the slots reserved for higher classes."""
+
+    async def run() -> None:
+        limiter = _limiter(max_concurrency=3, reserve=1)
+        await limiter.async_acquire(PRIORITY_BACKGROUND)
+        waiting = asyncio.create_task(limiter.async_acquire(PRIORITY_BACKGROUND))
+        await _settle()
+        assert not waiting.done()
+
+        # 交互请求不排在后台请求之后，直接使用预留的槽位
+        await asyncio.wait_for(limiter.async_acquire(PRIORITY_INTERACTIVE), 1)
+        assert limiter.as_dict()["active"] == 2
+
+        limiter.release()
+        limiter.release()
+        await asyncio.wait_for(waiting, 1)
+        assert limiter.as_dict()["active"] == 1
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_leaves_the_queue() -> None:
+    """Cancelling a queued request removes it without leaking a slot."""
+
+    async def run() -> None:
+        limiter = _limiter()
+        await limiter.async_acquire(PRIORITY_INTERACTIVE)
+        cancelled = asyncio.create_task(limiter.async_acquire(PRIORITY_INTERACTIVE))
+        waiting = asyncio.create_task(limiter.async_acquire(PRIORITY_TASK))
+        await _settle()
+        cancelled.cancel()
+        await _settle()
+        assert cancelled.cancelled()
+
+        limiter.release()
+        await asyncio.wait_for(waiting, 1)
+        stats = limiter.as_dict()
+        assert stats["active"] == 1
+        assert stats["classes"]["interactive"]["queued"] == 0
+
+    asyncio.run(run())
+
+
+def test_cancel_after_slot_was_granted_passes_it_on() -> None:
+    """A slot handed to a request cancelled in the same tick goes to the next waiter."""
+
+    async def run() -> None:
+        limiter = _limiter()
+        await limiter.async_acquire(PRIORITY_INTERACTIVE)
+        first = asyncio.create_task(limiter.async_acquire(PRIORITY_INTERACTIVE))
+        second = asyncio.create_task(limiter.async_acquire(PRIORITY_INTERACTIVE))
+        await _settle()
+
+        # release() 已经把槽位交给 first，但 first 还没有恢复运行
+        limiter.release()
+        first.cancel()
+        await asyncio.wait_for(second, 1)
+        assert first.cancelled()
+        assert limiter.as_dict()["active"] == 1
+
+    asyncio.run(run())
+
+
+def test_scheduler_routes_by_host() -> None:
+    """Governed hosts hold a slot inside the block; other hosts pass through."""
+
+    async def run() -> None:
+        scheduler = RequestScheduler(
+            {"api.example.com": {"max_concurrency": 2, "rate": 100, "burst": 10}}
+        )
+        limiter = scheduler.limiter_for_url("https://api.example.com/v1/chat")
+        assert limiter is not None
+        assert scheduler.limiter_for_url("https://other.example.com/") is None
+
+        async with scheduler.slot("https://api.example.com/v1/chat"):
+            assert limiter.as_dict()["active"] == 1
+        async with scheduler.slot("https://other.example.com/"):
+            pass
+        assert limiter.as_dict()["active"] == 0
+
+    asyncio.run(run())
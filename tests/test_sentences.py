@@ -0,0 +1,84 @@
+"""Tests for sentence splitting and grouping of TTS messages."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from custom_components.ai_hub.sentence_splitter import SentenceSplitter, split_sentences
+from custom_components.ai_hub.tts_cache import TTSAudioCache, normalize_text
+from custom_components.ai_hub.tts_synthesis import group_sentences
+
+ENGLISH = (
+    "Good morning. The weather today is sunny, 25 degrees. "
+    "You have 3 meetings. Drive safely!"
+)
+CHINESE = "早上好。今天天气晴，气温25度。你有3个会议！开车注意安全。"
+
+
+def test_split_sentences() -> None:
+    """Sentences end at terminal punctuation; decimals and entity ids stay whole."""
+    assert split_sentences(ENGLISH) == [
+        "Good morning.",
+        "The weather today is sunny, 25 degrees.",
+        "You have 3 meetings.",
+        "Drive safely!",
+    ]
+    assert split_sentences(CHINESE) == ["早上好。", "今天天气晴，气温25度。", "你有3个会议！", "开车注意安全。"]
+    assert split_sentences("Set light.living_room to 3.5 percent. Done") == [
+        "Set light.living_room to 3.5 percent.",
+        "Done",
+    ]
+
+
+def test_splitter_matches_split_for_any_fragment_size() -> None:
+    """Feeding the text in fragments gives the same sentences."""
+    for text in (ENGLISH, CHINESE, "他说：“好的。”然后离开了。"):
+        expected = split_sentences(text)
+        for size in (1, 2, 3, 5):
+            splitter = SentenceSplitter()
+            sentences = []
+            for start in range(0, len(text), size):
+                sentences += splitter.feed(text[start : start + size])
+            sentences += splitter.flush()
+            assert sentences == expected
+
+
+def test_long_sentence_is_split_at_a_comma() -> None:
+    """A sentence over the limit is cut at the last comma before it."""
+    assert split_sentences("one, two, three four five six.", max_chars=12) == [
+        "one, two,",
+        "three four",
+        "five six.",
+    ]
+
+
+def test_group_sentences_keeps_spaces() -> None:
+    """English sentences are joined with a space, Chinese ones without."""
+    assert group_sentences(split_sentences(ENGLISH), 200) == [ENGLISH]
+    assert group_sentences(split_sentences(CHINESE), 200) == [CHINESE]
+    assert group_sentences(["你好。", "Hello there.", "再见！"], 200) == ["你好。Hello there.再见！"]
+
+
+def test_group_sentences_respects_the_limit() -> None:
+    """Groups stay within the limit; a longer sentence is a group of its own."""
+    groups = group_sentences(split_sentences(ENGLISH), 40)
+    assert groups == [
+        "Good morning.",
+        "The weather today is sunny, 25 degrees.",
+        "You have 3 meetings. Drive safely!",
+    ]
+    assert group_sentences(["a" * 50, "b."], 40) == ["a" * 50, "b."]
+
+
+def test_grouped_text_has_the_cache_key_of_the_message(tmp_path: Path) -> None:
+    """A group is cached under the same key as the original text."""
+    cache = TTSAudioCache(None, tmp_path)
+    (group,) = group_sentences(split_sentences(ENGLISH), 200)
+    assert normalize_text(group) == normalize_text(ENGLISH)
+    assert cache.key(group, "en-US-AriaNeural", "+0%", "+0%", "+0Hz") == cache.key(
+        ENGLISH, "en-US-AriaNeural", "+0%", "+0%", "+0Hz"
+    )
+    # 去掉空格的文本是不同的短语
+    assert cache.key(ENGLISH.replace(". ", "."), "en-US-AriaNeural", "+0%", "+0%", "+0Hz") != (
+        cache.key(ENGLISH, "en-US-AriaNeural", "+0%", "+0%", "+0Hz")
+    )
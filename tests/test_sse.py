@@ -0,0 +1,58 @@
+"""Tests for the incremental SSE decoder."""
+
+from __future__ import annotations
+
+from custom_components.ai_hub.sse import SSEDecoder, SSEEvent
+
+STREAM = (
+    'data: {"content": "你好"}\n\n'
+    ": keep-alive comment\r\n"
+    "event: usage\r\n"
+    "id: 7\r\n"
+    "retry: 3000\r\n"
+    "data: line one\r\n"
+    "data: line two\r\n"
+    "\r\n"
+    "data: [DONE]\n\n"
+).encode()
+
+EXPECTED = [
+    SSEEvent('{"content": "你好"}'),
+    SSEEvent("line one\nline two", event="usage", id="7", retry=3000),
+    SSEEvent("[DONE]", id="7", retry=3000),
+]
+
+
+def _decode(chunks: list[bytes]) -> list[SSEEvent]:
+    decoder = SSEDecoder()
+    events = [event for chunk in chunks for event in decoder.feed(chunk)]
+    return events + decoder.flush()
+
+
+def test_whole_stream() -> None:
+    """Fields, comments, multi-line data and CRLF endings are decoded."""
+    assert _decode([STREAM]) == EXPECTED
+
+
+def test_every_split_point_gives_the_same_events() -> None:
+    """Splitting inside a UTF-8 character or a CRLF does not change the events."""
+    for split in range(1, len(STREAM)):
+        assert _decode([STREAM[:split], STREAM[split:]]) == EXPECTED, split
+
+
+def test_byte_by_byte() -> None:
+    """A stream fed one byte at a time decodes the same."""
+    assert _decode([STREAM[i : i + 1] for i in range(len(STREAM))]) == EXPECTED
+
+
+def test_flush_delivers_unterminated_event() -> None:
+    """A last data line without a trailing blank line is still dispatched."""
+    decoder = SSEDecoder()
+    assert decoder.feed(b"data: a\n\ndata: tail") == [SSEEvent("a")]
+    assert decoder.flush() == [SSEEvent("tail")]
+    assert decoder.flush() == []
+
+
+def test_event_without_data_is_dropped() -> None:
+    """An event type without data lines does not dispatch an event."""
+    assert _decode([b"event: ping\n\ndata: x\n\n"]) == [SSEEvent("x")]
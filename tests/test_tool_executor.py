@@ -0,0 +1,91 @@
+"""Tests for the concurrent tool call runner."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+from homeassistant.helpers import llm
+
+from custom_components.ai_hub.const import (
+    CONF_EARLY_TOOL_CALLS,
+    CONF_PARALLEL_TOOL_CALLS,
+    TOOL_CALL_MAX_PARALLEL,
+)
+from custom_components.ai_hub.tool_executor import ToolCallRunner, tool_call_parallelism
+
+
+class _BlockingApi:
+    """LLM API whose tool calls wait until they are cancelled."""
+
+    def __init__(self) -> None:
+        self.started: list[str] = []
+        self.cancelled: list[str] = []
+
+    async def async_call_tool(self, tool_call: llm.ToolInput) -> dict:
+        self.started.append(tool_call.id)
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            self.cancelled.append(tool_call.id)
+            raise
+        return {}
+
+
+def _runner(api: _BlockingApi, max_parallel: int = TOOL_CALL_MAX_PARALLEL) -> ToolCallRunner:
+    loop = asyncio.get_running_loop()
+    hass = SimpleNamespace(async_create_task=lambda coro, name=None: loop.create_task(coro))
+    return ToolCallRunner(hass, api, max_parallel)
+
+
+def test_tool_call_parallelism() -> None:
+    """Early dispatch runs the calls here even without parallel mode."""
+    assert tool_call_parallelism({}) is None
+    assert tool_call_parallelism({CONF_PARALLEL_TOOL_CALLS: True}) == TOOL_CALL_MAX_PARALLEL
+    assert tool_call_parallelism({CONF_EARLY_TOOL_CALLS: True}) == 1
+    assert (
+        tool_call_parallelism({CONF_EARLY_TOOL_CALLS: True, CONF_PARALLEL_TOOL_CALLS: True})
+        == TOOL_CALL_MAX_PARALLEL
+    )
+
+
+def test_early_dispatch_without_parallel_mode_is_cancelled() -> None:
+    """With one call at a time, calls on different targets queue and are cancelled too."""
+
+    async def run() -> _BlockingApi:
+        api = _BlockingApi()
+        runner = _runner(api, tool_call_parallelism({CONF_EARLY_TOOL_CALLS: True}))
+        runner.submit(llm.ToolInput(tool_name="HassTurnOn", tool_args={"name": "fan"}, id="call_1"))
+        runner.submit(llm.ToolInput(tool_name="HassTurnOn", tool_args={"name": "lamp"}, id="call_2"))
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert api.started == ["call_1"]
+
+        runner.cancel()
+        await asyncio.gather(*(task for _call, task in runner._tasks), return_exceptions=True)
+        assert all(task.cancelled() for _call, task in runner._tasks)
+        return api
+
+    api = asyncio.run(run())
+    assert api.started == api.cancelled == ["call_1"]
+
+
+def test_cancel_stops_running_and_queued_calls() -> None:
+    """Calls dispatched before the stream failed do not keep running."""
+
+    async def run() -> _BlockingApi:
+        api = _BlockingApi()
+        runner = _runner(api)
+        runner.submit(llm.ToolInput(tool_name="HassTurnOn", tool_args={"name": "fan"}, id="call_1"))
+        runner.submit(llm.ToolInput(tool_name="HassTurnOff", tool_args={"name": "fan"}, id="call_2"))
+        await asyncio.sleep(0)
+
+        runner.cancel()
+        await asyncio.gather(*(task for _call, task in runner._tasks), return_exceptions=True)
+        assert all(task.cancelled() for _call, task in runner._tasks)
+        return api
+
+    api = asyncio.run(run())
+    # 同一目标的第二个调用还在排队，从未开始执行
+    assert api.started == ["call_1"]
+    assert api.cancelled == ["call_1"]
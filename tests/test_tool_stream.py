@@ -0,0 +1,81 @@
+"""Tests for assembling tool calls from streamed deltas."""
+
+from __future__ import annotations
+
+from custom_components.ai_hub.tool_stream import ToolCallBuffer
+
+
+def _delta(index: int, arguments: str, name: str | None = None, call_id: str | None = None) -> dict:
+    function = {"arguments": arguments}
+    if name is not None:
+        function["name"] = name
+    delta = {"index": index, "function": function}
+    if call_id is not None:
+        delta["id"] = call_id
+    return delta
+
+
+def test_call_completes_when_arguments_close() -> None:
+    """A call is returned as soon as its arguments object closes."""
+    buffer = ToolCallBuffer()
+    buffer.add(_delta(0, '{"name": "kitchen', name="HassTurnOn", call_id="call_1"))
+    assert buffer.pop_complete() == []
+
+    buffer.add(_delta(0, ' {light}"}'))
+    (tool_call,) = buffer.pop_complete()
+    assert tool_call.id == "call_1"
+    assert tool_call.tool_name == "HassTurnOn"
+    assert tool_call.tool_args == {"name": "kitchen {light}"}
+    # 已返回的调用不会重复出现
+    assert buffer.pop_complete() == []
+    assert buffer.pop_all() == []
+
+
+def test_fragmented_arguments_are_joined() -> None:
+    """Arguments split at any point, including inside strings, are joined."""
+    arguments = '{"name": "a \\"quoted\\" }", "brightness": 50}'
+    for size in (1, 2, 3, 7):
+        buffer = ToolCallBuffer()
+        buffer.add({"index": 0, "id": "call_1", "function": {"name": "HassLightSet"}})
+        popped = []
+        for start in range(0, len(arguments), size):
+            buffer.add(_delta(0, arguments[start : start + size]))
+            popped += buffer.pop_complete()
+        assert [call.tool_args for call in popped] == [
+            {"name": 'a "quoted" }', "brightness": 50}
+        ]
+
+
+def test_higher_index_completes_earlier_call() -> None:
+    """A new index marks the earlier calls complete, even without arguments."""
+    buffer = ToolCallBuffer(external=True)
+    buffer.add({"index": 0, "id": "call_1", "function": {"name": "GetLiveContext"}})
+    assert buffer.pop_complete() == []
+
+    buffer.add(_delta(1, '{"name": "fan"', name="HassTurnOff", call_id="call_2"))
+    (tool_call,) = buffer.pop_complete()
+    assert (tool_call.id, tool_call.tool_args, tool_call.external) == ("call_1", {}, True)
+
+    buffer.add(_delta(1, "}"))
+    (tool_call,) = buffer.pop_all()
+    assert tool_call.id == "call_2"
+
+
+def test_pop_all_returns_calls_in_index_order() -> None:
+    """Calls still open at the end of the stream are returned by index."""
+    buffer = ToolCallBuffer()
+    buffer.add(_delta(1, '{"area": "bedroom"}', name="HassTurnOff", call_id="call_2"))
+    buffer.add(_delta(0, '{"area": "kitchen"}', name="HassTurnOn", call_id="call_1"))
+
+    assert [call.id for call in buffer.pop_all()] == ["call_1", "call_2"]
+    assert buffer
+
+
+def test_invalid_arguments_are_dropped_at_the_end() -> None:
+    """A closed but invalid object waits for the end of the stream, then is dropped."""
+    buffer = ToolCallBuffer()
+    buffer.add(_delta(0, '{"name": kitchen}', name="HassTurnOn", call_id="call_1"))
+    buffer.add(_delta(1, '{"name": "fan"}', name="HassTurnOff", call_id="call_2"))
+
+    assert [call.id for call in buffer.pop_complete()] == ["call_2"]
+    assert buffer.pop_all() == []
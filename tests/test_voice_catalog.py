@@ -0,0 +1,80 @@
+"""Tests for the Edge TTS voice catalog."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+
+from custom_components.ai_hub import voice_catalog
+from custom_components.ai_hub.voice_catalog import VoiceCatalog, VoiceCatalogStore
+
+EDGE_VOICES = [
+    {"ShortName": "zh-CN-XiaoxiaoNeural", "Locale": "zh-CN", "Gender": "Female"},
+    {"ShortName": "zh-CN-YunxiNeural", "Locale": "zh-CN", "Gender": "Male"},
+    {"ShortName": "en-US-GuyNeural", "Locale": "en-US", "Gender": "Male"},
+    {"ShortName": "en-US-JennyNeural", "Locale": "en-US", "Gender": "Female"},
+]
+
+
+def test_language_codes_include_voice_ids() -> None:
+    """Locales, prefixes and voice ids are all supported language codes."""
+    catalog = VoiceCatalog.from_edge_voices(EDGE_VOICES)
+    assert catalog.languages == ["en-US", "zh-CN", "en", "zh"]
+    assert catalog.language_codes == [
+        "en-US", "zh-CN", "en", "zh",
+        "en-US-GuyNeural", "en-US-JennyNeural", "zh-CN-XiaoxiaoNeural", "zh-CN-YunxiNeural",
+    ]
+
+
+def test_lookup_by_language_or_voice_id() -> None:
+    """A voice id selects that voice; languages fall back to the preferred one."""
+    catalog = VoiceCatalog.from_edge_voices(EDGE_VOICES)
+    assert [voice.voice_id for voice in catalog.voices("zh")] == [
+        "zh-CN-XiaoxiaoNeural", "zh-CN-YunxiNeural"
+    ]
+    assert [voice.voice_id for voice in catalog.voices("zh-CN-YunxiNeural")] == ["zh-CN-YunxiNeural"]
+    assert catalog.default_voice("en_us") == "en-US-JennyNeural"
+    assert catalog.default_voice("zh", "Male") == "zh-CN-YunxiNeural"
+    assert catalog.default_voice("en-US-GuyNeural") == "en-US-GuyNeural"
+    assert catalog.default_voice("fr") is None
+
+
+class _FakeStore:
+    def __init__(self, *_args) -> None:
+        pass
+
+    async def async_load(self) -> None:
+        return None
+
+
+def test_failed_refresh_is_not_retried_on_every_load(monkeypatch: pytest.MonkeyPatch) -> None:
+    """After a failed fetch, loads keep the built-in list until the retry interval."""
+    monkeypatch.setattr(voice_catalog, "Store", _FakeStore)
+    clock = [1000.0]
+    monkeypatch.setattr(voice_catalog.time, "time", lambda: clock[0])
+
+    async def run() -> int:
+        hass = SimpleNamespace(async_create_background_task=lambda coro, _name: asyncio.create_task(coro))
+        store = VoiceCatalogStore(hass)
+        attempts = 0
+
+        async def fetch() -> list:
+            nonlocal attempts
+            attempts += 1
+            raise aiohttp.ClientError("offline")
+
+        store._async_fetch = fetch
+        for _ in range(3):
+            assert await store.async_load() is store.catalog
+            await asyncio.sleep(0)
+        assert attempts == 1 and store.source == "builtin"
+
+        clock[0] += voice_catalog.VOICE_CATALOG_RETRY_INTERVAL + 1
+        await store.async_load()
+        await asyncio.sleep(0)
+        return attempts
+
+    assert asyncio.run(run()) == 2